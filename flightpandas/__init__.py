@@ -4,5 +4,13 @@ pandas.options.mode.copy_on_write = True
 from flightpandas.flight import Flight
 from flightpandas.flight_collection import FlightCollection
 
-from flightpandas.splitter import TimeGapSplitter
-from flightpandas.simplifier import RDP
+from flightpandas.splitter import TimeGapSplitter, StreamingTimeGapSplitter
+from flightpandas.simplifier import RDP, SED, StreamingSimplifier
+from flightpandas.resampler import Resampler
+from flightpandas.kinematics import Kinematics
+from flightpandas.cache import PipelineCache
+from flightpandas.profiling import Profiler
+from flightpandas.io import ChunkWriter, iter_parquet, read_parquet, to_parquet
+from flightpandas.store import FlightStore, open_store, write_store
+from flightpandas.distance import dtw_distance_matrix
+from flightpandas.dataset import FlightDataset, open_dataset, write_dataset
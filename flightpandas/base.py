@@ -5,14 +5,20 @@ class FlightPandasBase:
 
     Attributes:
         _metadata (list): A list of metadata attribute names associated with flight data, 
-            including altitude, altitude rate, velocity, and heading.
+            including latitude, longitude, altitude, altitude rate, velocity, and heading.
+        _latitude_column_name (str): The column name for latitude data when coordinates are stored
+            as plain columns. Default is None.
+        _longitude_column_name (str): The column name for longitude data when coordinates are stored
+            as plain columns. Default is None.
         _altitude_column_name (str): The column name for altitude data. Default is None.
         _altitude_rate_column_name (str): The column name for altitude rate data. Default is None.
         _velocity_column_name (str): The column name for velocity data. Default is None.
         _heading_column_name (str): The column name for heading data. Default is None.
     """
 
-    _metadata = ["_altitude_column_name", "_altitude_rate_column_name", "_velocity_column_name", "_heading_column_name"]
+    _metadata = ["_latitude_column_name", "_longitude_column_name", "_altitude_column_name", "_altitude_rate_column_name", "_velocity_column_name", "_heading_column_name"]
+    _latitude_column_name = None
+    _longitude_column_name = None
     _altitude_column_name = None
     _altitude_rate_column_name = None
     _velocity_column_name = None
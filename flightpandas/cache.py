@@ -0,0 +1,437 @@
+"""
+cache.py
+
+This module provides an on-disk cache for the results of `HelperBase` pipelines. Results are
+addressed by a fingerprint of the input data and of every step of the pipeline, so re-running an
+unchanged pipeline on unchanged data reads the stored result instead of recomputing it.
+
+Classes:
+--------
+PipelineCache:
+    A size-bounded directory of Parquet files with least-recently-used eviction and hit/miss
+    statistics.
+
+Functions:
+----------
+_fingerprint_data(obj):
+    Computes a content hash of a `Flight` or `FlightCollection` object.
+
+_fingerprint_value(value):
+    Returns a representation of a step parameter that is the same in every process.
+
+_fingerprint_step(pipe):
+    Returns a representation of a pipeline step and all of its parameters.
+
+_to_table(result):
+    Converts a pipeline result into an Arrow table with the metadata needed to restore it.
+
+_from_table(table):
+    Restores a pipeline result from an Arrow table written by `_to_table`.
+
+Examples:
+---------
+# Cache the results of a pipeline in a directory limited to 10 GB
+from flightpandas.cache import PipelineCache
+cache = PipelineCache("~/.cache/flightpandas", max_bytes=10 * 2**30)
+result = RDP(TimeGapSplitter(flight_collection), tolerance=0.01).eval(cache=cache)
+
+# Check how often the cache was used
+print(cache.stats)
+"""
+import hashlib
+import json
+import os
+import types
+import uuid
+import warnings
+from functools import partial
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shapely
+from geopandas import GeoDataFrame, GeoSeries
+from pandas import DataFrame, Index, Series
+from pandas.util import hash_pandas_object
+
+from flightpandas.flight import Flight
+from flightpandas.flight_collection import FlightCollection
+
+_METADATA_KEY = b"flightpandas"
+
+
+def _fingerprint_data(obj) -> str:
+    """
+    Computes a content hash of a `Flight` or `FlightCollection` object.
+
+    The hash covers the values, the index, the column names and types, the grouping keys, the
+    coordinate storage and the CRS.
+
+    Parameters:
+    -----------
+    obj : Flight | FlightCollection
+        The data to fingerprint.
+
+    Returns:
+    --------
+    str:
+        The hexadecimal digest.
+    """
+    key_names = obj.key_names if isinstance(obj, FlightCollection) else []
+    data = obj.data if isinstance(obj, FlightCollection) else obj
+    frame, lat, lon = data._coordinate_frame()
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr((
+        key_names, list(frame.columns), [str(dtype) for dtype in frame.dtypes], frame.index.name,
+        lat, lon, data.is_columnar, data.crs.to_string() if data.crs is not None else None,
+        [getattr(data, name) for name in data._metadata],
+    )).encode())
+    digest.update(hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _fingerprint_value(value) -> str:
+    """
+    Returns a representation of a step parameter that is the same in every process.
+
+    Parameters:
+    -----------
+    value : object
+        The parameter value.
+
+    Returns:
+    --------
+    str:
+        The representation.
+
+    Raises:
+    -------
+    ValueError:
+        If the value has no representation that is the same in every process, such as a bound
+        method or an object whose repr contains its memory address.
+    """
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{', '.join(_fingerprint_value(item) for item in value)}]"
+    if isinstance(value, dict):
+        items = sorted((_fingerprint_value(key), _fingerprint_value(item)) for key, item in value.items())
+        return f"dict[{', '.join(f'{key}: {item}' for key, item in items)}]"
+    if isinstance(value, np.ndarray):
+        return f"ndarray[{value.dtype}, {value.shape}, {hashlib.blake2b(np.ascontiguousarray(value).tobytes(), digest_size=20).hexdigest()}]"
+    if isinstance(value, (DataFrame, Series, Index)):
+        hashes = hash_pandas_object(value, index=not isinstance(value, Index)).to_numpy().tobytes()
+        names = list(value.columns) if isinstance(value, DataFrame) else value.name
+        return f"{type(value).__name__}[{names!r}, {hashlib.blake2b(hashes, digest_size=20).hexdigest()}]"
+    if isinstance(value, partial):
+        return f"partial[{_fingerprint_value(value.func)}, {_fingerprint_value(value.args)}, {_fingerprint_value(value.keywords)}]"
+    if isinstance(value, types.FunctionType):
+        # Functions are identified by their name, code, defaults and captured values
+        closure = [cell.cell_contents for cell in value.__closure__ or ()]
+        return (f"function[{value.__module__}.{value.__qualname__}, {_fingerprint_value(value.__code__)}, "
+                f"{_fingerprint_value(value.__defaults__)}, {_fingerprint_value(value.__kwdefaults__)}, "
+                f"{_fingerprint_value(closure)}]")
+    if isinstance(value, types.CodeType):
+        consts = [_fingerprint_value(const) for const in value.co_consts]
+        return f"code[{value.co_code.hex()}, {value.co_names!r}, {consts}]"
+    if isinstance(value, type) or (isinstance(value, types.BuiltinFunctionType)
+                                   and (value.__self__ is None or isinstance(value.__self__, types.ModuleType))):
+        return f"{type(value).__name__}[{value.__module__}.{value.__qualname__}]"
+    text = repr(value)
+    if type(value).__repr__ is object.__repr__ or " at 0x" in text or isinstance(value, types.MethodType):
+        raise ValueError(f"Cannot fingerprint {text}.")
+    return f"{type(value).__module__}.{type(value).__qualname__}[{text}]"
+
+
+def _fingerprint_step(pipe) -> str:
+    """
+    Returns a representation of a pipeline step and all of its parameters.
+
+    Every attribute of the step is included, except the input data and the state that the step
+    collects during evaluation, which subclasses of `HelperBase` list in `_runtime_attributes`.
+
+    Parameters:
+    -----------
+    pipe : HelperBase
+        The step.
+
+    Returns:
+    --------
+    str:
+        The representation.
+
+    Raises:
+    -------
+    ValueError:
+        If a parameter cannot be fingerprinted.
+    """
+    params = {name: value for name, value in vars(pipe).items() if name not in pipe._runtime_attributes}
+    return f"{type(pipe).__module__}.{type(pipe).__qualname__}:{_fingerprint_value(params)}"
+
+
+def _to_table(result) -> pa.Table | None:
+    """
+    Converts a pipeline result into an Arrow table with the metadata needed to restore it.
+
+    `Flight` and `FlightCollection` results are stored with plain coordinate columns, and other
+    geometry columns are stored as WKB.
+
+    Parameters:
+    -----------
+    result : Flight | FlightCollection | GeoDataFrame
+        The result of a pipeline.
+
+    Returns:
+    --------
+    pyarrow.Table | None:
+        The table, or None if the result cannot be stored.
+    """
+    if isinstance(result, (Flight, FlightCollection)):
+        data = result.data if isinstance(result, FlightCollection) else result
+        frame, lat, lon = data._coordinate_frame()
+        metadata = {
+            "kind": "collection" if isinstance(result, FlightCollection) else "flight",
+            "key_names": result.key_names if isinstance(result, FlightCollection) else [],
+            "columnar": data.is_columnar,
+            "lat": lat,
+            "lon": lon,
+            "attrs": {name: getattr(data, name) for name in data._metadata},
+            "crs": data.crs.to_json() if data.crs is not None else None,
+        }
+    elif isinstance(result, GeoDataFrame):
+        geometry_columns = [name for name in result.columns if isinstance(result[name], GeoSeries)]
+        frame = DataFrame(result).assign(**{name: shapely.to_wkb(result[name].array) for name in geometry_columns})
+        metadata = {
+            "kind": "geodataframe",
+            "geometry_columns": {name: result[name].crs.to_json() if result[name].crs is not None else None
+                                 for name in geometry_columns},
+            "geometry": result._geometry_column_name if result._geometry_column_name in geometry_columns else None,
+        }
+    else:
+        return None
+
+    table = pa.Table.from_pandas(frame)
+    return table.replace_schema_metadata({**(table.schema.metadata or {}), _METADATA_KEY: json.dumps(metadata)})
+
+
+def _from_table(table: pa.Table):
+    """
+    Restores a pipeline result from an Arrow table written by `_to_table`.
+
+    Parameters:
+    -----------
+    table : pyarrow.Table
+        The stored table.
+
+    Returns:
+    --------
+    Flight | FlightCollection | GeoDataFrame:
+        The restored result.
+    """
+    metadata = json.loads(table.schema.metadata[_METADATA_KEY])
+    frame = table.to_pandas()
+
+    if metadata["kind"] == "geodataframe":
+        geometries = {name: GeoSeries.from_wkb(frame[name].to_numpy(), index=frame.index, crs=crs)
+                      for name, crs in metadata["geometry_columns"].items()}
+        return GeoDataFrame(frame.assign(**geometries), geometry=metadata["geometry"])
+
+    attrs = metadata["attrs"]
+    data = Flight(frame, lat=metadata["lat"], lon=metadata["lon"], alt=attrs["_altitude_column_name"],
+                  alt_rate=attrs["_altitude_rate_column_name"], velocity=attrs["_velocity_column_name"],
+                  heading=attrs["_heading_column_name"], columnar=metadata["columnar"])
+    if not data.is_columnar and metadata["crs"] is not None:
+        data = data.set_crs(metadata["crs"], allow_override=True)
+    if metadata["kind"] == "collection":
+        return data.groupby(metadata["key_names"])
+    return data
+
+
+class PipelineCache:
+    """
+    A size-bounded on-disk cache for the results of `HelperBase` pipelines.
+
+    Every result is stored as one Parquet file named after the fingerprint of its input data and
+    pipeline steps. The modification time of a file records its last use, and the least recently
+    used files are removed once the directory grows beyond `max_bytes`.
+
+    Attributes:
+    -----------
+    path : str
+        The directory of the cache.
+    max_bytes : int or None
+        The maximum total size of the cached files. None means unbounded.
+    hits : int
+        The number of results read from the cache.
+    misses : int
+        The number of results that had to be computed.
+    evictions : int
+        The number of results removed to stay within `max_bytes`.
+
+    Methods:
+    --------
+    key(obj, stages):
+        Computes the cache key of a pipeline applied to some data.
+    get(key):
+        Reads a cached result, or returns None.
+    put(key, result):
+        Stores a result and evicts the least recently used results if needed.
+    clear():
+        Removes every cached result.
+    stats:
+        The hit, miss and eviction counts and the size of the cache.
+    """
+
+    def __init__(self, path, max_bytes=None):
+        """
+        Initializes the PipelineCache.
+
+        Parameters:
+        -----------
+        path : str
+            The directory of the cache. Created if it does not exist.
+        max_bytes : int, optional
+            The maximum total size of the cached files. Default is None, which never evicts.
+        """
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.path, exist_ok=True)
+
+    @property
+    def stats(self) -> dict:
+        """
+        The hit, miss and eviction counts, the number of entries and the size of the cache in bytes.
+        """
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+    def key(self, obj, stages) -> str:
+        """
+        Computes the cache key of a pipeline applied to some data.
+
+        Parameters:
+        -----------
+        obj : Flight | FlightCollection
+            The input data of the pipeline.
+        stages : list
+            The steps of the pipeline, grouped in stages.
+
+        Returns:
+        --------
+        str | None:
+            The hexadecimal key, or None if a step has a parameter that cannot be fingerprinted
+            the same way in every process. Such pipelines are not cached.
+        """
+        digest = hashlib.blake2b(_fingerprint_data(obj).encode(), digest_size=20)
+        for stage in stages:
+            for pipe in stage:
+                try:
+                    digest.update(_fingerprint_step(pipe).encode())
+                except ValueError as error:
+                    warnings.warn(f"The pipeline is not cached. {type(pipe).__name__}: {error}", stacklevel=3)
+                    return None
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Reads a cached result and marks it as recently used.
+
+        Parameters:
+        -----------
+        key : str
+            The cache key.
+
+        Returns:
+        --------
+        Flight | FlightCollection | GeoDataFrame | None:
+            The cached result, or None on a miss.
+        """
+        path = self._file(key)
+        try:
+            table = pq.read_table(path)
+            os.utime(path)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _from_table(table)
+
+    def put(self, key, result) -> None:
+        """
+        Stores a result and evicts the least recently used results if the cache is too large.
+
+        Results that cannot be stored are ignored.
+
+        Parameters:
+        -----------
+        key : str
+            The cache key.
+        result : Flight | FlightCollection | GeoDataFrame
+            The result to store.
+        """
+        table = _to_table(result)
+        if table is None:
+            return
+
+        # Write to a temporary file first so readers never see a partial result
+        temporary = os.path.join(self.path, f".{key}.{uuid.uuid4().hex}.tmp")
+        pq.write_table(table, temporary)
+        os.replace(temporary, self._file(key))
+        self._evict()
+
+    def clear(self) -> None:
+        """
+        Removes every cached result.
+        """
+        for path, _, _ in self._entries():
+            os.remove(path)
+
+    def _file(self, key) -> str:
+        return os.path.join(self.path, f"{key}.parquet")
+
+    def _entries(self) -> list:
+        """
+        Lists the cached files with their sizes and last use times.
+
+        Returns:
+        --------
+        list:
+            Tuples of (path, size in bytes, last use time in nanoseconds).
+        """
+        entries = []
+        with os.scandir(self.path) as scan:
+            for entry in scan:
+                if entry.name.endswith(".parquet"):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_size, stat.st_mtime_ns))
+        return entries
+
+    def _evict(self) -> None:
+        """
+        Removes the least recently used files until the cache is within `max_bytes`.
+        """
+        if self.max_bytes is None:
+            return
+        entries = self._entries()
+        sizes = np.array([size for _, size, _ in entries], dtype=np.int64)
+        order = np.argsort([used for _, _, used in entries], kind='stable')
+        excess = sizes.sum() - self.max_bytes
+        for position in order:
+            if excess <= 0:
+                break
+            try:
+                os.remove(entries[position][0])
+            except FileNotFoundError:
+                continue
+            excess -= sizes[position]
+            self.evictions += 1
@@ -0,0 +1,330 @@
+"""
+dataset.py
+
+This module provides a flight dataset partitioned by time bucket and spatial grid cell, for
+queries such as "all flights in this box during this hour". A manifest records the time range
+and bounding box of every partition, so a query plan reads only the partitions that can match.
+
+Classes:
+--------
+FlightDataset:
+    A spatio-temporally partitioned dataset with a query planner.
+
+Functions:
+----------
+write_dataset(obj, path, time_bucket='1h', cell_size=1.0, row_group_size=65536, compression='snappy'):
+    Writes or appends a `FlightCollection` to a spatio-temporally partitioned dataset.
+
+open_dataset(path):
+    Opens a dataset directory written by `write_dataset`.
+
+Examples:
+---------
+# Partition a day of flights by hour and 1 degree cells
+from flightpandas.dataset import write_dataset, open_dataset
+write_dataset(flight_collection, "airspace/", time_bucket="1h", cell_size=1.0)
+
+# Query a box during one hour, touching only the matching partitions
+dataset = open_dataset("airspace/")
+print(dataset.explain(bbox=(126.0, 37.0, 127.0, 38.0), start="2024-11-01 10:00", end="2024-11-01 11:00"))
+fc = dataset.query(bbox=(126.0, 37.0, 127.0, 38.0), start="2024-11-01 10:00", end="2024-11-01 11:00")
+"""
+import json
+import os
+import uuid
+
+import numpy as np
+import shapely
+from pandas import DataFrame, Timedelta, Timestamp, concat, read_parquet as read_frame
+
+from flightpandas.flight_collection import FlightCollection
+from flightpandas.io import _flight_table, _write_file, read_parquet
+
+_DATASET_FILE = "_dataset.json"
+_MANIFEST_FILE = "_manifest.parquet"
+
+
+def write_dataset(obj: FlightCollection, path, time_bucket="1h", cell_size=1.0, row_group_size=65536,
+                  compression="snappy") -> None:
+    """
+    Writes or appends a `FlightCollection` to a spatio-temporally partitioned dataset.
+
+    Every message goes to the partition of its time bucket and of the grid cell that contains it,
+    so a flight is cut into pieces wherever it crosses a bucket or cell boundary. Each partition
+    file is GeoParquet as written by `to_parquet`, with every piece of a flight within one row
+    group. Writing to an existing dataset adds new files and manifest entries.
+
+    Parameters:
+    -----------
+    obj : FlightCollection
+        The flights to write.
+    path : str
+        The dataset directory. Created if it does not exist.
+    time_bucket : str or Timedelta, optional
+        The duration of a time bucket. Default is '1h'.
+    cell_size : float, optional
+        The size of a grid cell, in the units of the coordinates. Default is 1.0.
+    row_group_size : int, optional
+        The target number of rows per row group. Default is 65536.
+    compression : str, optional
+        The Parquet compression codec. Default is 'snappy'.
+
+    Raises:
+    -------
+    ValueError:
+        If `obj` is not a `FlightCollection`, or the dataset exists with another partitioning or keys.
+    """
+    if not isinstance(obj, FlightCollection):
+        raise ValueError("Input must be of type `FlightCollection`. "
+                         f"Got {type(obj).__name__} instead.")
+
+    bucket = Timedelta(time_bucket).value
+    settings = {"time_bucket": bucket, "cell_size": cell_size, "keys": obj.key_names}
+    os.makedirs(path, exist_ok=True)
+    settings_file = os.path.join(path, _DATASET_FILE)
+    if os.path.exists(settings_file):
+        with open(settings_file) as file:
+            existing = json.load(file)
+        if existing != settings:
+            raise ValueError(f"The dataset at {path} is partitioned with {existing}, not {settings}.")
+    else:
+        with open(settings_file, "w") as file:
+            json.dump(settings, file)
+
+    table, frame, group_ids, x, y, crs, stored = _flight_table(obj)
+    stored.update(time_bucket=bucket, cell_size=cell_size)
+    times = frame[stored["time"]]
+    times = (times.dt.tz_convert("UTC") if times.dt.tz is not None else times).to_numpy().astype("M8[ns]").view("i8")
+    labels = DataFrame({
+        "time_bucket": times // bucket,
+        "cell_x": np.floor(x / cell_size).astype(np.int64),
+        "cell_y": np.floor(y / cell_size).astype(np.int64),
+    })
+
+    entries = []
+    for (time_label, cell_x, cell_y), positions in labels.groupby(list(labels.columns), sort=True).indices.items():
+        directory = f"time_bucket={time_label}/cell_x={cell_x}/cell_y={cell_y}"
+        file = f"{directory}/part-{uuid.uuid4().hex}.parquet"
+        os.makedirs(os.path.join(path, directory), exist_ok=True)
+        _write_file(table.take(positions), group_ids[positions], os.path.join(path, file), x[positions], y[positions],
+                    crs, stored, row_group_size, compression)
+        entries.append({
+            "file": file, "time_bucket": time_label, "cell_x": cell_x, "cell_y": cell_y, "rows": len(positions),
+            "start": times[positions].min(), "end": times[positions].max(),
+            "xmin": np.nanmin(x[positions]), "ymin": np.nanmin(y[positions]),
+            "xmax": np.nanmax(x[positions]), "ymax": np.nanmax(y[positions]),
+        })
+
+    manifest_file = os.path.join(path, _MANIFEST_FILE)
+    manifest = DataFrame(entries)
+    if os.path.exists(manifest_file):
+        manifest = concat([read_frame(manifest_file), manifest], ignore_index=True)
+    manifest.to_parquet(manifest_file, index=False)
+
+
+def open_dataset(path) -> "FlightDataset":
+    """
+    Opens a dataset directory written by `write_dataset`.
+
+    Parameters:
+    -----------
+    path : str
+        The dataset directory.
+
+    Returns:
+    --------
+    FlightDataset:
+        The opened dataset.
+    """
+    return FlightDataset(path)
+
+
+class FlightDataset:
+    """
+    A flight dataset partitioned by time bucket and spatial grid cell, with a query planner.
+
+    Attributes:
+    -----------
+    path : str
+        The dataset directory.
+    key_names : list
+        The columns that identify a flight.
+    time_bucket : Timedelta
+        The duration of a time bucket.
+    cell_size : float
+        The size of a grid cell.
+    manifest : DataFrame
+        One row per partition file with its bucket, cell, row count, time range and bounding box.
+
+    Methods:
+    --------
+    plan(bbox=None, polygon=None, start=None, end=None):
+        Returns the manifest entries of the partitions a query has to read.
+    explain(bbox=None, polygon=None, start=None, end=None):
+        Describes the partitions a query reads.
+    query(bbox=None, polygon=None, start=None, end=None, whole_flights=False, **kwargs):
+        Returns the flights within an area and a time window.
+    """
+
+    def __init__(self, path):
+        """
+        Opens a dataset directory.
+
+        Parameters:
+        -----------
+        path : str
+            The dataset directory written by `write_dataset`.
+        """
+        self.path = path
+        with open(os.path.join(path, _DATASET_FILE)) as file:
+            settings = json.load(file)
+        self.key_names = settings["keys"]
+        self.time_bucket = Timedelta(settings["time_bucket"])
+        self.cell_size = settings["cell_size"]
+        self.manifest = read_frame(os.path.join(path, _MANIFEST_FILE))
+
+    def plan(self, bbox=None, polygon=None, start=None, end=None) -> DataFrame:
+        """
+        Returns the manifest entries of the partitions a query has to read.
+
+        Partitions are selected by time bucket and grid cell, and then by their actual time range
+        and bounding box.
+
+        Parameters:
+        -----------
+        bbox : tuple, optional
+            The (minx, miny, maxx, maxy) box to query. Default is None.
+        polygon : shapely.Polygon, optional
+            The area to query. Default is None.
+        start, end : Timestamp or str, optional
+            The time window to query, including `start` and excluding `end`. Default is None.
+
+        Returns:
+        --------
+        DataFrame:
+            The selected manifest entries.
+        """
+        manifest = self.manifest
+        keep = np.ones(len(manifest), dtype=bool)
+        if start is not None:
+            start = _utc_ns(start)
+            keep &= (manifest["time_bucket"].to_numpy() >= start // self.time_bucket.value) & (manifest["end"].to_numpy() >= start)
+        if end is not None:
+            end = _utc_ns(end)
+            keep &= (manifest["time_bucket"].to_numpy() <= end // self.time_bucket.value) & (manifest["start"].to_numpy() < end)
+
+        bounds = polygon.bounds if polygon is not None else bbox
+        if bounds is not None:
+            minx, miny, maxx, maxy = bounds
+            keep &= (manifest["cell_x"].to_numpy() >= np.floor(minx / self.cell_size)) & (manifest["cell_x"].to_numpy() <= np.floor(maxx / self.cell_size))
+            keep &= (manifest["cell_y"].to_numpy() >= np.floor(miny / self.cell_size)) & (manifest["cell_y"].to_numpy() <= np.floor(maxy / self.cell_size))
+            keep &= (manifest["xmax"].to_numpy() >= minx) & (manifest["xmin"].to_numpy() <= maxx)
+            keep &= (manifest["ymax"].to_numpy() >= miny) & (manifest["ymin"].to_numpy() <= maxy)
+        if polygon is not None:
+            # Skip partitions whose bounding box does not touch the polygon
+            boxes = shapely.box(manifest["xmin"].to_numpy(), manifest["ymin"].to_numpy(),
+                                manifest["xmax"].to_numpy(), manifest["ymax"].to_numpy())
+            keep &= shapely.intersects(boxes, polygon)
+        return manifest[keep]
+
+    def explain(self, bbox=None, polygon=None, start=None, end=None) -> str:
+        """
+        Describes the partitions a query reads.
+
+        Parameters:
+        -----------
+        bbox, polygon, start, end
+            The query, as for `query`.
+
+        Returns:
+        --------
+        str:
+            The number of partitions and rows read out of the total, and the selected buckets and cells.
+        """
+        plan = self.plan(bbox, polygon, start, end)
+        lines = [
+            f"Partitions: {len(plan)} of {len(self.manifest)}",
+            f"Rows: {plan['rows'].sum()} of {self.manifest['rows'].sum()}",
+        ]
+        for (time_label, cell_x, cell_y), rows in plan.groupby(["time_bucket", "cell_x", "cell_y"])["rows"].sum().items():
+            bucket_start = Timestamp(int(time_label) * self.time_bucket.value)
+            lines.append(f"  {bucket_start} cell ({cell_x}, {cell_y}): {rows} rows")
+        return "\n".join(lines)
+
+    def query(self, bbox=None, polygon=None, start=None, end=None, whole_flights=False, **kwargs) -> FlightCollection:
+        """
+        Returns the flights within an area and a time window.
+
+        Only the partitions selected by `plan` are read, and the area and time filters are pushed
+        down to their row groups. The pieces of a flight from different partitions are joined and
+        sorted by time.
+
+        Parameters:
+        -----------
+        bbox : tuple, optional
+            The (minx, miny, maxx, maxy) box to query. Default is None.
+        polygon : shapely.Polygon, optional
+            The area to query. Default is None.
+        start, end : Timestamp or str, optional
+            The time window to query, including `start` and excluding `end`. Default is None.
+        whole_flights : bool, optional
+            If True, returns every message in the time window of the flights that enter the area,
+            not only the messages within the area. Default is False.
+        **kwargs : dict
+            Additional arguments for `read_parquet`, such as `columns` or `columnar`.
+
+        Returns:
+        --------
+        FlightCollection:
+            The matching flights.
+        """
+        bounds = polygon.bounds if polygon is not None else bbox
+        fc = self._read(self.plan(bbox, polygon, start, end), start=start, end=end, bbox=bounds, **kwargs)
+        if polygon is not None:
+            coordinates = fc.data.get_coordinates().to_numpy()
+            inside = shapely.contains_xy(polygon, coordinates[:, 0], coordinates[:, 1])
+            fc = fc.data[inside].groupby(self.key_names)
+
+        if whole_flights and bounds is not None:
+            keys = fc.data[self.key_names].drop_duplicates()
+            flights = keys.iloc[:, 0].tolist() if len(self.key_names) == 1 else list(keys.itertuples(index=False, name=None))
+            fc = self._read(self.plan(start=start, end=end), flights=flights, start=start, end=end, **kwargs)
+        return fc
+
+    def _read(self, plan, **kwargs) -> FlightCollection:
+        """
+        Reads the partitions of a plan and sorts the rows by (keys, time).
+
+        Parameters:
+        -----------
+        plan : DataFrame
+            The selected manifest entries.
+        **kwargs : dict
+            Additional arguments for `read_parquet`.
+
+        Returns:
+        --------
+        FlightCollection:
+            The flights read from the partitions.
+        """
+        files = [os.path.join(self.path, file) for file in plan["file"]]
+        if not files:
+            # Read no rows of any file, to get an empty collection with the stored schema
+            files = [os.path.join(self.path, self.manifest["file"].iloc[0])]
+            kwargs["flights"] = []
+        fc = read_parquet(files, keys=self.key_names, partitioning=None, **kwargs)
+
+        data = fc.data
+        group_ids = fc.ngroup().to_numpy()
+        order = np.lexsort((data.index.as_unit("ns").asi8, group_ids))
+        return data.take(order).groupby(self.key_names)
+
+
+def _utc_ns(value) -> int:
+    """
+    Converts a time to nanoseconds since the epoch, taking naive times as UTC.
+    """
+    value = Timestamp(value)
+    if value.tz is not None:
+        value = value.tz_convert("UTC").tz_localize(None)
+    return value.value
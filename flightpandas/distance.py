@@ -0,0 +1,249 @@
+"""
+distance.py
+
+This module computes dynamic time warping (DTW) distance matrices of many flights. The matrix is
+cut into square tiles of flights that are computed independently, in parallel if requested, and
+written into the output as they finish. The output can be a `.npy` file that is memory-mapped
+instead of held in memory, and a run that was interrupted resumes with the tiles it has not
+finished yet.
+
+Functions:
+----------
+dtw_distance_matrix(series, offsets=None, path=None, block_size=1000, condensed=False, n_jobs=1, backend='thread', **kwargs):
+    Computes the DTW distance matrix of a list of series in tiles.
+
+_dtw_tile(rows, cols, kwargs):
+    Computes the distances between two blocks of series, or within one block.
+
+_condensed_start(n, i, j):
+    Returns the position of the pair (i, j), with i < j, in a condensed distance matrix.
+
+_open_output(path, shape, ntiles):
+    Creates or reopens a memory-mapped output and the record of its finished tiles.
+
+Examples:
+---------
+# Compute the matrix of 50,000 flights on 16 cores into a file on disk
+values, offsets = flight_collection.sort_flights().to_offsets()
+matrix = dtw_distance_matrix(values, offsets, path="dtw.npy", n_jobs=16)
+
+# Run the same call again after an interruption to compute only the missing tiles
+matrix = dtw_distance_matrix(values, offsets, path="dtw.npy", n_jobs=16)
+
+# Read the finished matrix later without loading it
+matrix = np.load("dtw.npy", mmap_mode="r")
+
+# Store only the upper triangle, in the order of `scipy.spatial.distance.squareform`
+condensed = flight_collection.dtw_distance_matrix(condensed=True, window=50)
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import numpy as np
+
+_PROGRESS_SUFFIX = ".progress.npy"
+
+
+def _dtw_tile(rows, cols, kwargs):
+    """
+    Computes the distances between two blocks of series, or within one block.
+
+    Parameters:
+    -----------
+    rows : list
+        The series of the rows of the tile.
+    cols : list or None
+        The series of the columns of the tile, or None for a tile on the diagonal.
+    kwargs : dict
+        Additional arguments for `dtaidistance.dtw_ndim.distance_matrix_fast`.
+
+    Returns:
+    --------
+    np.ndarray:
+        The len(rows) x len(cols) distances, or the condensed distances within `rows` for a tile
+        on the diagonal.
+    """
+    from dtaidistance import dtw_ndim
+
+    if cols is None:
+        return dtw_ndim.distance_matrix_fast(rows, compact=True, **kwargs)
+    # Only the block of row-column pairs is computed, in row-major order
+    block = ((0, len(rows)), (len(rows), len(rows) + len(cols)))
+    values = dtw_ndim.distance_matrix_fast(rows + cols, block=block, compact=True, **kwargs)
+    return np.asarray(values).reshape(len(rows), len(cols))
+
+
+def _condensed_start(n, i, j):
+    """
+    Returns the position of the pair (i, j), with i < j, in a condensed distance matrix of `n` series.
+    """
+    return n * i - i * (i + 1) // 2 + (j - i - 1)
+
+
+def _open_output(path, shape, ntiles):
+    """
+    Creates or reopens a memory-mapped output and the record of its finished tiles.
+
+    The record is created before the output and removed once every tile is finished, so an output
+    without a record is complete.
+
+    Parameters:
+    -----------
+    path : str
+        The path of the `.npy` output.
+    shape : tuple
+        The shape of the output.
+    ntiles : int
+        The number of tiles.
+
+    Returns:
+    --------
+    tuple[np.memmap, np.ndarray or None]:
+        The output, and whether each tile is finished, or None if the output is complete.
+
+    Raises:
+    -------
+    ValueError:
+        If an existing output was written with a different number of series, layout or block size.
+    """
+    progress_path = path + _PROGRESS_SUFFIX
+    if os.path.exists(path):
+        output = np.lib.format.open_memmap(path, mode="r+")
+        progress = np.load(progress_path) if os.path.exists(progress_path) else None
+        if output.shape != shape or output.dtype != np.float64 or (progress is not None and len(progress) != ntiles):
+            raise ValueError(f"The distance matrix at {path} was written with different settings. "
+                             "Use another path or remove the file.")
+        return output, progress
+
+    progress = np.zeros(ntiles, dtype=bool)
+    np.save(progress_path, progress)
+    # New files are filled with zeros, which is the diagonal of a full matrix
+    return np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=shape), progress
+
+
+def dtw_distance_matrix(series, offsets=None, path=None, block_size=1000, condensed=False, n_jobs=1,
+                        backend='thread', **kwargs) -> np.ndarray:
+    """
+    Computes the DTW distance matrix of a list of series in tiles.
+
+    The matrix is cut into tiles of `block_size` x `block_size` series. Only the tiles on and above
+    the diagonal are computed, and each finished tile is written into the output, so the memory
+    use besides the output is a few tiles. With a `path`, the output is a memory-mapped `.npy`
+    file and the finished tiles are recorded next to it in `<path>.progress.npy`. Calling the
+    function again with the same path and settings computes only the missing tiles.
+
+    Parameters:
+    -----------
+    series : list or np.ndarray
+        A list of 2D arrays with one row per point, or one 2D array with the points of all
+        series, cut by `offsets`, such as the values returned by `FlightCollection.to_offsets`.
+    offsets : np.ndarray, optional
+        Series `i` is `series[offsets[i]:offsets[i + 1]]`. Required if `series` is an array.
+    path : str, optional
+        The `.npy` file to write the output to. Default is None, which keeps the output in memory.
+    block_size : int, optional
+        The number of series along each side of a tile. Default is 1000.
+    condensed : bool, optional
+        If True, returns only the distances of the pairs (i, j) with i < j, in the order of
+        `scipy.spatial.distance.squareform`. Default is False, which returns the full symmetric
+        matrix with zeros on the diagonal.
+    n_jobs : int, optional
+        The number of tiles computed in parallel. -1 uses all processors. Default is 1, which
+        lets `dtaidistance` parallelize within every tile instead.
+    backend : str, optional
+        'thread' computes the tiles in worker threads and 'process' in worker processes.
+        Default is 'thread'.
+    **kwargs : dict
+        Additional arguments for `dtaidistance.dtw_ndim.distance_matrix_fast`, such as `window`.
+
+    Returns:
+    --------
+    np.ndarray:
+        The distance matrix, or a `np.memmap` of the output file if `path` is given.
+
+    Raises:
+    -------
+    ValueError:
+        If `offsets` is missing for an array of series, `backend` is unknown, or an existing output
+        was written with different settings.
+    """
+    if backend not in ('thread', 'process'):
+        raise ValueError(f"Unknown backend: {backend}. Use 'thread' or 'process'.")
+    if isinstance(series, np.ndarray):
+        if offsets is None:
+            raise ValueError("offsets are required for an array of series.")
+        # Contiguous float64 rows, so every series is a view that dtaidistance can use directly
+        values = np.ascontiguousarray(series, dtype=np.float64)
+        series = [values[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+    else:
+        series = [np.ascontiguousarray(s, dtype=np.float64) for s in series]
+
+    n = len(series)
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    kwargs.setdefault('parallel', n_jobs == 1)
+    starts = list(range(0, n, block_size))
+    tiles = [(a, b) for a in range(len(starts)) for b in range(a, len(starts))]
+    shape = (n * (n - 1) // 2,) if condensed else (n, n)
+
+    if path is None:
+        output, progress = np.zeros(shape), np.zeros(len(tiles), dtype=bool)
+    else:
+        path = os.fspath(path)
+        output, progress = _open_output(path, shape, len(tiles))
+        if progress is None:
+            return output
+
+    def bounds(block):
+        return starts[block], min(starts[block] + block_size, n)
+
+    def task(t):
+        (r0, r1), (c0, c1) = bounds(tiles[t][0]), bounds(tiles[t][1])
+        return series[r0:r1], None if r0 == c0 else series[c0:c1], kwargs
+
+    def store(t, values):
+        (r0, r1), (c0, c1) = bounds(tiles[t][0]), bounds(tiles[t][1])
+        if condensed:
+            for i in range(r0, r1):
+                # The pairs of one row are contiguous in the condensed matrix
+                if r0 == c0:
+                    row = values[_condensed_start(r1 - r0, i - r0, i - r0 + 1):][:r1 - i - 1]
+                    j = i + 1
+                else:
+                    row, j = values[i - r0], c0
+                start = _condensed_start(n, i, j)
+                output[start:start + len(row)] = row
+        elif r0 == c0:
+            rows, cols = np.triu_indices(r1 - r0, k=1)
+            output[r0 + rows, r0 + cols] = values
+            output[r0 + cols, r0 + rows] = values
+        else:
+            output[r0:r1, c0:c1] = values
+            output[c0:c1, r0:r1] = values.T
+        progress[t] = True
+        if path is not None:
+            # The tile is on disk before it is recorded as finished
+            output.flush()
+            np.save(path + _PROGRESS_SUFFIX + ".tmp.npy", progress)
+            os.replace(path + _PROGRESS_SUFFIX + ".tmp.npy", path + _PROGRESS_SUFFIX)
+
+    pending = [t for t in range(len(tiles)) if not progress[t]]
+    if n_jobs > 1 and len(pending) > 1:
+        executor_class = ProcessPoolExecutor if backend == 'process' else ThreadPoolExecutor
+        with executor_class(max_workers=n_jobs) as executor:
+            # A few tiles per worker are queued at a time, so finished tiles do not pile up in memory
+            running = {}
+            while pending or running:
+                while pending and len(running) < 2 * n_jobs:
+                    t = pending.pop(0)
+                    running[executor.submit(_dtw_tile, *task(t))] = t
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    store(running.pop(future), future.result())
+    else:
+        for t in pending:
+            store(t, _dtw_tile(*task(t)))
+
+    if path is not None:
+        os.remove(path + _PROGRESS_SUFFIX)
+    return output
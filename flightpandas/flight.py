@@ -18,9 +18,19 @@ _flight_constructor_with_fallback(*args, **kwargs):
     Attempts to create a `Flight` instance. Falls back to a regular pandas `DataFrame` 
     if the input is invalid.
 
+_columnar_flight_constructor_with_fallback(*args, lat=None, lon=None, **kwargs):
+    Attempts to create a columnar `Flight` instance. Falls back to a regular pandas `DataFrame` 
+    if the input is invalid.
+
 _validate_attr(data, name, override=None, required=False):
     Validates and retrieves the appropriate column for a specified attribute from the data.
 
+_resample_sorted(data, group_ids, freq, keys=(), method='linear', **kwargs):
+    Resamples every group of a frame onto its own regular time grid in a single sorted pass.
+
+_linestrings(coordinates, offsets, has_m=False):
+    Builds one LineString per group of consecutive coordinate rows in a single vectorized pass.
+
 Variables:
 ----------
 _possible_column_names: dict
@@ -41,18 +51,30 @@ df = pd.DataFrame(data)
 # Create a Flight instance
 flight = Flight(df, lat="lat", lon="lon")
 
+# Keep lat/lon as plain float64 columns and build Point geometries only on demand
+columnar_flight = Flight(df, lat="lat", lon="lon", columnar=True)
+
 # Access flight methods
 resampled_flight = flight.resample('1T')
 flight_dtw_distance = flight.dtw_distance(another_flight_instance)
 flight.plot()
+
+# Write the flight as GeoParquet
+flight.to_parquet("flight.parquet")
 """
 import warnings
+from functools import partial
 
 from flightpandas.base import FlightPandasBase
 
-from geopandas import GeoDataFrame, points_from_xy
+import numpy as np
+import shapely
+from geopandas import GeoDataFrame, GeoSeries, points_from_xy
 from geopandas.array import GeometryDtype
-from pandas import DataFrame, concat
+from pandas import CategoricalDtype, DataFrame, DatetimeIndex, Series, Timedelta
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, infer_dtype, is_numeric_dtype, is_string_dtype
+from pandas.tseries.frequencies import to_offset
+from pyproj import CRS
 from pandas._typing import (
     Axis,
     IndexLabel,
@@ -76,6 +98,24 @@ def _flight_constructor_with_fallback(*args, **kwargs):
         df = DataFrame(*args, **kwargs)
     return df
 
+def _columnar_flight_constructor_with_fallback(*args, lat=None, lon=None, **kwargs):
+    """
+    Attempts to construct a columnar `Flight` object. Falls back to a `DataFrame` if construction fails.
+
+    Parameters:
+        *args: Positional arguments for the constructor.
+        lat, lon (str, optional): Column names for latitude and longitude.
+        **kwargs: Keyword arguments for the constructor.
+
+    Returns:
+        Flight or DataFrame: A columnar `Flight` object if the input is valid; otherwise, a `DataFrame`.
+    """
+    try:
+        df = Flight(*args, lat=lat, lon=lon, columnar=True, **kwargs)
+    except ValueError:
+        df = DataFrame(*args, **kwargs)
+    return df
+
 _possible_column_names = {
     'latitude': ['lat', 'latitude'],
     'longitude': ['lon', 'long', 'longitude'],
@@ -118,6 +158,271 @@ def _validate_attr(data, name, override=None, required=False):
     return attr
 
 
+_DAY_NS = 86_400_000_000_000
+
+# Approximate memory of a GEOS geometry and of each of its coordinates, measured with GEOS 3.14,
+# for the estimate of `Flight.memory_report`. A Point takes about 216 bytes.
+_GEOMETRY_OBJECT_BYTES = 192
+_COORDINATE_BYTES = 24
+
+
+def _fixed_frequency(freq):
+    """
+    Converts a resampling frequency to a fixed step in nanoseconds.
+
+    Parameters:
+        freq (str, DateOffset or Timedelta): The resampling frequency.
+
+    Returns:
+        int or None: The step between two resampled rows in nanoseconds, or None if the frequency
+        does not have a fixed duration (e.g., 'MS' or 'W-MON').
+
+    Raises:
+        ValueError: If the frequency is unknown or not positive.
+    """
+    offset = to_offset(freq)
+    try:
+        step = Timedelta(offset).value
+    except (TypeError, ValueError):
+        return None
+    if step <= 0:
+        raise ValueError(f"freq must be positive. Got {freq!r} instead.")
+    return step
+
+def _calendar_bins(index, starts, ends, freq):
+    """
+    Bins the sorted rows of every group with pandas, for frequencies without a fixed duration.
+
+    Parameters:
+        index (DatetimeIndex): The time of every row, sorted within each group.
+        starts (ndarray): The first row of every group.
+        ends (ndarray): The row after the last row of every group.
+        freq (str or DateOffset): The resampling frequency, such as 'MS' or 'W-MON'.
+
+    Returns:
+        ndarray: The bin of every row, counted from the first bin of its group.
+        ndarray: The number of bins of every group.
+        ndarray: The time of every bin in nanoseconds, group after group.
+    """
+    bins, n_bins, times = [np.array([], dtype=np.intp)], [], [np.array([], dtype=np.int64)]
+    for start, end in zip(starts, ends):
+        # The rows are in time order, so the counts of the bins give the bin of every row
+        counts = Series(0, index=index[start:end]).resample(freq).size()
+        bins.append(np.repeat(np.arange(len(counts)), counts.to_numpy()))
+        n_bins.append(len(counts))
+        times.append(counts.index.as_unit('ns').asi8)
+    return np.concatenate(bins), np.array(n_bins, dtype=np.int64), np.concatenate(times)
+
+def _fill_index(src, offsets, segments):
+    """
+    Back-fills and then forward-fills missing positions of an index array without crossing segments.
+
+    Parameters:
+        src (ndarray): Row positions per output row, with -1 marking missing values.
+        offsets (ndarray): Start of each segment in `src`, followed by the total length.
+        segments (ndarray): The segment number of each output row.
+
+    Returns:
+        ndarray: The filled row positions. Positions stay -1 if their segment has no valid value.
+    """
+    n = len(src)
+    idx = np.arange(n)
+    valid = src >= 0
+    nxt = np.minimum.accumulate(np.where(valid, idx, n)[::-1])[::-1]
+    prev = np.maximum.accumulate(np.where(valid, idx, -1))
+    filled = src.copy()
+    use_next = ~valid & (nxt < offsets[segments + 1])
+    filled[use_next] = src[nxt[use_next]]
+    use_prev = ~valid & ~use_next & (prev >= offsets[segments])
+    filled[use_prev] = src[prev[use_prev]]
+    return filled
+
+def _interpolate_linear(values, offsets, segments):
+    """
+    Linearly interpolates missing values of a regularly spaced array without crossing segments.
+
+    Leading missing values of a segment stay missing and trailing ones take the last valid value,
+    as `DataFrame.interpolate(method='linear')` does.
+
+    Parameters:
+        values (ndarray): The float64 values to interpolate, with NaN marking missing values.
+        offsets (ndarray): Start of each segment in `values`, followed by the total length.
+        segments (ndarray): The segment number of each value.
+
+    Returns:
+        ndarray: The interpolated values.
+    """
+    n = len(values)
+    idx = np.arange(n)
+    valid = ~np.isnan(values)
+    prev = np.maximum.accumulate(np.where(valid, idx, -1))
+    nxt = np.minimum.accumulate(np.where(valid, idx, n)[::-1])[::-1]
+    fill = ~valid & (prev >= offsets[segments])
+    between = fill & (nxt < offsets[segments + 1])
+    trailing = fill & ~between
+
+    out = values.copy()
+    lo, hi = prev[between], nxt[between]
+    out[between] = values[lo] + (values[hi] - values[lo]) * (idx[between] - lo) / (hi - lo)
+    out[trailing] = values[prev[trailing]]
+    return out
+
+def _resample_sorted(data, group_ids, freq, keys=(), method='linear', return_groups=False, **kwargs):
+    """
+    Resamples every group of a frame onto its own regular time grid in a single pass.
+
+    The rows are sorted once by (group, time). Each group gets a grid anchored at midnight of the
+    day of its first message, in the time zone of the index, as `resample` does. Frequencies
+    without a fixed duration, such as 'MS' or 'W-MON', and whole days in a time zone take the
+    calendar grid of `DataFrame.resample`, which is laid out one group at a time. Numeric columns are averaged per bin and then
+    interpolated across empty bins. Non-numeric columns take the first value per bin and are then
+    back-filled and forward-filled. No value is ever carried from one group into another.
+
+    Parameters:
+        data (DataFrame): The data to resample, indexed by time. Coordinates must be plain columns.
+        group_ids (ndarray): The group number of each row. Rows with a negative number are dropped.
+        freq (str, DateOffset or Timedelta): The resampling frequency.
+        keys (list, optional): Columns that are constant within a group and copied to every resampled row.
+        method (str, optional): The interpolation method. Defaults to 'linear'.
+        return_groups (bool, optional): If True, also returns the group number of every resampled row.
+        **kwargs: Additional keyword arguments for `DataFrame.interpolate`.
+
+    Returns:
+        DataFrame: The resampled data with the key columns first, followed by the numeric and
+        non-numeric columns. The rows of each group are contiguous and in time order.
+        ndarray: The group number of every resampled row, only if `return_groups` is True.
+
+    Raises:
+        ValueError: If the index is not of type datetime64 or `freq` is unknown or not positive.
+    """
+    if not is_datetime64_any_dtype(data.index):
+        raise ValueError("Index must be a datetime64 type to resample.")
+    step = _fixed_frequency(freq)
+
+    index = data.index
+    times = index.as_unit('ns').asi8
+    group_ids = np.asarray(group_ids)
+    rows = np.flatnonzero((group_ids >= 0) & ~index.isna())
+    order = rows[np.lexsort((times[rows], group_ids[rows]))]
+    t = times[order]
+    g = group_ids[order]
+
+    # Group boundaries in the sorted rows and the output grid of every group
+    starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]]) if len(order) else np.array([], dtype=np.intp)
+    ends = np.r_[starts[1:], len(order)].astype(np.intp)
+    row_segments = np.repeat(np.arange(len(starts)), ends - starts)
+    if step is not None and index.tz is not None and step % _DAY_NS == 0:
+        # Days in a time zone with daylight saving time are not all 24 hours long
+        step = None
+    if step is not None:
+        origin = t[starts] - t[starts] % _DAY_NS
+        if index.tz is not None:
+            # Midnight in the time zone of the index, as `DataFrame.resample` anchors its bins
+            origin = index[order[starts]].normalize().as_unit('ns').asi8
+        bins = (t - origin[row_segments]) // step
+        first_bin = bins[starts]
+        bins = bins - first_bin[row_segments]
+        n_bins = bins[ends - 1] + 1 if len(starts) else np.array([], dtype=np.int64)
+    else:
+        # Calendar frequencies have bins of varying length, which pandas lays out per group
+        bins, n_bins, out_times = _calendar_bins(index[order], starts, ends, freq)
+    offsets = np.r_[0, np.cumsum(n_bins)].astype(np.intp)
+    total = offsets[-1]
+    segments = np.repeat(np.arange(len(starts)), n_bins)
+    positions = offsets[row_segments] + bins
+    if step is not None:
+        out_times = origin[segments] + (first_bin[segments] + np.arange(total) - offsets[segments]) * step
+
+    out_index = DatetimeIndex(out_times.view('M8[ns]'), name=index.name)
+    if index.tz is not None:
+        out_index = out_index.tz_localize('UTC').tz_convert(index.tz)
+
+    columns = {}
+    group_rows = order[starts][segments]
+    for key in keys:
+        columns[key] = data[key].array.take(group_rows)
+
+    value_columns = [column for column in data.columns if column not in keys]
+    numeric_columns = [column for column in value_columns if is_numeric_dtype(data[column]) and not is_bool_dtype(data[column])]
+    nonnumeric_columns = [column for column in value_columns if column not in numeric_columns]
+
+    fast = method in ('linear', 'time', 'index') and not kwargs
+    numeric = {}
+    for column in numeric_columns:
+        values = data[column].to_numpy(dtype='float64', na_value=np.nan)[order]
+        valid = ~np.isnan(values)
+        sums = np.bincount(positions[valid], weights=values[valid], minlength=total)
+        counts = np.bincount(positions[valid], minlength=total)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        numeric[column] = _interpolate_linear(means, offsets, segments) if fast else means
+    if not fast and numeric:
+        # Other interpolation methods are delegated to pandas, one group at a time
+        numeric = DataFrame(numeric, index=out_index).groupby(segments).transform(
+            lambda series: series.interpolate(method, **kwargs)
+        )
+    columns.update(numeric)
+    for column in numeric_columns:
+        # Keep float32 columns of compact flights in single precision
+        if data[column].dtype == np.float32:
+            columns[column] = np.asarray(columns[column], dtype=np.float32)
+
+    for column in nonnumeric_columns:
+        notna = data[column].notna().to_numpy()[order]
+        candidates = positions[notna]
+        first = np.r_[True, candidates[1:] != candidates[:-1]] if len(candidates) else np.array([], dtype=bool)
+        src = np.full(total, -1, dtype=np.intp)
+        src[candidates[first]] = order[notna][first]
+        src = _fill_index(src, offsets, segments)
+        columns[column] = Series(data[column].array.take(src, allow_fill=True), index=out_index).infer_objects()
+
+    resampled = DataFrame(columns, index=out_index)
+    if return_groups:
+        return resampled, g[starts][segments]
+    return resampled
+
+
+def _linestrings(coordinates, offsets, has_m=False):
+    """
+    Builds one LineString per group of consecutive coordinate rows in a single vectorized pass.
+
+    Shapely constructors take X, Y and optionally Z. Coordinates with M values are encoded as ISO
+    WKB instead and decoded in one call.
+
+    Parameters:
+        coordinates (ndarray): The coordinates in group order, with columns X, Y and optionally Z, then M.
+        offsets (ndarray): The start of every group in `coordinates`, followed by the number of rows.
+        has_m (bool, optional): If True, the last column holds M values. Defaults to False.
+
+    Returns:
+        ndarray: One LineString per group, or None for groups with fewer than two points.
+    """
+    counts = np.diff(offsets)
+    valid = counts >= 2
+    rows = np.repeat(valid, counts)
+    lines = np.full(len(counts), None, dtype=object)
+    if not valid.any():
+        return lines
+
+    coordinates = np.ascontiguousarray(coordinates[rows], dtype='<f8')
+    if not has_m:
+        lines[valid] = shapely.linestrings(coordinates, indices=np.repeat(np.arange(valid.sum()), counts[valid]))
+        return lines
+
+    # ISO WKB: byte order, geometry type (2002 for XYM, 3002 for XYZM) and number of points
+    width = coordinates.shape[1] * 8
+    headers = np.zeros(valid.sum(), dtype=[('order', 'u1'), ('type', '<u4'), ('count', '<u4')])
+    headers['order'] = 1
+    headers['type'] = 2002 if coordinates.shape[1] == 3 else 3002
+    headers['count'] = counts[valid]
+    headers = headers.tobytes()
+    values = coordinates.tobytes()
+    bounds = np.r_[0, np.cumsum(counts[valid])] * width
+    wkb = [headers[9 * i:9 * i + 9] + values[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+    lines[valid] = shapely.from_wkb(np.array(wkb, dtype=object))
+    return lines
+
+
 class Flight(FlightPandasBase, GeoDataFrame):
     """
     Represents flight trajectory data with support for geographic and temporal attributes. 
@@ -128,6 +433,11 @@ class Flight(FlightPandasBase, GeoDataFrame):
 
     Methods:
         __init__: Initializes a `Flight` instance.
+        is_columnar: Whether coordinates are stored as plain latitude/longitude columns.
+        to_columnar: Converts the flight to columnar coordinate storage.
+        to_points: Converts the flight to Point geometry storage.
+        compact: Returns a copy with categorical, Arrow string and float32 columns.
+        memory_report: Breaks the memory use down by column.
         _copy_attrs: Copies metadata attributes from another `Flight` instance.
         _set_attrs: Sets metadata attributes for the flight data.
         _constructor: Defines the constructor for `Flight` objects.
@@ -138,6 +448,10 @@ class Flight(FlightPandasBase, GeoDataFrame):
         get_linestring: Creates a LineString geometry from the flight coordinates.
         get_linestring_segment: Creates a LineString geometry for a specified segment.
         set_precision: Sets the precision for geometric data.
+        to_crs: Transforms the flight to another coordinate reference system.
+        to_local: Projects the flight to a local metric frame centred on the flight.
+        from_local: Converts a flight projected by `to_local` back to latitude and longitude.
+        kinematics: Derives the distance, ground speed, track, vertical rate and turn rate.
         dtw_distance: Computes the dynamic time warping distance between two flights.
         plot: Plots the flight trajectory.
         scatter: Creates a scatter plot of the flight trajectory.
@@ -145,7 +459,7 @@ class Flight(FlightPandasBase, GeoDataFrame):
     """
     _metadata = FlightPandasBase._metadata + GeoDataFrame._metadata
     
-    def __init__(self, data, *args, lat=None, lon=None, alt=None, alt_rate=None, velocity=None, heading=None, **kwargs):
+    def __init__(self, data, *args, lat=None, lon=None, alt=None, alt_rate=None, velocity=None, heading=None, columnar=None, **kwargs):
         """
         Initializes a `Flight` instance.
 
@@ -153,6 +467,10 @@ class Flight(FlightPandasBase, GeoDataFrame):
             data (DataFrame or GeoDataFrame): The input data containing flight attributes.
             lat, lon (str, optional): Column names for latitude and longitude. Required for DataFrame input.
             alt, alt_rate, velocity, heading (str, optional): Column names for additional attributes.
+            columnar (bool, optional): If True, keeps latitude, longitude and altitude as float64 columns
+                (a float32 altitude is kept as is) and builds Point geometries only when a geometry operation needs them. If False, stores
+                coordinates as Point geometries. Defaults to None, which keeps the storage of a `Flight`
+                input and uses Point geometries otherwise.
             *args: Additional positional arguments for initialization.
             **kwargs: Additional keyword arguments for initialization.
 
@@ -160,6 +478,16 @@ class Flight(FlightPandasBase, GeoDataFrame):
             ValueError: If the input data is invalid.
         """
         if isinstance(data, Flight):
+            # Convert between storage modes if requested
+            if columnar is None:
+                columnar = data.is_columnar
+            if columnar and not data.is_columnar:
+                data = data.to_columnar(lat='lat' if lat is None else lat, lon='lon' if lon is None else lon)
+            elif not columnar and data.is_columnar:
+                data = data.to_points()
+            lat = data._latitude_column_name
+            lon = data._longitude_column_name
+
             # Copy attributes from another Flight instance
             # override attributes if specified
             alt = _validate_attr(data, 'altitude', data._altitude_column_name if alt is None else alt)
@@ -176,7 +504,16 @@ class Flight(FlightPandasBase, GeoDataFrame):
             velocity = _validate_attr(data, 'velocity', velocity)
             heading = _validate_attr(data, 'heading', heading)
 
-            data = GeoDataFrame(data.drop(columns=[lon, lat], axis=1), geometry=points_from_xy(data[lon], data[lat]), crs="EPSG:4326")
+            if columnar:
+                # A float32 altitude from `compact` is kept, other coordinates are stored as float64
+                coordinate_types = {lat: 'float64', lon: 'float64'}
+                if alt is not None and data[alt].dtype != np.float32:
+                    coordinate_types[alt] = 'float64'
+                # Copy-on-write already protects the input, so the columns can be shared with it
+                data = GeoDataFrame(data.astype(coordinate_types), copy=False)
+            else:
+                data = GeoDataFrame(data.drop(columns=[lon, lat], axis=1), geometry=points_from_xy(data[lon], data[lat]), crs="EPSG:4326")
+                lat = lon = None
         elif isinstance(data, GeoDataFrame):
             alt = _validate_attr(data, 'altitude', alt)
             alt_rate = _validate_attr(data, 'altitude_rate', alt_rate)
@@ -186,10 +523,148 @@ class Flight(FlightPandasBase, GeoDataFrame):
             raise ValueError("data must be a DataFrame or GeoDataFrame")
         
         super().__init__(data, *args, **kwargs)
+        self._set_attrs('latitude', lat)
+        self._set_attrs('longitude', lon)
         self._set_attrs('altitude', alt)
         self._set_attrs('altitude_rate', alt_rate)
         self._set_attrs('velocity', velocity)
         self._set_attrs('heading', heading)
+
+    @property
+    def is_columnar(self) -> bool:
+        """
+        Whether the coordinates are stored as plain latitude/longitude columns instead of Point geometries.
+
+        Returns:
+            bool: True if the flight uses columnar coordinate storage.
+        """
+        return (
+            self._latitude_column_name is not None
+            and self._longitude_column_name is not None
+            and (self._geometry_column_name is None or self._geometry_column_name not in self.columns)
+        )
+
+    def to_columnar(self, lat='lat', lon='lon') -> 'Flight':
+        """
+        Converts the flight to columnar coordinate storage.
+
+        Parameters:
+            lat, lon (str, optional): Column names for latitude and longitude. Defaults to 'lat' and 'lon'.
+
+        Returns:
+            Flight: A columnar `Flight` with latitude and longitude stored as float64 columns.
+        """
+        if self.is_columnar:
+            return self
+        flight = self if self.crs is None or self.crs.equals(CRS.from_epsg(4326)) else self.to_crs(epsg=4326)
+        coordinates = GeoDataFrame.get_coordinates(flight)
+        data = DataFrame(flight.drop(columns=flight._geometry_column_name))
+        data[lat] = coordinates['y'].to_numpy()
+        data[lon] = coordinates['x'].to_numpy()
+        columnar = Flight(data, lat=lat, lon=lon, columnar=True)
+        columnar._copy_attrs(self)
+        return columnar
+
+    def to_points(self) -> 'Flight':
+        """
+        Converts the flight to Point geometry storage.
+
+        Returns:
+            Flight: A `Flight` with coordinates stored as Point geometries.
+        """
+        if not self.is_columnar:
+            return self
+        points = Flight(DataFrame(self), lat=self._latitude_column_name, lon=self._longitude_column_name)
+        points._copy_attrs(self)
+        return points
+    
+    def compact(self, categories=None, max_category_ratio=0.5) -> 'Flight':
+        """
+        Returns a copy of the flight with compact column types.
+
+        - Text columns become categoricals if they have few distinct values, such as identifiers
+          and callsigns, and Arrow-backed strings otherwise.
+        - The float64 altitude, altitude rate, velocity and heading columns become float32.
+        - Latitude, longitude and the time index keep their full precision.
+
+        The types are kept by `resample`, `TimeGapSplitter` and the simplifiers.
+
+        Parameters:
+            categories (list, optional): Columns that always become categoricals, such as the flight keys.
+                Defaults to None.
+            max_category_ratio (float, optional): Text columns with at most this many distinct values per row
+                become categoricals. Defaults to 0.5.
+
+        Returns:
+            Flight: The compact flight.
+        """
+        categories = list(categories or [])
+        dtypes = {}
+        for column in self.columns:
+            dtype = self[column].dtype
+            if column == self._geometry_column_name or isinstance(dtype, (GeometryDtype, CategoricalDtype)):
+                continue
+            if column in categories:
+                dtypes[column] = 'category'
+            elif is_string_dtype(dtype) and infer_dtype(self[column], skipna=True) in ('string', 'empty'):
+                ratio = self[column].nunique() / max(len(self), 1)
+                dtypes[column] = 'category' if ratio <= max_category_ratio else 'string[pyarrow]'
+        for column in (self._altitude_column_name, self._altitude_rate_column_name,
+                       self._velocity_column_name, self._heading_column_name):
+            if column is not None and self[column].dtype == np.float64:
+                dtypes[column] = 'float32'
+
+        frame, lat, lon = self._coordinate_frame()
+        frame = frame.astype(dtypes)
+        if self.is_columnar:
+            compact = Flight(frame, lat=lat, lon=lon, columnar=True)
+        else:
+            compact = Flight(frame, lat=lat, lon=lon, crs=self.crs)
+        compact._copy_attrs(self)
+        return compact
+
+    def memory_report(self) -> DataFrame:
+        """
+        Breaks the memory use of the flight down by column, including the contents of text columns.
+
+        A geometry column only holds pointers to its geometries. The GEOS objects they point to are
+        reported in a separate '<column>_objects' row, estimated from the number of geometries and
+        coordinates, since GEOS memory is not visible to pandas.
+
+        Returns:
+            DataFrame: One row per column and one for the index, with the column type, the bytes
+            used, the bytes per row and the share of the total, an estimate of the GEOS objects of
+            every geometry column, and a 'total' row.
+        """
+        usage = self.memory_usage(index=True, deep=True)
+        dtypes = [str(self.index.dtype) if name == 'Index' else str(self[name].dtype) for name in usage.index]
+        report = DataFrame({'dtype': dtypes, 'bytes': usage.to_numpy()}, index=usage.index)
+        for name in usage.index:
+            if name != 'Index' and isinstance(self[name].dtype, GeometryDtype):
+                geometries = self[name].array._data
+                report.loc[f'{name}_objects'] = ['geos', _GEOMETRY_OBJECT_BYTES * int((~shapely.is_missing(geometries)).sum())
+                                                 + _COORDINATE_BYTES * int(shapely.get_num_coordinates(geometries).sum())]
+        report['bytes'] = report['bytes'].astype(np.int64)
+        total = int(report['bytes'].sum())
+        report.loc['total'] = ['', total]
+        report['bytes_per_row'] = report['bytes'] / max(len(self), 1)
+        report['share'] = report['bytes'] / max(total, 1)
+        return report
+
+    def _coordinate_frame(self):
+        """
+        Returns the flight data as a plain `DataFrame` with the coordinates stored as columns.
+
+        Returns:
+            tuple[DataFrame, str, str]: The data, and the names of the latitude and longitude columns.
+        """
+        if self.is_columnar:
+            return DataFrame(self), self._latitude_column_name, self._longitude_column_name
+        coordinates = GeoDataFrame.get_coordinates(self)
+        data = DataFrame(self).drop(columns=self._geometry_column_name)
+        data['lon'] = coordinates['x'].to_numpy()
+        data['lat'] = coordinates['y'].to_numpy()
+        return data, 'lat', 'lon'
     
     def _copy_attrs(self, other):
         """
@@ -213,13 +688,40 @@ class Flight(FlightPandasBase, GeoDataFrame):
         """
         setattr(self, f"_{name}_column_name", value)
 
+    def _get_geometry(self):
+        if self.is_columnar:
+            return GeoSeries(
+                points_from_xy(self[self._longitude_column_name], self[self._latitude_column_name]),
+                index=self.index,
+                crs="EPSG:4326",
+                name="geometry",
+            )
+        return super()._get_geometry()
+
+    geometry = property(fget=_get_geometry, fset=GeoDataFrame._set_geometry, doc="Geometry data for Flight")
+
+    @property
+    def crs(self):
+        if self.is_columnar:
+            return CRS.from_epsg(4326)
+        return GeoDataFrame.crs.fget(self)
+
+    @crs.setter
+    def crs(self, value):
+        GeoDataFrame.crs.fset(self, value)
+
     @property
     def _constructor(self):
+        if self.is_columnar:
+            return partial(_columnar_flight_constructor_with_fallback, lat=self._latitude_column_name, lon=self._longitude_column_name)
         return _flight_constructor_with_fallback   
     
     def _constructor_from_mgr(self, mgr, axes):
         # TOOD: Change time column to index
         if not any(isinstance(block.dtype, GeometryDtype) for block in mgr.blocks):
+            if self.is_columnar and self._latitude_column_name in mgr.axes[0] and self._longitude_column_name in mgr.axes[0]:
+                # Columnar flights keep their coordinates as plain columns
+                return Flight._from_mgr(mgr, axes)
             return _flight_constructor_with_fallback(DataFrame._from_mgr(mgr, axes))
         flight = Flight._from_mgr(mgr, axes)
         return flight
@@ -235,21 +737,34 @@ class Flight(FlightPandasBase, GeoDataFrame):
         else:
             return super().__getitem__(key)
 
+    def __delitem__(self, key):
+        if not self.is_columnar:
+            return super().__delitem__(key)
+        DataFrame.__delitem__(self, key)
+        if self._latitude_column_name not in self.columns or self._longitude_column_name not in self.columns:
+            self.__class__ = DataFrame
+
     def __finalize__(self, other, method=None, **kwargs):
         """propagate metadata from other to self"""
         self = super().__finalize__(other, method=method, **kwargs)
 
         for name in self._metadata:
             attr = object.__getattribute__(self, name)
+            if attr is None:
+                continue
 
-            # Expect only one column
-            if (self.columns == attr).sum() != 1:
+            # Expect only one column. A hash lookup keeps slicing cheap for many small flights
+            try:
+                unique = isinstance(self.columns.get_loc(attr), int)
+            except (KeyError, TypeError):
+                unique = False
+            if not unique:
                 object.__setattr__(self, name, None)
 
         return self
 
     
-    def groupby(self, by=None, axis=0, level=None, as_index=True, sort=True, group_keys=True, observed=False, dropna=True):
+    def groupby(self, by=None, axis=0, level=None, as_index=True, sort=True, group_keys=True, observed=True, dropna=True):
         """
         Groups the flight data by specified keys or levels.
 
@@ -260,7 +775,8 @@ class Flight(FlightPandasBase, GeoDataFrame):
             as_index (bool, optional): Whether to return grouped data with indices. Defaults to True.
             sort (bool, optional): Whether to sort the group keys. Defaults to True.
             group_keys (bool, optional): Include group keys in the grouped data. Defaults to True.
-            observed (bool, optional): For categorical data, observe the group keys. Defaults to False.
+            observed (bool, optional): For categorical keys, only form groups for the values that occur,
+                as compact flights need. Defaults to True.
             dropna (bool, optional): Exclude groups with NaN keys. Defaults to True.
 
         Returns:
@@ -310,22 +826,30 @@ class Flight(FlightPandasBase, GeoDataFrame):
         Returns:
             list[tuple[float, float]]: A list of coordinates (and altitude if specified).
         """
-        coordinates = super().get_coordinates()
+        if self.is_columnar:
+            coordinates = DataFrame({'x': self[self._longitude_column_name], 'y': self[self._latitude_column_name]}, index=self.index)
+        else:
+            coordinates = super().get_coordinates()
         if include_altitude:
             coordinates['z'] = self[self._altitude_column_name]
         return coordinates
     
-    def get_linestring(self):
+    def get_linestring(self, include_altitude=False, include_time=False):
         """
         Creates a LineString geometry from the flight coordinates.
 
+        Parameters:
+            include_altitude (bool, optional): If True, stores the altitude as Z values. Defaults to False.
+            include_time (bool, optional): If True, stores the time as M values, in seconds since the
+                Unix epoch. Defaults to False.
+
         Returns:
-            LineString: The LineString geometry of the flight trajectory.
+            LineString: The LineString geometry of the flight trajectory, or None for fewer than two points.
         """
-        if len(self) < 2:
-            return None
-        from shapely.geometry import LineString
-        return LineString(self.get_coordinates())
+        coordinates = self.get_coordinates(include_altitude).to_numpy(dtype='float64')
+        if include_time:
+            coordinates = np.column_stack([coordinates, self.index.as_unit('ns').asi8 / 1e9])
+        return _linestrings(coordinates, np.array([0, len(self)]), include_time)[0]
     
     def get_linestring_segment(self, start, end):
         """
@@ -351,8 +875,95 @@ class Flight(FlightPandasBase, GeoDataFrame):
         Returns:
             Flight: The updated `Flight` instance.
         """
+        if self.is_columnar:
+            # Snap the coordinate columns to the precision grid, as shapely does for Points
+            if precision:
+                for name in (self._longitude_column_name, self._latitude_column_name):
+                    self[name] = np.round(self[name].to_numpy() / precision) * precision
+            return self
         self[self._geometry_column_name] = self[self._geometry_column_name].set_precision(precision)
         return self
+
+    def to_parquet(self, path, partition_by=None, **kwargs):
+        """
+        Writes the flight as GeoParquet, sorted by time within one row group and with the column
+        roles stored in the file. See `flightpandas.io.to_parquet`.
+
+        Parameters:
+            path (str): The file to write, or the root directory if `partition_by` is set.
+            partition_by (str, optional): 'date' to write one partition per day. Defaults to None.
+            **kwargs: Additional keyword arguments passed to `flightpandas.io.to_parquet`.
+        """
+        from flightpandas.io import to_parquet
+        to_parquet(self, path, partition_by=partition_by, **kwargs)
+
+    def to_crs(self, crs=None, epsg=None, inplace=False):
+        """
+        Transforms the flight to another coordinate reference system.
+
+        Columnar flights are converted to Point geometry storage first, since their coordinate
+        columns always hold latitude and longitude.
+
+        Parameters:
+            crs (dict or str, optional): The target CRS.
+            epsg (int, optional): The target CRS as an EPSG code.
+            inplace (bool, optional): If True, transforms the flight in place. Not supported for
+                columnar flights. Defaults to False.
+
+        Returns:
+            Flight: The transformed `Flight` instance, or None if `inplace` is True.
+
+        Raises:
+            ValueError: If `inplace` is True for a columnar flight.
+        """
+        if self.is_columnar:
+            if inplace:
+                raise ValueError("inplace transformation is not supported for columnar flights")
+            return self.to_points().to_crs(crs, epsg)
+        return super().to_crs(crs, epsg, inplace)
+
+    def to_local(self, method='aeqd', origin='centroid') -> 'Flight':
+        """
+        Projects the flight to a local metric frame centred on the flight.
+
+        Parameters:
+            method (str, optional): 'aeqd' for the azimuthal equidistant projection, or 'enu' for the
+                east-north-up tangent plane with the altitude in metres. Defaults to 'aeqd'.
+            origin (str or tuple, optional): 'centroid', 'first' for the first point in time, or a
+                (lat, lon) or (lat, lon, height) tuple. Defaults to 'centroid'.
+
+        Returns:
+            Flight: A `Flight` with Point geometries in metres east and north of the origin, no CRS,
+                and the origin in the `origin_lat` and `origin_lon` columns.
+        """
+        from flightpandas.projection import _to_local
+        return _to_local(self, np.zeros(len(self), dtype=np.intp), method, origin)
+
+    def kinematics(self, overwrite=False) -> 'Flight':
+        """
+        Derives the distance, ground speed, track, vertical rate and turn rate of the flight.
+
+        Parameters:
+            overwrite (bool, optional): If True, replaces existing columns with the names of the derived
+                columns and sets the velocity, heading and altitude rate to the derived columns even if the
+                flight already has them. If False, existing columns are kept. Defaults to False.
+
+        Returns:
+            Flight: The flight with the `distance`, `cumulative_distance`, `groundspeed`, `track`,
+                `vertrate` and `turn_rate` columns, as described in `flightpandas.kinematics`.
+        """
+        from flightpandas.kinematics import _kinematics
+        return _kinematics(self, np.zeros(len(self), dtype=np.intp), overwrite=overwrite)
+
+    def from_local(self) -> 'Flight':
+        """
+        Converts a flight projected by `to_local` back to latitude and longitude.
+
+        Returns:
+            Flight: The flight with the coordinate names, storage and CRS it had before `to_local`.
+        """
+        from flightpandas.projection import _from_local
+        return _from_local(self)
     
     def dtw_distance(self, other, *args, **kwargs):
         """
@@ -407,24 +1018,32 @@ class Flight(FlightPandasBase, GeoDataFrame):
         from flightpandas.plotter import FlightPlotter
         return FlightPlotter(self, *args, **kwargs).scatter()
     
-    def resample(self, freq='1s', method='linear', **kwargs):
+    def resample(self, freq='1s', method='linear', max_gap=None, **kwargs):
         """
         Resamples the flight trajectory to a specified frequency.
 
         Parameters:
-            freq (str, optional): The resampling frequency (e.g., '1T' for 1 minute). Defaults to '1s'.
+            freq (str, optional): The resampling frequency (e.g., '1min' for 1 minute). Calendar frequencies such as
+                'MS' are resampled group by group with pandas. Defaults to '1s'.
             method (str, optional): The interpolation method. Defaults to 'linear'.
+            max_gap (Timedelta or str, optional): If set, splits the trajectory wherever two messages are more
+                than `max_gap` apart, as `TimeGapSplitter` does, and resamples each section on its own. No rows
+                are generated inside the gaps. Defaults to None.
             **kwargs: Additional keyword arguments for interpolation.
 
         Returns:
             Flight: A new `Flight` instance with the resampled trajectory.
         """
-        coordinates = self.get_coordinates().rename(columns={'x': 'lon', 'y': 'lat'})
-        data = concat([coordinates, self.select_dtypes('number')], axis=1)
-        data_nonnumeric = self.select_dtypes(exclude='number').drop(columns=self._geometry_column_name)
-        resampled = data.resample(freq).mean().interpolate(method, **kwargs)
-        resampled_nonnumeric = data_nonnumeric.resample(freq).first().infer_objects(copy=False).bfill().ffill()
-        resampled = Flight(concat([resampled, resampled_nonnumeric], axis=1), crs=self.crs)
+        data, lat, lon = self._coordinate_frame()
+        group_ids = np.zeros(len(data), dtype=np.intp)
+        if max_gap is not None:
+            from flightpandas.splitter import _segment_ids
+            group_ids = _segment_ids(data.index, group_ids, max_gap)
+
+        resampled = _resample_sorted(data, group_ids, freq, method=method, **kwargs)
+        if self.is_columnar:
+            resampled = Flight(resampled, lat=lat, lon=lon, columnar=True)
+        else:
+            resampled = Flight(resampled, lat=lat, lon=lon, crs=self.crs)
         resampled._copy_attrs(self)
         return resampled
-    
\ No newline at end of file
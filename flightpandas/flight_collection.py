@@ -17,6 +17,8 @@ Functions:
 - resample: Resamples flight trajectories to a specified temporal resolution.
 - set_precision: Sets the precision for geometric data.
 - to_crs: Transforms the coordinate reference system of the flight collection.
+- to_local: Projects every flight to a local metric frame centred on the flight.
+- kinematics: Derives the distance, ground speed, track, vertical rate and turn rate of every flight.
 - to_latlon: Converts coordinates to latitude and longitude (EPSG:4326).
 - to_xy: Converts coordinates to projected coordinates (EPSG:3857).
 
@@ -29,15 +31,27 @@ collection = FlightCollection(df, keys="flight_id", lat="latitude", lon="longitu
 # Access a flight group
 flight = collection.flights["flight_id_1"]
 
+# Access flights by position
+first_flight = collection.flights[0]
+first_ten = collection.flights[:10]
+
+# Read two flights from a Parquet archive
+collection = FlightCollection.read_parquet("archive/", keys="flight_id", flights=["flight_id_1", "flight_id_2"])
+
 # Compute DTW distance matrix
 dtw_matrix = collection.dtw_distance_matrix()
 """
 
-from flightpandas.flight import Flight
-from pandas import Series, concat
+from functools import cached_property
+
+import numpy as np
+
+from flightpandas.flight import Flight, _linestrings, _resample_sorted
+from flightpandas.profiling import profiled
+from pandas import DataFrame, Series
 from pandas.core.groupby import GroupBy, DataFrameGroupBy
 from pandas._typing import IndexLabel
-from geopandas import GeoSeries
+from geopandas import GeoDataFrame, GeoSeries
 from collections.abc import (
     Callable,
     Hashable,
@@ -58,6 +72,9 @@ class _CollectionIndexer:
     """
     A utility class for indexing `FlightCollection` by group keys or indices.
 
+    Positions refer to the groups in key order and are resolved through the key index of the
+    collection, which is built once and reused by every indexer of the collection.
+
     Attributes:
     -----------
     collection : FlightCollection
@@ -68,7 +85,10 @@ class _CollectionIndexer:
     __call__(key):
         Retrieves a `Flight` object by group key.
     __getitem__(key):
-        Retrieves a `Flight` object by integer index.
+        Retrieves a `Flight` object by integer index, or a list of `Flight` objects by slice or
+        list of indices.
+    take(positions):
+        Retrieves a list of `Flight` objects by integer indices.
     """
     def __init__(self, collection):
         """
@@ -81,14 +101,60 @@ class _CollectionIndexer:
         """
         self.collection = collection
 
+    def __len__(self) -> int:
+        return len(self.collection._key_index[0])
+
     def __call__(self, key) -> Flight:
         return self.collection.get_group(key)
     
-    def __getitem__(self, key) -> Flight:
-        if not isinstance(key, int):
-            raise ValueError("Only integer indexing is supported\nTo get a group by key, use `fc.flights(key)`")
-        indices = list(self.collection.indices.keys())
-        return self.collection.get_group(indices[key])
+    def __getitem__(self, key) -> Flight | list[Flight]:
+        if isinstance(key, (int, np.integer)):
+            _, order, offsets = self.collection._key_index
+            position = range(len(offsets) - 1)[key]
+            if order is None:
+                return self.collection.obj.iloc[offsets[position]:offsets[position + 1]]
+            return self.collection.obj.take(order[offsets[position]:offsets[position + 1]])
+        if isinstance(key, slice):
+            return self.take(np.arange(len(self))[key])
+        if isinstance(key, (list, np.ndarray, Series)):
+            return self.take(key)
+        raise ValueError("Only integer, slice and list indexing is supported\nTo get a group by key, use `fc.flights(key)`")
+
+    def take(self, positions) -> list[Flight]:
+        """
+        Retrieves the flights at the given positions. The rows of a contiguous collection are
+        sliced without copying, and other collections gather their rows in a single take.
+
+        Parameters:
+        -----------
+        positions : list or np.ndarray
+            The integer indices of the flights, negative indices counting from the end.
+
+        Returns:
+        --------
+        list[Flight]:
+            The flights, in the order of `positions`.
+
+        Raises:
+        -------
+        IndexError:
+            If a position is out of range.
+        """
+        _, order, offsets = self.collection._key_index
+        ngroups = len(offsets) - 1
+        positions = np.asarray(positions, dtype=np.intp).reshape(-1)
+        if ((positions < -ngroups) | (positions >= ngroups)).any():
+            raise IndexError(f"Flight index out of range for {ngroups} flights")
+        positions = np.where(positions < 0, positions + ngroups, positions)
+
+        starts, ends = offsets[positions], offsets[positions + 1]
+        if order is None:
+            return [self.collection.obj.iloc[start:end] for start, end in zip(starts, ends)]
+        lengths = ends - starts
+        bounds = np.r_[0, np.cumsum(lengths)]
+        rows = order[np.repeat(starts - bounds[:-1], lengths) + np.arange(bounds[-1])]
+        data = self.collection.obj.take(rows)
+        return [data.iloc[bounds[i]:bounds[i + 1]] for i in range(len(positions))]
     
 
 class FlightCollection(DataFrameGroupBy, GroupBy[Flight]):
@@ -102,28 +168,52 @@ class FlightCollection(DataFrameGroupBy, GroupBy[Flight]):
         The names of the keys used for grouping the collection.
     data : Flight
         The underlying flight data as a `Flight` object.
+    is_contiguous : bool
+        True if the rows of every flight are contiguous and in key order.
+    offsets : np.ndarray
+        The start of every flight in the rows sorted by key, followed by the number of rows.
 
     Methods:
     --------
     __iter__():
         Iterates over the groups in the collection.
-    dtw_distance_matrix(include_altitude=False, **kwargs):
-        Computes the DTW distance matrix for the collection.
-    get_linestring():
-        Aggregates flight data into LineString geometries.
-    resample(freq='1s', method='linear', **kwargs):
+    read_parquet(path, keys=None, **kwargs):
+        Reads flights from Parquet with predicate pushdown and column projection.
+    iter_chunks(path, max_rows=1_000_000, keys=None, **kwargs):
+        Reads flights from Parquet in chunks of whole flights.
+    to_parquet(path, partition_by=None, **kwargs):
+        Writes the collection as GeoParquet with every flight within one row group.
+    compact(max_category_ratio=0.5):
+        Returns a copy with categorical keys, compact text columns and float32 attributes.
+    memory_report():
+        Breaks the memory use down by column.
+    sort_flights():
+        Returns a contiguous copy sorted by (keys, time), where every flight is a slice.
+    to_offsets(columns=None):
+        Returns column values in key order with the offsets of every flight.
+    dtw_distance_matrix(include_altitude=False, coordinates=None, path=None, block_size=1000, condensed=False, n_jobs=1, backend='thread', **kwargs):
+        Computes the DTW distance matrix for the collection in tiles, optionally into a memory-mapped file.
+    get_linestring(include_altitude=False, include_time=False):
+        Aggregates flight data into LineString geometries, optionally with Z and M values.
+    resample(freq='1s', method='linear', max_gap=None, **kwargs):
         Resamples the flight trajectories to a specified temporal resolution.
     set_precision(precision):
         Sets the precision for geometric data in the collection.
     to_crs(crs=None, epsg=None, **kwargs):
         Transforms the coordinate reference system of the collection.
+    to_local(method='aeqd', origin='centroid'):
+        Projects every flight to a local metric frame centred on the flight.
+    from_local():
+        Converts a collection projected by `to_local` back to latitude and longitude.
+    kinematics(overwrite=False):
+        Derives the distance, ground speed, track, vertical rate and turn rate of every flight.
     to_latlon():
         Converts coordinates to latitude and longitude (EPSG:4326).
     to_xy():
         Converts coordinates to projected coordinates (EPSG:3857).
     """
 
-    def __init__(self, obj, keys=None, level=None, time=None, lat=None, lon=None, alt=None, alt_rate=None, velocity=None, heading=None, **kwargs):
+    def __init__(self, obj, keys=None, level=None, time=None, lat=None, lon=None, alt=None, alt_rate=None, velocity=None, heading=None, columnar=None, **kwargs):
         """
         Initializes a `FlightCollection` instance.
 
@@ -137,6 +227,9 @@ class FlightCollection(DataFrameGroupBy, GroupBy[Flight]):
             Level in the index to use for grouping.
         time, lat, lon, alt, alt_rate, velocity, heading : str, optional
             Column names for flight attributes.
+        columnar : bool, optional
+            If True, stores coordinates as plain float64 columns instead of Point geometries.
+            See `Flight` for details.
         **kwargs : dict
             Additional arguments for the constructor.
 
@@ -149,7 +242,9 @@ class FlightCollection(DataFrameGroupBy, GroupBy[Flight]):
             raise ValueError("You have to supply one of 'keys' or 'level'")
         
         if not isinstance(obj, Flight):
-            obj = Flight(obj, lat=lat, lon=lon, alt=alt, alt_rate=alt_rate, velocity=velocity, heading=heading)
+            obj = Flight(obj, lat=lat, lon=lon, alt=alt, alt_rate=alt_rate, velocity=velocity, heading=heading, columnar=columnar)
+        elif columnar is not None and columnar != obj.is_columnar:
+            obj = Flight(obj, columnar=columnar)
         
         self.key_names = []
         if isinstance(keys, str):
@@ -173,6 +268,8 @@ class FlightCollection(DataFrameGroupBy, GroupBy[Flight]):
                     except KeyError:
                         pass
 
+        # Categorical keys of compact flights only form groups for the flights that occur
+        kwargs.setdefault('observed', True)
         super().__init__(obj, keys=keys, level=level, **kwargs)
 
 
@@ -209,6 +306,74 @@ class FlightCollection(DataFrameGroupBy, GroupBy[Flight]):
         
         return super()._gotitem(key, ndim, subset)
 
+    @classmethod
+    def read_parquet(cls, path, keys=None, **kwargs) -> 'FlightCollection':
+        """
+        Reads flights from a Parquet file or dataset, pushing key, time and bounding box filters
+        down to the row groups. See `flightpandas.io.read_parquet`.
+
+        Parameters:
+        -----------
+        path : str or list
+            A Parquet file, a directory of Parquet files or a list of files.
+        keys : str or list, optional
+            The column or columns that identify a flight. Default is None, which uses the keys
+            stored by `to_parquet`.
+        **kwargs : dict
+            The filters, columns and column names passed to `flightpandas.io.read_parquet`.
+
+        Returns:
+        --------
+        FlightCollection:
+            The flights that match the filters.
+        """
+        from flightpandas.io import read_parquet
+        return read_parquet(path, keys, **kwargs)
+
+    @classmethod
+    def iter_chunks(cls, path, max_rows=1_000_000, keys=None, **kwargs) -> Iterator['FlightCollection']:
+        """
+        Reads flights from Parquet in chunks of whole flights, holding about `max_rows` rows at a
+        time. See `flightpandas.io.iter_parquet`.
+
+        Parameters:
+        -----------
+        path : str or list
+            A Parquet file, a directory of Parquet files or a list of files.
+        max_rows : int, optional
+            The number of rows after which a chunk is yielded. Default is 1,000,000.
+        keys : str or list, optional
+            The column or columns that identify a flight. Default is None, which uses the keys
+            stored by `to_parquet`.
+        **kwargs : dict
+            The filters, columns and column names, and `check_contiguous`, passed to
+            `flightpandas.io.iter_parquet`.
+
+        Yields:
+        -------
+        FlightCollection:
+            The flights of the next chunk.
+        """
+        from flightpandas.io import iter_parquet
+        return iter_parquet(path, max_rows, keys, **kwargs)
+
+    def to_parquet(self, path, partition_by=None, **kwargs) -> None:
+        """
+        Writes the collection as GeoParquet, sorted by (keys, time) with every flight within one
+        row group and the column roles stored in the file. See `flightpandas.io.to_parquet`.
+
+        Parameters:
+        -----------
+        path : str
+            The file to write, or the root directory if `partition_by` is set.
+        partition_by : str or list, optional
+            'date', 'key_hash' or both. Default is None, which writes a single file.
+        **kwargs : dict
+            Additional arguments passed to `flightpandas.io.to_parquet`.
+        """
+        from flightpandas.io import to_parquet
+        to_parquet(self, path, partition_by=partition_by, **kwargs)
+
     @property
     def data(self):
         return self.obj
@@ -216,58 +381,227 @@ class FlightCollection(DataFrameGroupBy, GroupBy[Flight]):
     @property
     def flights(self):
         return _CollectionIndexer(self)
+
+    def compact(self, max_category_ratio=0.5) -> 'FlightCollection':
+        """
+        Returns a copy of the collection with compact column types: categorical keys, categorical
+        or Arrow-backed text columns and float32 flight attributes. See `Flight.compact`.
+
+        Parameters:
+        -----------
+        max_category_ratio : float, optional
+            Text columns with at most this many distinct values per row become categoricals.
+            Default is 0.5.
+
+        Returns:
+        --------
+        FlightCollection:
+            The compact collection.
+        """
+        return FlightCollection(self.data.compact(self.key_names, max_category_ratio), keys=self.key_names)
+
+    def memory_report(self) -> DataFrame:
+        """
+        Breaks the memory use of the collection down by column. See `Flight.memory_report`.
+
+        Returns:
+        --------
+        DataFrame:
+            One row per column and one for the index, with the column type, the bytes used, the
+            bytes per row and the share of the total, an estimate of the GEOS objects of every
+            geometry column, and a 'total' row.
+        """
+        return self.data.memory_report()
+
+    @property
+    def is_contiguous(self) -> bool:
+        """
+        True if the rows of every flight are contiguous and in key order, so that `offsets`
+        describes the data directly and flights are slices of it.
+        """
+        return self._key_index[1] is None
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """
+        The start of every flight in the rows sorted by key, followed by the number of rows.
+        Flight `i` is rows `offsets[i]:offsets[i + 1]` of a contiguous collection.
+        """
+        return self._key_index[2]
+
+    def sort_flights(self) -> 'FlightCollection':
+        """
+        Returns a contiguous copy of the collection, sorted by (keys, time).
+
+        Every flight of the result is a slice of its data, so `flights[i]` does not copy rows and
+        `to_offsets` returns views. Rows without a key are dropped.
+
+        Returns:
+        --------
+        FlightCollection:
+            The sorted collection.
+        """
+        group_ids = self._group_ids()
+        times = self.obj.index.as_unit("ns").asi8
+        rows = np.flatnonzero(group_ids >= 0)
+        order = rows[np.lexsort((times[rows], group_ids[rows]))]
+        return FlightCollection(self.obj.take(order), keys=self.key_names)
+
+    def to_offsets(self, columns=None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the values of some columns in key order, with the offsets of every flight, for
+        per-flight kernels written over NumPy arrays.
+
+        Parameters:
+        -----------
+        columns : list, optional
+            The columns to return. Default is None, which returns the longitude and latitude.
+
+        Returns:
+        --------
+        tuple[np.ndarray, np.ndarray]:
+            - values (np.ndarray): A 2D array with one row per message and one column per column.
+            - offsets (np.ndarray): Flight `i` is `values[offsets[i]:offsets[i + 1]]`.
+
+        Examples:
+        ---------
+        values, offsets = collection.sort_flights().to_offsets()
+        lengths = [np.hypot(*np.diff(values[start:end], axis=0).T).sum() for start, end in zip(offsets[:-1], offsets[1:])]
+        """
+        _, order, offsets = self._key_index
+        if columns is None:
+            values = self.obj.get_coordinates().to_numpy()
+        else:
+            values = self.obj[list(columns)].to_numpy()
+        if order is not None:
+            values = values[order]
+        return values, offsets
+
+    @cached_property
+    def _key_index(self):
+        """
+        The key index of the collection, built on first use.
+
+        Returns:
+        --------
+        tuple:
+            - keys (Index): The group keys, in group order.
+            - order (np.ndarray | None): The row positions sorted by group, in their original order
+              within a group. None if the collection is contiguous.
+            - offsets (np.ndarray): The start of every group in `order`, followed by the number of grouped rows.
+        """
+        group_ids = self._group_ids()
+        keys = self._grouper.result_index
+        rows = np.flatnonzero(group_ids >= 0)
+        offsets = np.r_[0, np.cumsum(np.bincount(group_ids[rows], minlength=len(keys)))]
+        if len(rows) == len(group_ids) and (np.diff(group_ids) >= 0).all():
+            return keys, None, offsets
+        order = rows[np.argsort(group_ids[rows], kind="stable")]
+        return keys, order, offsets
+
+    def _group_ids(self) -> np.ndarray:
+        """
+        Returns the group number of every row, with -1 for rows without a group.
+        """
+        group_ids = self.ngroup().to_numpy()
+        return np.where(np.isnan(group_ids), -1, group_ids).astype(np.intp) if group_ids.dtype.kind == "f" else group_ids
     
-    def dtw_distance_matrix(self, include_altitude=False, **kwargs):
+    @profiled
+    def dtw_distance_matrix(self, include_altitude=False, coordinates=None, path=None, block_size=1000,
+                            condensed=False, n_jobs=1, backend='thread', **kwargs):
         """
         Computes the Dynamic Time Warping (DTW) distance matrix for the flight trajectories.
 
+        The coordinates of all flights are read once in key order and every flight is passed to
+        `dtaidistance` as a view of them. The matrix is computed in tiles, as described in
+        `flightpandas.distance.dtw_distance_matrix`, so it can be written to a memory-mapped file,
+        computed in parallel and resumed after an interruption.
+
         Parameters:
         -----------
         include_altitude : bool, optional
             If True, includes altitude in the distance calculation. Defaults to False.
+        coordinates : tuple, optional
+            Precomputed coordinates as returned by `to_offsets`, a (values, offsets) pair in key
+            order. Defaults to None, which reads the coordinates of the collection.
+        path : str, optional
+            The `.npy` file to write the matrix to. Defaults to None, which keeps it in memory.
+        block_size : int, optional
+            The number of flights along each side of a tile. Defaults to 1000.
+        condensed : bool, optional
+            If True, returns only the upper triangle, in the order of
+            `scipy.spatial.distance.squareform`. Defaults to False.
+        n_jobs : int, optional
+            The number of tiles computed in parallel. -1 uses all processors. Defaults to 1.
+        backend : str, optional
+            'thread' or 'process'. Defaults to 'thread'.
         **kwargs : dict
             Additional arguments for the DTW calculation.
 
         Returns:
         --------
         np.ndarray:
-            The DTW distance matrix.
+            The DTW distance matrix, with the flights in key order, or a `np.memmap` of `path`.
         """
-        from dtaidistance import dtw_ndim
-
-        print("Stacking series into a list")
-        series_list = [flight.get_coordinates(include_altitude).to_numpy().copy() for _, flight in self]
-        
-        print("Calculating distance matrix")
-        return dtw_ndim.distance_matrix_fast(series_list, **kwargs)
+        from flightpandas.distance import dtw_distance_matrix
+
+        if coordinates is None:
+            _, order, offsets = self._key_index
+            values = self.obj.get_coordinates(include_altitude).to_numpy(dtype='float64')
+            coordinates = (values if order is None else values[order], offsets)
+        values, offsets = coordinates
+        return dtw_distance_matrix(values, offsets, path=path, block_size=block_size, condensed=condensed,
+                                   n_jobs=n_jobs, backend=backend, **kwargs)
         
-    def get_linestring(self) -> GeoSeries:
+    @profiled
+    def get_linestring(self, include_altitude=False, include_time=False) -> GeoDataFrame:
         """
         Aggregates flight data into LineString geometries.
 
+        The coordinates of all flights are read once and every LineString is built by one
+        vectorized shapely call, with the points of each flight in their stored order.
+
+        Parameters:
+        -----------
+        include_altitude : bool, optional
+            If True, stores the altitude as Z values. Defaults to False.
+        include_time : bool, optional
+            If True, stores the time as M values, in seconds since the Unix epoch. Defaults to False.
+
         Returns:
         --------
-        GeoSeries:
-            A GeoSeries of LineString geometries for each flight group.
-        """
-        from shapely.geometry import LineString
-        def _get_linestring(flight):
-            if len(flight) < 2:
-                return None
-            return LineString(flight.get_coordinates())
-                
-        return self.aggregate({self.obj._geometry_column_name: _get_linestring})
+        GeoDataFrame:
+            The LineString of each flight, indexed by the flight keys. Flights with fewer than two
+            points get None.
+        """
+        keys, order, offsets = self._key_index
+        coordinates = self.obj.get_coordinates(include_altitude).to_numpy(dtype='float64')
+        if include_time:
+            coordinates = np.column_stack([coordinates, self.obj.index.as_unit('ns').asi8 / 1e9])
+        if order is not None:
+            coordinates = coordinates[order]
+        lines = _linestrings(coordinates, offsets, include_time)
+        return GeoDataFrame({'geometry': GeoSeries(lines, index=keys, crs=self.obj.crs)}, geometry='geometry')
     
-    def resample(self, freq='1s', method='linear', **kwargs):
+    @profiled
+    def resample(self, freq='1s', method='linear', max_gap=None, **kwargs):
         """
         Resamples the flight trajectories to a specified temporal resolution.
 
+        All flights are sorted once by key and time and interpolated onto their own time grid in a
+        single vectorized pass, so memory use scales with the size of the output.
+
         Parameters:
         -----------
         freq : str, optional
-            The resampling frequency (e.g., '1T' for one minute). Defaults to '1s'.
+            The resampling frequency (e.g., '1min' for one minute). Calendar frequencies such as
+            'MS' or 'W-MON' are laid out one flight at a time with pandas. Defaults to '1s'.
         method : str, optional
             The interpolation method. Defaults to 'linear'.
+        max_gap : Timedelta or str, optional
+            If set, splits each flight wherever two messages are more than `max_gap` apart, as
+            `TimeGapSplitter` does, and resamples each section on its own. No rows are generated
+            inside the gaps. Defaults to None.
         **kwargs : dict
             Additional arguments for interpolation.
 
@@ -277,37 +611,25 @@ class FlightCollection(DataFrameGroupBy, GroupBy[Flight]):
             A new `FlightCollection` instance with resampled trajectories.
         """
         data = self.data
+        frame, lat, lon = data._coordinate_frame()
 
-        coordinates = data.get_coordinates().rename(columns={'x': 'lon', 'y': 'lat'})
-        data_numeric = concat([coordinates, data.select_dtypes('number')], axis=1)
-        print(list(data_numeric.columns))
-        for key_name in self.key_names:
-            if key_name not in data_numeric.columns:
-                data_numeric[key_name] = data[key_name]
-        data_nonnumeric = data.select_dtypes(exclude='number').drop(columns=data._geometry_column_name)
-        for key_name in self.key_names:
-            if key_name not in data_nonnumeric.columns:
-                data_nonnumeric[key_name] = data[key_name]
-        
-        data_numeric = data_numeric.groupby(self.key_names)
-        data_nonnumeric = data_nonnumeric.groupby(self.key_names)
-
-        resampled_numeric = data_numeric.resample(freq).mean().interpolate(method, **kwargs)
-        resampled_nonnumeric = data_nonnumeric.resample(freq).first().infer_objects(copy=False).bfill().ffill()
-        # drop the key_names from the index of resampled_numeric
-        for key_name in self.key_names:
-            resampled_numeric = resampled_numeric.drop(columns=key_name)
-            resampled_nonnumeric = resampled_nonnumeric.drop(columns=key_name)
-
-        resampled = FlightCollection(concat([resampled_numeric, resampled_nonnumeric], axis=1), keys=self.key_names)
-        for key_name in self.key_names:
-            resampled.data.reset_index(key_name, inplace=True)
+        group_ids = self.ngroup().to_numpy()
+        if max_gap is not None:
+            from flightpandas.splitter import _segment_ids
+            group_ids = _segment_ids(frame.index, group_ids, max_gap)
+
+        resampled = _resample_sorted(frame, group_ids, freq, keys=self.key_names, method=method, **kwargs)
+        resampled = FlightCollection(resampled, keys=self.key_names, lat=lat, lon=lon, columnar=data.is_columnar)
+        resampled.data._copy_attrs(data)
         return resampled
     
+    @profiled
     def set_precision(self, precision) -> 'FlightCollection':
         """
         Sets the precision for geometric data in the collection.
 
+        The whole frame is snapped at once and the result reuses the grouping of the collection.
+
         Parameters:
         -----------
         precision : int
@@ -318,15 +640,17 @@ class FlightCollection(DataFrameGroupBy, GroupBy[Flight]):
         FlightCollection:
             The updated `FlightCollection` instance.
         """
-        def _set_precision(flight):
-            flight[self.obj._geometry_column_name] = flight[self.obj._geometry_column_name].set_precision(precision)
-            return flight
-        return self.apply(lambda x: _set_precision(x)).groupby(self.key_names)
+        # Copy-on-write makes the shallow copy safe to modify
+        return self._with_data(self.obj.copy(deep=False).set_precision(precision))
     
+    @profiled
     def to_crs(self, crs=None, epsg=None, **kwargs) -> 'FlightCollection':
         """
         Transforms the coordinate reference system of the collection.
 
+        All points are transformed in a single call and the result reuses the grouping of the
+        collection.
+
         Parameters:
         -----------
         crs : dict or str, optional
@@ -341,7 +665,95 @@ class FlightCollection(DataFrameGroupBy, GroupBy[Flight]):
         FlightCollection:
             The transformed `FlightCollection`.
         """
-        return self.apply(lambda x: x.to_crs(crs, epsg, **kwargs)).groupby(self.key_names)
+        return self._with_data(self.obj.to_crs(crs, epsg, **kwargs))
+
+    @profiled
+    def to_local(self, method='aeqd', origin='centroid') -> 'FlightCollection':
+        """
+        Projects every flight to a local metric frame centred on the flight.
+
+        The origins and the projection of all flights are computed with NumPy in one pass and the
+        result reuses the grouping of the collection. Distances in the local frames are in metres,
+        so tolerances of simplifiers and DTW distances are in metres as well.
+
+        Parameters:
+        -----------
+        method : str, optional
+            'aeqd' for the azimuthal equidistant projection, or 'enu' for the east-north-up tangent
+            plane with the altitude in metres. Defaults to 'aeqd'.
+        origin : str or tuple, optional
+            'centroid' or 'first' for one origin per flight, or a (lat, lon) or (lat, lon, height)
+            tuple shared by all flights, which makes the flights comparable. Defaults to 'centroid'.
+
+        Returns:
+        --------
+        FlightCollection:
+            The projected collection, with the origin of every row in the `origin_lat` and
+            `origin_lon` columns.
+        """
+        from flightpandas.projection import _to_local
+        return self._with_data(_to_local(self.obj, self._group_ids(), method, origin))
+
+    @profiled
+    def kinematics(self, overwrite=False) -> 'FlightCollection':
+        """
+        Derives the distance, ground speed, track, vertical rate and turn rate of every flight.
+
+        All flights are processed in one segmented pass without crossing flight boundaries, and
+        the result reuses the grouping of the collection.
+
+        Parameters:
+        -----------
+        overwrite : bool, optional
+            If True, replaces existing columns with the names of the derived columns and sets the
+            velocity, heading and altitude rate to the derived columns even if the data already has
+            them. If False, existing columns are kept. Defaults to False.
+
+        Returns:
+        --------
+        FlightCollection:
+            The collection with the `distance`, `cumulative_distance`, `groundspeed`, `track`,
+            `vertrate` and `turn_rate` columns, as described in `flightpandas.kinematics`.
+        """
+        from flightpandas.helper_base import _Layout
+        from flightpandas.kinematics import _kinematics
+        # Contiguous, time-sorted collections skip the sort
+        layout = _Layout.from_data(self)
+        return self._with_data(_kinematics(self.obj, layout.group_ids, layout.is_sorted, overwrite))
+
+    @profiled
+    def from_local(self) -> 'FlightCollection':
+        """
+        Converts a collection projected by `to_local` back to latitude and longitude.
+
+        Returns:
+        --------
+        FlightCollection:
+            The collection with the coordinate names, storage and CRS it had before `to_local`.
+        """
+        from flightpandas.projection import _from_local
+        return self._with_data(_from_local(self.obj))
+
+    def _with_data(self, data) -> 'FlightCollection':
+        """
+        Returns a collection of new data with the same rows, reusing the grouping and the key index
+        of this collection instead of regrouping.
+
+        Parameters:
+        -----------
+        data : Flight
+            The new data, with the rows in the same order as the data of this collection.
+
+        Returns:
+        --------
+        FlightCollection:
+            The collection of the new data.
+        """
+        fc = FlightCollection(data, keys=self.keys, level=self.level, grouper=self._grouper, sort=self.sort,
+                              observed=self.observed, dropna=self.dropna)
+        if '_key_index' in self.__dict__:
+            fc.__dict__['_key_index'] = self._key_index
+        return fc
     
     def to_latlon(self):
         """
@@ -11,6 +11,24 @@ HelperBase:
     A base class for creating operations on `Flight` and `FlightCollection` objects, 
     supporting sequential pipelines for data processing and transformations.
 
+_Layout:
+    The flight data of a fused pipeline stage, stored with one group number per row so that
+    steps can pass it along without regrouping.
+
+Functions:
+----------
+_eval_stages(stages, data, args, kwargs, profiler=None):
+    Applies the planned stages of a pipeline to the data.
+
+_eval_partition(stages, rows, key_names, args, kwargs):
+    Evaluates the pipeline on one partition of a collection in a worker.
+
+_concat_partitions(results, key_names):
+    Concatenates the results of the partitions of a collection in partition order.
+
+_offset_result(result, key_names, offsets):
+    Offsets the integer keys that the pipeline created in the result of one partition or chunk.
+
 Examples:
 ---------
 # Create a HelperBase instance
@@ -21,9 +39,253 @@ helper = helper.pipe(transformation_func_1).pipe(transformation_func_2)
 
 # Evaluate the pipeline
 result = helper.eval()
+
+# Show how the pipeline will be evaluated
+print(helper.explain())
+
+# Evaluate the pipeline on 8 worker processes
+result = helper.eval(n_jobs=8, backend='process')
+
+# Record the time, rows, groups and memory of every step
+with Profiler() as profiler:
+    result = helper.eval()
+print(profiler.to_frame())
+
+# Evaluate the pipeline on more chunks of flights, writing each result to disk
+helper.eval_chunks(FlightCollection.iter_chunks("archive/", max_rows=5_000_000), ChunkWriter("output/"))
+
+# Reuse the stored result when the data and the pipeline are unchanged
+result = helper.eval(cache=PipelineCache("~/.cache/flightpandas"))
 """
+import copy
+import inspect
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+from pandas import concat
+from pandas.api.types import is_integer_dtype
+
 from flightpandas.flight import Flight
 from flightpandas.flight_collection import FlightCollection
+from flightpandas.profiling import _measure, active_profiler
+
+# The data of a parallel evaluation, inherited by forked worker processes
+_PARTITIONED_DATA = None
+
+
+class _Layout:
+    """
+    The flight data passed between the steps of a fused pipeline stage.
+
+    Attributes:
+    -----------
+    data : Flight
+        The flight data.
+    group_ids : ndarray
+        The group number of each row. Rows with a negative number belong to no group.
+    key_names : list
+        The columns the groups are keyed by. Empty for a single flight.
+    is_sorted : bool
+        If True, the rows of each group are contiguous, in time order and numbered in ascending order.
+    """
+
+    def __init__(self, data, group_ids, key_names, is_sorted=False):
+        self.data = data
+        self.group_ids = group_ids
+        self.key_names = key_names
+        self.is_sorted = is_sorted
+
+    @classmethod
+    def from_data(cls, obj):
+        """
+        Creates a layout from a `Flight` or `FlightCollection` object.
+
+        Parameters:
+        -----------
+        obj : Flight | FlightCollection
+            The data to lay out.
+
+        Returns:
+        --------
+        _Layout:
+            The layout of the data.
+        """
+        if isinstance(obj, FlightCollection):
+            group_ids = obj._group_ids()
+            is_sorted = False
+            if obj.is_contiguous and not obj.data.index.hasnans:
+                # Contiguous collections from `sort_flights` skip the sort of every fused stage
+                times = obj.data.index.as_unit('ns').asi8
+                is_sorted = bool(((np.diff(times) >= 0) | (np.diff(group_ids) != 0)).all())
+            return cls(obj.data, group_ids, obj.key_names, is_sorted)
+        return cls(obj, np.zeros(len(obj), dtype=np.intp), [])
+
+    def to_data(self) -> Flight | FlightCollection:
+        """
+        Groups the data by its keys.
+
+        Returns:
+        --------
+        Flight | FlightCollection:
+            The data grouped by `key_names`, or the flight itself if there are no keys.
+        """
+        if not self.key_names:
+            return self.data
+        return self.data.groupby(self.key_names)
+
+def _eval_stages(stages, data, args, kwargs, profiler=None):
+    """
+    Applies the planned stages of a pipeline to the data.
+
+    Parameters:
+    -----------
+    stages : list
+        The stages to apply, as planned by `HelperBase._plan`.
+    data : Flight | FlightCollection
+        The input data.
+    args : tuple
+        Additional positional arguments for pipeline functions.
+    kwargs : dict
+        Additional keyword arguments for pipeline functions.
+    profiler : Profiler, optional
+        If given, records every step. Default is None.
+
+    Returns:
+    --------
+    Flight | FlightCollection:
+        The result after applying all stages.
+
+    Raises:
+    -------
+    ValueError:
+        If the data object has an unexpected type during evaluation.
+    """
+    for stage in stages:
+        if not isinstance(data, (Flight, FlightCollection)):
+            raise ValueError("Unexpected data type encountered during evaluation: "
+                            f"{type(data).__name__}.")
+
+        if len(stage) > 1:
+            # Run the fused steps on one layout and group the result once
+            layout = _Layout.from_data(data)
+            for pipe in stage:
+                layout = _measure(profiler, f"{type(pipe).__name__} (fused)", layout, pipe._eval_layout, layout)
+            data = _measure(profiler, f"{type(stage[-1]).__name__} (group)", layout, stage[-1]._to_data, layout)
+        elif isinstance(data, Flight):
+            data = _measure(profiler, type(stage[0]).__name__, data, stage[0]._eval_flight, data, *args, **kwargs)
+        else:
+            data = _measure(profiler, type(stage[0]).__name__, data, stage[0]._eval_flight_collection, data, *args, **kwargs)
+
+    return data
+
+
+def _eval_partition(stages, rows, key_names, args, kwargs):
+    """
+    Evaluates the pipeline on one partition of a collection. Runs in a worker.
+
+    Parameters:
+    -----------
+    stages : list
+        The planned stages of the pipeline.
+    rows : ndarray or Flight
+        The positions of the partition in the data inherited from the parent process, or the
+        rows of the partition themselves.
+    key_names : list
+        The columns the collection is grouped by.
+    args : tuple
+        Additional positional arguments for pipeline functions.
+    kwargs : dict
+        Additional keyword arguments for pipeline functions.
+
+    Returns:
+    --------
+    tuple:
+        The result for the partition and the steps of the pipeline after evaluation.
+    """
+    data = rows if isinstance(rows, Flight) else _PARTITIONED_DATA.take(rows)
+    result = _eval_stages(stages, data.groupby(key_names), args, kwargs)
+    return result, [pipe for stage in stages for pipe in stage]
+
+
+def _offset_keys(values, offset):
+    """
+    Offsets integer key values and returns the offset for the next partition.
+    """
+    if len(values) == 0 or not is_integer_dtype(values.dtype):
+        return values, offset
+    return values + offset, offset + int(values.max()) + 1
+
+
+def _concat_partitions(results, key_names):
+    """
+    Concatenates the results of the partitions of a collection in partition order.
+
+    Integer keys created by the pipeline, such as the segment numbers of `TimeGapSplitter`, are
+    numbered from zero in every partition. They are offset so that they stay unique and match
+    the numbering of a serial evaluation.
+
+    Parameters:
+    -----------
+    results : list
+        The results of the partitions, in partition order.
+    key_names : list
+        The columns the input collection is grouped by.
+
+    Returns:
+    --------
+    Flight | FlightCollection | DataFrame:
+        The combined result.
+
+    Raises:
+    -------
+    ValueError:
+        If the partitions returned different types.
+    """
+    if len({type(result) for result in results}) > 1:
+        raise ValueError("The partitions of the pipeline returned different types.")
+
+    offsets = {}
+    frames = [_offset_result(result, key_names, offsets) for result in results]
+    if isinstance(results[0], FlightCollection):
+        return concat(frames).groupby(results[0].key_names)
+    return concat(frames)
+
+
+def _offset_result(result, key_names, offsets):
+    """
+    Offsets the integer keys that the pipeline created in the result of one partition or chunk.
+
+    Parameters:
+    -----------
+    result : Flight | FlightCollection | DataFrame
+        The result of the partition or chunk.
+    key_names : list
+        The columns the input collection is grouped by.
+    offsets : dict
+        The offset of every created key for this result. Updated in place for the next result.
+
+    Returns:
+    --------
+    Flight | DataFrame:
+        The data of the result with its created keys offset.
+    """
+    if isinstance(result, FlightCollection):
+        data = result.data
+        for key in result.key_names:
+            if key not in key_names:
+                values, offsets[key] = _offset_keys(data[key], offsets.get(key, 0))
+                data = data.assign(**{key: values})
+        return data
+
+    if not isinstance(result, Flight) and result.index.name not in key_names:
+        # Results indexed by new keys, such as the LineStrings of each segment
+        index, offsets[None] = _offset_keys(result.index, offsets.get(None, 0))
+        return result.set_axis(index)
+    return result
+
 
 class HelperBase:
     """
@@ -41,16 +303,37 @@ class HelperBase:
     --------
     __init__(obj, *args, **kwargs):
         Initializes the HelperBase with a data object and tracks the transformation pipeline.
-    eval(*args, **kwargs):
-        Evaluates all the transformations in the pipeline sequentially and applies them to the data object.
+    eval(*args, optimize=True, n_jobs=1, backend='process', cache=None, profiler=None, **kwargs):
+        Evaluates the transformations in the pipeline and applies them to the data object.
+    explain():
+        Describes the stages in which the pipeline is evaluated.
+    _eval_parallel(stages, n_jobs, backend, args, kwargs):
+        Evaluates the pipeline on partitions of the collection in parallel.
+    eval_chunks(chunks, writer, *args, optimize=True, profiler=None, **kwargs):
+        Evaluates the pipeline chunk by chunk and passes every result to a writer.
+    _without_data():
+        Returns a copy of the step without its input data, to be sent to a worker.
+    _merge_partitions(pipes):
+        Combines the state collected by the copies of the step in a parallel evaluation.
     pipe(func, *args, **kwargs):
         Adds a transformation function to the pipeline and returns the updated HelperBase.
+    _plan():
+        Groups the pipeline into stages, fusing consecutive steps that support it.
+    _eval_layout(layout):
+        Processes the data of a fused stage without regrouping it.
+    _to_data(layout):
+        Converts the data of a fused stage into the output of its last step.
     _eval_flight(obj, *args, **kwargs):
         Processes a single `Flight` object and applies custom transformations.
     _eval_flight_collection(obj, *args, **kwargs):
         Processes a `FlightCollection` object and applies custom transformations.
     """
 
+    # Subclasses that implement `_eval_layout` set this to True so they can be fused
+    _fusible = False
+    # Attributes that are not parameters of the step, left out of its cache key
+    _runtime_attributes = ("data", "pipes")
+
     def __init__(self, obj, *args, **kwargs):
         """
         Initializes the HelperBase with a `Flight` or `FlightCollection` object.
@@ -80,17 +363,41 @@ class HelperBase:
             self.pipes = []
         self.pipes = self.pipes + [self]
 
-    def eval(self, *args, **kwargs) -> Flight | FlightCollection:
+    def eval(self, *args, optimize=True, n_jobs=1, backend='process', cache=None, profiler=None, **kwargs) -> Flight | FlightCollection:
         """
-        Evaluates all the transformations in the pipeline sequentially.
+        Evaluates all the transformations in the pipeline.
 
-        Each transformation in `self.pipes` is applied to the data object. Depending on the data type,
-        the transformation is delegated to `_eval_flight` or `_eval_flight_collection`.
+        The pipeline is evaluated as planned by `_plan`. Consecutive steps that support fusion are
+        run in one pass over the data, which is only grouped once at the end of the pass. Every
+        other step is applied to the data object and delegated to `_eval_flight` or
+        `_eval_flight_collection`, depending on the data type.
+
+        With `n_jobs` other than 1, a `FlightCollection` is split into partitions of whole flights
+        that are evaluated in parallel and put back together in the order of the flights. A single
+        `Flight` is always evaluated in the calling thread.
+
+        With a `cache`, the result is looked up by a fingerprint of the input data and the steps,
+        and only computed and stored on a miss. State that steps collect during evaluation, such
+        as `RDP.compression_ratio`, is not updated on a hit. Pipelines with a step parameter that
+        cannot be fingerprinted the same way in every process, such as a bound method, are
+        evaluated without the cache.
 
         Parameters:
         -----------
         *args : tuple
             Additional positional arguments for pipeline functions.
+        optimize : bool, optional
+            If False, evaluates every step on its own, regrouping the data in between. Default is True.
+        n_jobs : int, optional
+            The number of partitions evaluated in parallel. -1 uses all processors. Default is 1.
+        backend : str, optional
+            'process' evaluates the partitions in worker processes and 'thread' in worker threads.
+            Default is 'process'.
+        cache : PipelineCache, optional
+            The cache to read the result from and store it in. Default is None.
+        profiler : Profiler, optional
+            The profiler that records every step. Default is None, which uses the profiler of an
+            enclosing `with Profiler()` block, if any. A parallel evaluation is recorded as one step.
         **kwargs : dict
             Additional keyword arguments for pipeline functions.
 
@@ -99,6 +406,135 @@ class HelperBase:
         Flight | FlightCollection:
             The result after applying all transformations in the pipeline.
 
+        Raises:
+        -------
+        TypeError:
+            If a pipe in the pipeline is not an instance of `HelperBase`.
+        ValueError:
+            If the data object has an unexpected type during evaluation, or `backend` is unknown.
+        """
+        if backend not in ('process', 'thread'):
+            raise ValueError(f"Unknown backend: {backend}. Use 'process' or 'thread'.")
+        stages = self._plan() if optimize else [[pipe] for pipe in self._validated_pipes()]
+
+        key = None
+        if cache is not None:
+            key = cache.key(self.data, stages)
+            result = cache.get(key) if key is not None else None
+            if result is not None:
+                return result
+
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        if profiler is None:
+            profiler = active_profiler()
+        if n_jobs > 1 and isinstance(self.data, FlightCollection):
+            result = _measure(profiler, f"parallel (n_jobs={n_jobs}, backend={backend!r})", self.data,
+                              self._eval_parallel, stages, n_jobs, backend, args, kwargs)
+        else:
+            result = _eval_stages(stages, self.data, args, kwargs, profiler)
+
+        if key is not None:
+            cache.put(key, result)
+        return result
+
+    def _eval_parallel(self, stages, n_jobs, backend, args, kwargs):
+        """
+        Evaluates the pipeline on partitions of the collection in parallel.
+
+        The flights are cut into contiguous ranges of about the same number of rows, so that the
+        partitions can be concatenated in flight order. Worker threads and, where the platform
+        supports forking, worker processes read their rows from the shared data, so only the row
+        positions and the results are copied between processes.
+
+        Parameters:
+        -----------
+        stages : list
+            The planned stages of the pipeline.
+        n_jobs : int
+            The maximum number of partitions.
+        backend : str
+            'process' or 'thread'.
+        args : tuple
+            Additional positional arguments for pipeline functions.
+        kwargs : dict
+            Additional keyword arguments for pipeline functions.
+
+        Returns:
+        --------
+        Flight | FlightCollection:
+            The concatenated results of the partitions.
+        """
+        global _PARTITIONED_DATA
+
+        fc = self.data
+        group_ids = fc.ngroup().to_numpy()
+        sizes = np.bincount(group_ids[group_ids >= 0], minlength=fc.ngroups)
+        total = max(sizes.sum(), 1)
+        group_partitions = np.minimum((np.cumsum(sizes) - sizes) * n_jobs // total, n_jobs - 1)
+        row_partitions = np.where(group_ids >= 0, group_partitions[np.maximum(group_ids, 0)], -1)
+        order = np.argsort(row_partitions, kind='stable')
+        bounds = np.searchsorted(row_partitions[order], np.arange(n_jobs + 1))
+        partitions = [order[a:b] for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        if not partitions:
+            return _eval_stages(stages, fc, args, kwargs)
+
+        fork = backend == 'process' and 'fork' in multiprocessing.get_all_start_methods()
+        shared = fork or backend == 'thread'
+        if backend == 'thread':
+            executor = ThreadPoolExecutor(len(partitions))
+        else:
+            context = multiprocessing.get_context('fork' if fork else None)
+            executor = ProcessPoolExecutor(len(partitions), mp_context=context)
+
+        _PARTITIONED_DATA = fc.data if shared else None
+        try:
+            with executor:
+                futures = []
+                for rows in partitions:
+                    # Every partition gets its own copies of the steps, without their input data
+                    worker_stages = [[pipe._without_data() for pipe in stage] for stage in stages]
+                    futures.append(executor.submit(_eval_partition, worker_stages, rows if shared else fc.data.take(rows),
+                                                   fc.key_names, args, kwargs))
+                outputs = [future.result() for future in futures]
+        finally:
+            _PARTITIONED_DATA = None
+
+        results = [result for result, _ in outputs]
+        for number, pipe in enumerate(pipe for stage in stages for pipe in stage):
+            pipe._merge_partitions([partition_pipes[number] for _, partition_pipes in outputs])
+        return _concat_partitions(results, fc.key_names)
+
+    def eval_chunks(self, chunks, writer, *args, optimize=True, profiler=None, **kwargs) -> int:
+        """
+        Evaluates the pipeline on the data it was built on and then on every chunk of an iterator,
+        passing each result to a writer so that only one chunk is held in memory.
+
+        Every chunk is evaluated by its own copies of the steps. Integer keys created by the
+        pipeline are offset as in a parallel evaluation, and the state the steps collect, such as
+        `RDP.compression_ratio`, is combined over all chunks at the end.
+
+        Parameters:
+        -----------
+        chunks : iterable
+            The further `FlightCollection` chunks, such as the rest of `FlightCollection.iter_chunks`.
+        writer : callable
+            Called with the result of every chunk, such as a `flightpandas.io.ChunkWriter`.
+        *args : tuple
+            Additional positional arguments for pipeline functions.
+        optimize : bool, optional
+            If False, evaluates every step on its own. Default is True.
+        profiler : Profiler, optional
+            The profiler that records every chunk and step. Default is None, which uses the
+            profiler of an enclosing `with Profiler()` block, if any.
+        **kwargs : dict
+            Additional keyword arguments for pipeline functions.
+
+        Returns:
+        --------
+        int:
+            The number of chunks evaluated.
+
         Raises:
         -------
         TypeError:
@@ -106,26 +542,95 @@ class HelperBase:
         ValueError:
             If the data object has an unexpected type during evaluation.
         """
-        data = self.data
+        stages = self._plan() if optimize else [[pipe] for pipe in self._validated_pipes()]
+        if profiler is None:
+            profiler = active_profiler()
+        key_names = self.data.key_names if isinstance(self.data, FlightCollection) else []
+
+        offsets, chunk_pipes = {}, []
+        for number, chunk in enumerate(itertools.chain([self.data], chunks)):
+            chunk_stages = [[pipe._without_data() for pipe in stage] for stage in stages]
+            result = _measure(profiler, f"chunk {number}", chunk, _eval_stages, chunk_stages, chunk, args, kwargs, profiler)
+            data = _offset_result(result, key_names, offsets)
+            writer(data.groupby(result.key_names) if isinstance(result, FlightCollection) else data)
+            chunk_pipes.append([pipe for stage in chunk_stages for pipe in stage])
+
+        for position, pipe in enumerate(pipe for stage in stages for pipe in stage):
+            pipe._merge_partitions([pipes[position] for pipes in chunk_pipes])
+        return len(chunk_pipes)
+
+    def explain(self) -> str:
+        """
+        Describes the stages in which the pipeline is evaluated.
+
+        Returns:
+        --------
+        str:
+            One line per stage. Fused stages list their steps joined by arrows.
+
+        Raises:
+        -------
+        TypeError:
+            If a pipe in the pipeline is not an instance of `HelperBase`.
+        """
+        if isinstance(self.data, FlightCollection):
+            lines = [f"Input: FlightCollection keyed by {self.data.key_names} ({len(self.data.obj)} rows)"]
+        else:
+            lines = [f"Input: {type(self.data).__name__} ({len(self.data)} rows)"]
+        for number, stage in enumerate(self._plan(), start=1):
+            steps = " -> ".join(repr(pipe) for pipe in stage)
+            kind = "fused, one pass" if len(stage) > 1 else "eager"
+            lines.append(f"Stage {number} ({kind}): {steps}")
+        return "\n".join(lines)
+
+    def _validated_pipes(self) -> list:
+        """
+        Returns the steps of the pipeline, skipping the ones that do nothing.
 
+        Returns:
+        --------
+        list:
+            The `HelperBase` steps of the pipeline.
+
+        Raises:
+        -------
+        TypeError:
+            If a pipe in the pipeline is not an instance of `HelperBase`.
+        """
+        pipes = []
         for pipe in self.pipes:
-            # Validate the current pipe
             if not isinstance(pipe, HelperBase):
                 raise TypeError(f"Invalid pipe detected in the pipeline: {pipe}. "
                                 "All pipes must inherit from `HelperBase`.")
-            
-            # Apply the transformation based on the type of `data`
-            if isinstance(data, Flight):
-                data = pipe._eval_flight(data, *args, **kwargs)
-            elif isinstance(data, FlightCollection):
-                data = pipe._eval_flight_collection(data, *args, **kwargs)
-            else:
-                raise ValueError("Unexpected data type encountered during evaluation: "
-                                f"{type(data).__name__}.")
-            
+            # A plain `HelperBase` returns its input unchanged
+            if type(pipe) is not HelperBase:
+                pipes.append(pipe)
+        return pipes
 
-        return data
+    def _plan(self) -> list:
+        """
+        Groups the pipeline into stages, fusing consecutive steps that support it.
+
+        Returns:
+        --------
+        list:
+            The stages in evaluation order. Each stage is a list of steps. Stages with more than
+            one step are evaluated in a single pass.
+        """
+        stages = []
+        for pipe in self._validated_pipes():
+            if pipe._fusible and stages and stages[-1][-1]._fusible:
+                stages[-1].append(pipe)
+            else:
+                stages.append([pipe])
+        return stages
 
+    def __repr__(self) -> str:
+        # Show the constructor parameters that are stored as attributes
+        names = [name for name in inspect.signature(type(self).__init__).parameters if name not in ("self", "obj")]
+        params = ", ".join(f"{name}={getattr(self, name)!r}" for name in names
+                           if getattr(self, name, None) is not None)
+        return f"{type(self).__name__}({params})"
 
     def pipe(self, func: callable, *args, **kwargs) -> "HelperBase":
         """
@@ -186,3 +691,61 @@ class HelperBase:
             The processed `FlightCollection` object or resulting collection.
         """
         return obj
+
+    def _eval_layout(self, layout: _Layout) -> _Layout:
+        """
+        Processes the data of a fused stage without regrouping it. Only called if `_fusible` is True.
+
+        Parameters:
+        -----------
+        layout : _Layout
+            The data produced by the previous step of the stage.
+
+        Returns:
+        --------
+        _Layout:
+            The processed data.
+        """
+        return layout
+
+    def _to_data(self, layout: _Layout) -> Flight | FlightCollection:
+        """
+        Converts the data of a fused stage into the output of its last step.
+
+        Parameters:
+        -----------
+        layout : _Layout
+            The data produced by the last step of the stage.
+
+        Returns:
+        --------
+        Flight | FlightCollection:
+            The data grouped by its keys.
+        """
+        return layout.to_data()
+
+    def _without_data(self) -> "HelperBase":
+        """
+        Returns a shallow copy of the step without its input data, to be sent to a worker.
+
+        Returns:
+        --------
+        HelperBase:
+            The copy of the step.
+        """
+        pipe = copy.copy(self)
+        pipe.data = None
+        pipe.pipes = []
+        return pipe
+
+    def _merge_partitions(self, pipes: list) -> None:
+        """
+        Combines the state that the copies of the step collected on the partitions of a parallel
+        evaluation. Does nothing by default.
+
+        Parameters:
+        -----------
+        pipes : list
+            The copies of the step after evaluating each partition, in partition order.
+        """
+        pass
@@ -0,0 +1,803 @@
+"""
+io.py
+
+This module provides readers that build `FlightCollection` objects directly from Parquet files
+and datasets, reading only the row groups and columns a query needs, and a writer that lays
+flights out for such reads.
+
+Classes:
+--------
+ChunkWriter:
+    Writes the results of a chunked evaluation to a directory, one file per chunk.
+
+Functions:
+----------
+read_parquet(path, keys=None, flights=None, start=None, end=None, bbox=None, columns=None, ...):
+    Reads flights from a Parquet file or a directory of Parquet files into a `FlightCollection`.
+
+iter_parquet(path, max_rows=1_000_000, keys=None, check_contiguous=True, **kwargs):
+    Reads flights from Parquet in chunks of whole flights.
+
+to_parquet(obj, path, partition_by=None, n_buckets=16, row_group_size=65536, compression='snappy'):
+    Writes a `Flight` or `FlightCollection` as GeoParquet with every flight within one row group.
+
+_prepare_read(path, keys, flights, start, end, bbox, columns, time, ...):
+    Resolves the columns, projection and filter of a read.
+
+_last_flight_start(table, keys):
+    Returns the position of the first row of the last flight of a table.
+
+_check_contiguous(table, keys, emitted):
+    Checks that no flight of a chunk was part of an earlier chunk, by the hashes of their keys.
+
+_resolve_column(names, name, override=None, required=False):
+    Finds the column that holds a flight attribute.
+
+_geo_metadata(schema):
+    Returns the GeoParquet metadata of a schema, if any.
+
+_build_filter(schema, keys, flights, time, start, end, bbox, lat, lon, covering):
+    Builds the filter expression pushed down to the Parquet row groups.
+
+_partition_filter(schema, stored, keys, flights, start, end):
+    Builds the filter on the partition columns written by `to_parquet`.
+
+_key_buckets(keys, n_buckets):
+    Returns the hash bucket of every flight key.
+
+_flight_table(obj):
+    Converts flights into an Arrow table sorted by (keys, time), with GeoParquet point geometries.
+
+_write_file(table, group_ids, file, x, y, crs, stored, row_group_size, compression):
+    Writes one GeoParquet file with every flight within one row group.
+
+Examples:
+---------
+# Read one day of two flights, keeping only the columns a Flight needs
+from flightpandas.io import read_parquet
+fc = read_parquet("archive/", keys="icao24", flights=["aca063", "c038ac"],
+                  start="2024-11-01", end="2024-11-02")
+
+# Write a collection partitioned by day and key hash, and read one flight back
+from flightpandas.io import to_parquet
+to_parquet(flight_collection, "archive/", partition_by=["date", "key_hash"])
+fc = read_parquet("archive/", flights=["aca063"])
+
+# Read all flights within a bounding box, with their callsigns
+fc = FlightCollection.read_parquet("archive/", keys="icao24", bbox=(126.0, 37.0, 127.0, 38.0),
+                                   columns=["callsign"], columnar=True)
+
+# Simplify a month of flights that does not fit in memory, one chunk of whole flights at a time
+from flightpandas.io import iter_parquet, ChunkWriter
+chunks = iter_parquet("month.parquet", max_rows=5_000_000)
+pipeline = RDP(TimeGapSplitter(next(chunks)), tolerance=0.01)
+pipeline.eval_chunks(chunks, ChunkWriter("simplified/"))
+"""
+import json
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import shapely
+from pandas import DataFrame, MultiIndex, Timestamp
+from pandas.util import hash_pandas_object
+
+from flightpandas.flight import Flight, _possible_column_names
+from flightpandas.flight_collection import FlightCollection
+
+_METADATA_KEY = b"flightpandas"
+_DATE_COLUMN = "date"
+_BUCKET_COLUMN = "key_bucket"
+
+
+def _resolve_column(names, name, override=None, required=False):
+    """
+    Finds the column that holds a flight attribute, as `Flight` does.
+
+    Parameters:
+    -----------
+    names : list
+        The column names of the dataset.
+    name : str
+        The attribute name (e.g., 'latitude', 'altitude').
+    override : str, optional
+        A specific column name to use. Default is None.
+    required : bool, optional
+        If True, raises an error if the attribute is not found. Default is False.
+
+    Returns:
+    --------
+    str | None:
+        The column name, or None if the attribute is not found.
+
+    Raises:
+    -------
+    ValueError:
+        If `override` is not a column, or the attribute is required and not found.
+    """
+    if override is not None:
+        if override not in names:
+            raise ValueError(f"Column {override} is not in the dataset.")
+        return override
+    for possible_name in _possible_column_names[name]:
+        if possible_name in names:
+            return possible_name
+    if required:
+        raise ValueError(f"{name} is required")
+    return None
+
+
+def _geo_metadata(schema):
+    """
+    Returns the GeoParquet metadata of a schema.
+
+    Parameters:
+    -----------
+    schema : pyarrow.Schema
+        The schema of the dataset.
+
+    Returns:
+    --------
+    dict | None:
+        The decoded 'geo' metadata, or None if the schema has none.
+    """
+    if schema.metadata is None or b"geo" not in schema.metadata:
+        return None
+    return json.loads(schema.metadata[b"geo"])
+
+
+def _build_filter(schema, keys, flights, time, start, end, bbox, lat, lon, covering):
+    """
+    Builds the filter expression pushed down to the Parquet row groups.
+
+    Parameters:
+    -----------
+    schema : pyarrow.Schema
+        The schema of the dataset.
+    keys : list
+        The key columns.
+    flights : list or None
+        The keys of the flights to read. Tuples for multiple keys.
+    time : str
+        The time column.
+    start, end : Timestamp or None
+        The time range to read, including `start` and excluding `end`.
+    bbox : tuple or None
+        The (minx, miny, maxx, maxy) box to read.
+    lat, lon : str or None
+        The coordinate columns, if the coordinates are stored as columns.
+    covering : dict or None
+        The GeoParquet bounding box columns of the geometry, if any.
+
+    Returns:
+    --------
+    pyarrow.compute.Expression | None:
+        The filter, or None if nothing is filtered.
+    """
+    conditions = []
+    if flights is not None:
+        for position, key in enumerate(keys):
+            values = [flight[position] if len(keys) > 1 else flight for flight in flights]
+            key_type = schema.field(key).type
+            # Categorical keys of compact flights are stored dictionary-encoded
+            if pa.types.is_dictionary(key_type):
+                key_type = key_type.value_type
+            conditions.append(pc.field(key).isin(pa.array(values, type=key_type)))
+
+    time_type = schema.field(time).type
+    if getattr(time_type, "tz", None) is not None:
+        start = None if start is None else (start.tz_localize("UTC") if start.tz is None else start)
+        end = None if end is None else (end.tz_localize("UTC") if end.tz is None else end)
+    if start is not None:
+        conditions.append(pc.field(time) >= pa.scalar(start, type=time_type))
+    if end is not None:
+        conditions.append(pc.field(time) < pa.scalar(end, type=time_type))
+
+    if bbox is not None:
+        minx, miny, maxx, maxy = bbox
+        if lat is not None:
+            conditions += [pc.field(lon) >= minx, pc.field(lon) <= maxx, pc.field(lat) >= miny, pc.field(lat) <= maxy]
+        elif covering is not None:
+            # The bounding box of a point is the point itself
+            conditions += [
+                pc.field(*covering["xmax"]) >= minx, pc.field(*covering["xmin"]) <= maxx,
+                pc.field(*covering["ymax"]) >= miny, pc.field(*covering["ymin"]) <= maxy,
+            ]
+
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+
+def _prepare_read(path, keys, flights, start, end, bbox, columns, time, lat, lon, alt, alt_rate, velocity, heading,
+                  columnar, partitioning, filesystem):
+    """
+    Resolves the columns, projection and filter of a read, shared by `read_parquet` and `iter_parquet`.
+
+    Parameters:
+    -----------
+    path, keys, flights, start, end, bbox, columns, time, lat, lon, alt, alt_rate, velocity, heading, columnar, partitioning, filesystem
+        The arguments of `read_parquet`.
+
+    Returns:
+    --------
+    tuple:
+        - dataset (pyarrow.dataset.Dataset): The dataset to scan.
+        - keys (list): The key columns.
+        - projection (list): The columns to read.
+        - expression (pyarrow.compute.Expression | None): The filter pushed down to the scan.
+        - convert (callable): Builds a `FlightCollection` from a table of scanned rows.
+
+    Raises:
+    -------
+    ValueError:
+        If a required column is not found, or `keys` is not given and not stored in the files.
+    """
+    dataset = ds.dataset(path, format="parquet", partitioning=partitioning, filesystem=filesystem)
+    schema = dataset.schema
+    names = schema.names
+
+    # Files written by `to_parquet` record the keys and column roles, so nothing is inferred
+    stored = _flight_metadata(schema)
+    if keys is None:
+        if stored is None or not stored["keys"]:
+            raise ValueError("You have to supply 'keys' for files not written by `to_parquet`")
+        keys = stored["keys"]
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    if time is None:
+        pandas_metadata = schema.pandas_metadata or {}
+        index_columns = [name for name in pandas_metadata.get("index_columns", []) if isinstance(name, str)]
+        time = stored["time"] if stored is not None else index_columns[0] if index_columns else "time"
+    for name in keys + [time] + list(columns or []):
+        if name not in names:
+            raise ValueError(f"Column {name} is not in the dataset.")
+
+    # Coordinates come from columns or from a GeoParquet point geometry
+    geo = _geo_metadata(schema)
+    geometry = covering = crs = None
+    lat = _resolve_column(names, "latitude", lat, required=geo is None)
+    lon = _resolve_column(names, "longitude", lon, required=geo is None)
+    if lat is None or lon is None:
+        lat = lon = None
+        geometry = geo["primary_column"]
+        covering = geo["columns"][geometry].get("covering", {}).get("bbox")
+        crs = geo["columns"][geometry].get("crs")
+    overrides = {"altitude": alt, "altitude_rate": alt_rate, "velocity": velocity, "heading": heading}
+    attributes = {}
+    for name, override in overrides.items():
+        if override is None and stored is not None:
+            attributes[name] = stored[name]
+        else:
+            attributes[name] = _resolve_column(names, name, override)
+    if columnar is None and stored is not None:
+        columnar = stored["columnar"]
+
+    projection = list(dict.fromkeys(
+        keys + [time] + [name for name in (lat, lon, geometry) if name is not None]
+        + [name for name in attributes.values() if name is not None] + list(columns or [])
+    ))
+    start = None if start is None else Timestamp(start)
+    end = None if end is None else Timestamp(end)
+    expression = _build_filter(schema, keys, flights, time, start, end, bbox, lat, lon, covering)
+    partitions = _partition_filter(schema, stored, keys, flights, start, end)
+    if partitions is not None:
+        expression = partitions if expression is None else expression & partitions
+    if geometry is not None:
+        lat = stored["lat"] if stored is not None else "lat"
+        lon = stored["lon"] if stored is not None else "lon"
+
+    def convert(table):
+        if flights is not None and len(keys) > 1:
+            # Each key column was filtered on its own, so keep only the requested combinations
+            frame_keys = MultiIndex.from_arrays([table.column(key).to_numpy(zero_copy_only=False) for key in keys])
+            table = table.filter(pa.array(frame_keys.isin(list(flights))))
+
+        frame = table.to_pandas(ignore_metadata=True).set_index(time)
+        if geometry is not None:
+            points = shapely.from_wkb(frame.pop(geometry).to_numpy())
+            frame[lon] = shapely.get_x(points)
+            frame[lat] = shapely.get_y(points)
+            if bbox is not None and covering is None:
+                minx, miny, maxx, maxy = bbox
+                inside = (frame[lon] >= minx) & (frame[lon] <= maxx) & (frame[lat] >= miny) & (frame[lat] <= maxy)
+                frame = frame[inside.to_numpy()]
+
+        data = Flight(frame, lat=lat, lon=lon, alt=attributes["altitude"], alt_rate=attributes["altitude_rate"],
+                      velocity=attributes["velocity"], heading=attributes["heading"], columnar=columnar)
+        if not data.is_columnar and crs is not None:
+            data = data.set_crs(crs, allow_override=True)
+        for name, column in attributes.items():
+            # `Flight` searches for columns that are not set, which stored roles must not do
+            data._set_attrs(name, column)
+        return FlightCollection(data, keys=keys)
+
+    return dataset, keys, projection, expression, convert
+
+
+def read_parquet(path, keys=None, flights=None, start=None, end=None, bbox=None, columns=None, time=None,
+                 lat=None, lon=None, alt=None, alt_rate=None, velocity=None, heading=None, columnar=None,
+                 partitioning="hive", filesystem=None) -> FlightCollection:
+    """
+    Reads flights from a Parquet file or a directory of Parquet files into a `FlightCollection`.
+
+    The filters on flight keys, time and bounding box are pushed down to the Parquet reader, which
+    skips the row groups whose statistics rule them out. Only the key, time and coordinate columns
+    and the flight attribute columns are read, plus any `columns` requested.
+
+    Files written by `to_parquet` restore their keys, column roles and coordinate storage from
+    the file metadata, and skip the date and key hash partitions that cannot match the filters.
+
+    Coordinates are read from latitude and longitude columns or from a GeoParquet point geometry.
+    A bounding box is pushed down for coordinate columns and for geometries with a GeoParquet
+    bounding box covering. For other geometries, the rows are filtered after decoding.
+
+    Parameters:
+    -----------
+    path : str or list
+        A Parquet file, a directory of Parquet files or a list of files.
+    keys : str or list, optional
+        The column or columns that identify a flight. Default is None, which uses the keys stored
+        by `to_parquet`.
+    flights : list, optional
+        The keys of the flights to read, as tuples for multiple keys. Default is None, which reads
+        every flight.
+    start, end : Timestamp or str, optional
+        The time range to read, including `start` and excluding `end`. Default is None.
+    bbox : tuple, optional
+        The (min_lon, min_lat, max_lon, max_lat) box to read. Default is None.
+    columns : list, optional
+        Additional columns to read. Default is None.
+    time : str, optional
+        The time column. Default is None, which uses the stored pandas index or 'time'.
+    lat, lon, alt, alt_rate, velocity, heading : str, optional
+        Column names for flight attributes. Found by name if not given.
+    columnar : bool, optional
+        If True, stores coordinates as plain float64 columns. See `Flight`. Default is None.
+    partitioning : str, optional
+        The partitioning of a directory, passed to `pyarrow.dataset.dataset`. Default is 'hive'.
+    filesystem : pyarrow.fs.FileSystem, optional
+        The filesystem of `path`. Default is None, which infers it from the path.
+
+    Returns:
+    --------
+    FlightCollection:
+        The flights that match the filters.
+
+    Raises:
+    -------
+    ValueError:
+        If a required column is not found, or `keys` is not given and not stored in the files.
+    """
+    dataset, _, projection, expression, convert = _prepare_read(
+        path, keys, flights, start, end, bbox, columns, time, lat, lon, alt, alt_rate, velocity, heading, columnar,
+        partitioning, filesystem)
+    return convert(dataset.to_table(columns=projection, filter=expression))
+
+
+def iter_parquet(path, max_rows=1_000_000, keys=None, flights=None, start=None, end=None, bbox=None, columns=None,
+                 time=None, lat=None, lon=None, alt=None, alt_rate=None, velocity=None, heading=None, columnar=None,
+                 partitioning="hive", filesystem=None, check_contiguous=True):
+    """
+    Reads flights from Parquet in chunks of whole flights, holding about `max_rows` rows at a time.
+
+    The row groups are streamed in file order with the same pushdown as `read_parquet`. A flight
+    that continues past the end of a chunk is carried over to the next chunk, so every yielded
+    collection holds complete flights. A flight longer than `max_rows` is yielded whole in a
+    larger chunk.
+
+    The rows of every flight must be contiguous in the files, as written by `to_parquet` to a
+    single file or with `partition_by="key_hash"`. Date partitions split flights that span
+    midnight across files, which raises an error.
+
+    Besides the chunk being read, the check for split flights keeps one 64-bit hash of the keys
+    of every flight yielded so far, about 40 MB for five million flights. It can be turned off
+    with `check_contiguous=False` for inputs known to be contiguous, such as files written by
+    `to_parquet`, so that memory use only depends on `max_rows`.
+
+    Parameters:
+    -----------
+    path : str or list
+        A Parquet file, a directory of Parquet files or a list of files.
+    max_rows : int, optional
+        The number of rows after which a chunk is yielded. Default is 1,000,000.
+    keys, flights, start, end, bbox, columns, time, lat, lon, alt, alt_rate, velocity, heading, columnar, partitioning, filesystem
+        The filters, columns and column names, as for `read_parquet`.
+    check_contiguous : bool, optional
+        If True, raises an error when the rows of a flight are split across chunks. Default is True.
+
+    Yields:
+    -------
+    FlightCollection:
+        The flights of the next chunk. At least one, possibly empty, collection is yielded.
+
+    Raises:
+    -------
+    ValueError:
+        If a required column is not found, `keys` is not given and not stored in the files, or the
+        rows of a flight are not contiguous and `check_contiguous` is True.
+    """
+    dataset, keys, projection, expression, convert = _prepare_read(
+        path, keys, flights, start, end, bbox, columns, time, lat, lon, alt, alt_rate, velocity, heading, columnar,
+        partitioning, filesystem)
+
+    # The sorted key hashes of the yielded flights, or None without the check
+    emitted = np.zeros(0, dtype=np.uint64) if check_contiguous else None
+    buffered, rows = [], 0
+    for batch in dataset.to_batches(columns=projection, filter=expression, batch_size=min(max_rows, 131072)):
+        buffered.append(pa.Table.from_batches([batch]))
+        rows += batch.num_rows
+        if rows < max_rows:
+            continue
+        table = pa.concat_tables(buffered)
+        split = _last_flight_start(table, keys)
+        if split == 0:
+            continue
+        chunk = table.slice(0, split)
+        if emitted is not None:
+            emitted = _check_contiguous(chunk, keys, emitted)
+        yield convert(chunk)
+        # Copy the carried rows so that the buffers of the yielded chunk can be released
+        buffered = [table.slice(split).combine_chunks()]
+        rows = buffered[0].num_rows
+
+    table = pa.concat_tables(buffered) if buffered else dataset.schema.empty_table().select(projection)
+    if emitted is not None:
+        _check_contiguous(table, keys, emitted)
+    yield convert(table)
+
+
+def _last_flight_start(table, keys) -> int:
+    """
+    Returns the position of the first row of the last flight of a table.
+
+    Parameters:
+    -----------
+    table : pyarrow.Table
+        The rows, with the rows of every flight contiguous.
+    keys : list
+        The key columns.
+
+    Returns:
+    --------
+    int:
+        The position, 0 if the table holds a single flight.
+    """
+    same = None
+    for key in keys:
+        column = table.column(key)
+        last = column[-1]
+        equal = pc.fill_null(pc.equal(column, last), False) if last.is_valid else pc.is_null(column)
+        same = equal if same is None else pc.and_(same, equal)
+    different = np.flatnonzero(~same.to_numpy(zero_copy_only=False))
+    return int(different[-1]) + 1 if len(different) else 0
+
+
+def _check_contiguous(table, keys, emitted) -> np.ndarray:
+    """
+    Checks that no flight of a chunk was part of an earlier chunk, and records its flights.
+
+    Flights are recorded by a 64-bit hash of their keys, so the record takes 8 bytes per flight.
+
+    Parameters:
+    -----------
+    table : pyarrow.Table
+        The rows of the chunk.
+    keys : list
+        The key columns.
+    emitted : np.ndarray
+        The sorted key hashes of the flights of the earlier chunks.
+
+    Returns:
+    --------
+    np.ndarray:
+        The sorted key hashes of the flights of the earlier chunks and of this chunk.
+
+    Raises:
+    -------
+    ValueError:
+        If a flight of the chunk was part of an earlier chunk.
+    """
+    frame = DataFrame({key: table.column(key).to_numpy(zero_copy_only=False) for key in keys})
+    hashes = hash_pandas_object(frame, index=False).to_numpy()
+    flights = np.unique(hashes)
+    positions = np.searchsorted(emitted, flights)
+    repeated = np.flatnonzero(emitted[np.minimum(positions, len(emitted) - 1)] == flights) if len(emitted) else []
+    if len(repeated):
+        row = int(np.flatnonzero(hashes == flights[repeated[0]])[0])
+        flight = next(frame.iloc[row:row + 1].itertuples(index=False, name=None))
+        raise ValueError(f"The rows of flight {flight[0] if len(keys) == 1 else flight} are not contiguous. "
+                         "Write the flights with `to_parquet` to read them in chunks.")
+    return np.union1d(emitted, flights)
+
+
+class ChunkWriter:
+    """
+    Writes the results of a chunked evaluation to a directory, one GeoParquet file per chunk.
+
+    `Flight` and `FlightCollection` results are written with `to_parquet`, so the directory can
+    be read back with `read_parquet` or `iter_parquet`. Other results, such as the LineStrings of
+    `RDP` with `output_linestring=True`, are written with their own `to_parquet` method.
+
+    Attributes:
+    -----------
+    path : str
+        The directory of the files.
+    count : int
+        The number of files written.
+
+    Methods:
+    --------
+    __call__(result):
+        Writes the result of one chunk.
+    """
+
+    def __init__(self, path, **kwargs):
+        """
+        Initializes the ChunkWriter.
+
+        Parameters:
+        -----------
+        path : str
+            The directory of the files. Created if it does not exist.
+        **kwargs : dict
+            Additional arguments for `to_parquet`, such as `row_group_size` or `compression`.
+        """
+        self.path = path
+        self.count = 0
+        self._kwargs = kwargs
+        os.makedirs(path, exist_ok=True)
+
+    def __call__(self, result) -> None:
+        file = os.path.join(self.path, f"part-{self.count:05d}.parquet")
+        if isinstance(result, (Flight, FlightCollection)):
+            to_parquet(result, file, **self._kwargs)
+        else:
+            result.to_parquet(file)
+        self.count += 1
+
+
+def _key_buckets(keys, n_buckets):
+    """
+    Returns the hash bucket of every flight key.
+
+    Parameters:
+    -----------
+    keys : DataFrame
+        The key columns.
+    n_buckets : int
+        The number of buckets.
+
+    Returns:
+    --------
+    ndarray:
+        The bucket of every row, between 0 and `n_buckets` - 1.
+    """
+    return (hash_pandas_object(keys, index=False).to_numpy() % np.uint64(n_buckets)).astype(np.int64)
+
+
+def _flight_metadata(schema):
+    """
+    Returns the flight metadata written by `to_parquet`.
+
+    Parameters:
+    -----------
+    schema : pyarrow.Schema
+        The schema of the dataset.
+
+    Returns:
+    --------
+    dict | None:
+        The decoded metadata, or None if the files were not written by `to_parquet`.
+    """
+    if schema.metadata is None or _METADATA_KEY not in schema.metadata:
+        return None
+    return json.loads(schema.metadata[_METADATA_KEY])
+
+
+def _partition_filter(schema, stored, keys, flights, start, end):
+    """
+    Builds the filter on the partition columns written by `to_parquet`, which skips whole files.
+
+    Parameters:
+    -----------
+    schema : pyarrow.Schema
+        The schema of the dataset, including the partition columns.
+    stored : dict or None
+        The flight metadata of the dataset.
+    keys : list
+        The key columns.
+    flights : list or None
+        The keys of the flights to read.
+    start, end : Timestamp or None
+        The time range to read.
+
+    Returns:
+    --------
+    pyarrow.compute.Expression | None:
+        The filter, or None if no partition can be skipped.
+    """
+    if stored is None:
+        return None
+    conditions = []
+    if flights is not None and _BUCKET_COLUMN in schema.names and stored["keys"] == keys:
+        requested = DataFrame([flight if len(keys) > 1 else (flight,) for flight in flights], columns=keys)
+        buckets = np.unique(_key_buckets(requested, stored["n_buckets"]))
+        conditions.append(pc.field(_BUCKET_COLUMN).isin(pa.array(buckets).cast(schema.field(_BUCKET_COLUMN).type)))
+    if _DATE_COLUMN in schema.names:
+        date_type = schema.field(_DATE_COLUMN).type
+        if start is not None:
+            conditions.append(pc.field(_DATE_COLUMN) >= pa.scalar(start.strftime("%Y-%m-%d")).cast(date_type))
+        if end is not None:
+            conditions.append(pc.field(_DATE_COLUMN) <= pa.scalar(end.strftime("%Y-%m-%d")).cast(date_type))
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+
+def _flight_table(obj):
+    """
+    Converts flights into an Arrow table sorted by (keys, time), with GeoParquet point geometries.
+
+    Parameters:
+    -----------
+    obj : Flight | FlightCollection
+        The flights to convert.
+
+    Returns:
+    --------
+    tuple:
+        - table (pyarrow.Table): The rows with a WKB `geometry` and a `bbox` covering column.
+        - frame (DataFrame): The rows without coordinates, with the time as a column.
+        - group_ids (ndarray): The flight number of every row.
+        - x, y (ndarray): The coordinates of every row.
+        - crs (pyproj.CRS or None): The CRS of the coordinates.
+        - stored (dict): The keys, time column and column roles to store in the file metadata.
+    """
+    if isinstance(obj, FlightCollection):
+        key_names, data, group_ids = obj.key_names, obj.data, obj.ngroup().to_numpy()
+    else:
+        key_names, data, group_ids = [], obj, np.zeros(len(obj), dtype=np.intp)
+
+    frame, lat, lon = data._coordinate_frame()
+    time = frame.index.name or "time"
+    times = frame.index.as_unit("ns").asi8
+    rows = np.flatnonzero(group_ids >= 0)
+    order = rows[np.lexsort((times[rows], group_ids[rows]))]
+    frame = frame.reset_index(names=time).take(order)
+    group_ids = group_ids[order]
+
+    x = frame.pop(lon).to_numpy(dtype="float64")
+    y = frame.pop(lat).to_numpy(dtype="float64")
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.append_column("geometry", pa.array(shapely.to_wkb(shapely.points(x, y)), type=pa.binary()))
+    table = table.append_column("bbox", pa.StructArray.from_arrays([x, y, x, y], names=["xmin", "ymin", "xmax", "ymax"]))
+
+    stored = {
+        "keys": key_names, "time": time, "lat": lat, "lon": lon, "columnar": data.is_columnar,
+        "altitude": data._altitude_column_name, "altitude_rate": data._altitude_rate_column_name,
+        "velocity": data._velocity_column_name, "heading": data._heading_column_name,
+    }
+    return table, frame, group_ids, x, y, data.crs, stored
+
+
+def to_parquet(obj, path, partition_by=None, n_buckets=16, row_group_size=65536, compression="snappy") -> None:
+    """
+    Writes a `Flight` or `FlightCollection` as GeoParquet.
+
+    The rows are sorted by (keys, time) and every flight is written within one row group, so a
+    reader that filters on a flight key touches a single row group. Row groups are filled with
+    whole flights up to about `row_group_size` rows. The coordinates are stored as a WKB point
+    geometry with a GeoParquet bounding box covering, and the keys, time column and column roles
+    are stored in the file metadata, so `read_parquet` restores the flights without inference.
+
+    With `partition_by`, `path` is a directory of hive partitions. 'date' partitions by the day of
+    each message, in a `date` column, and 'key_hash' partitions by a hash of the flight key into
+    `n_buckets` buckets, in a `key_bucket` column. A flight that spans midnight is written to one
+    partition per day.
+
+    Parameters:
+    -----------
+    obj : Flight | FlightCollection
+        The flights to write.
+    path : str
+        The file to write, or the root directory if `partition_by` is set.
+    partition_by : str or list, optional
+        'date', 'key_hash' or both. Default is None, which writes a single file.
+    n_buckets : int, optional
+        The number of key hash buckets. Default is 16.
+    row_group_size : int, optional
+        The target number of rows per row group. Default is 65536.
+    compression : str, optional
+        The Parquet compression codec. Default is 'snappy'.
+
+    Raises:
+    -------
+    ValueError:
+        If `partition_by` is unknown, or 'key_hash' is used without keys.
+    """
+    partition_by = [] if partition_by is None else [partition_by] if isinstance(partition_by, str) else list(partition_by)
+    for partition in partition_by:
+        if partition not in ("date", "key_hash"):
+            raise ValueError(f"Unknown partitioning: {partition}. Use 'date' or 'key_hash'.")
+
+    if "key_hash" in partition_by and not isinstance(obj, FlightCollection):
+        raise ValueError("Partitioning by 'key_hash' requires a `FlightCollection`")
+
+    table, frame, group_ids, x, y, crs, stored = _flight_table(obj)
+    stored.update(partition_by=partition_by, n_buckets=n_buckets)
+    time, key_names = stored["time"], stored["keys"]
+
+    # One file per partition, with the rows of each file still in (keys, time) order
+    labels = {}
+    if "date" in partition_by:
+        days = frame[time].dt.tz_convert("UTC") if frame[time].dt.tz is not None else frame[time]
+        labels[_DATE_COLUMN] = days.to_numpy().astype("M8[D]").astype(str)
+    if "key_hash" in partition_by:
+        labels[_BUCKET_COLUMN] = _key_buckets(frame[key_names], n_buckets)
+    if labels:
+        partitions = DataFrame(labels).groupby(list(labels), sort=True).indices.items()
+    else:
+        partitions = [((), np.arange(len(frame)))]
+
+    for label, positions in partitions:
+        label = label if isinstance(label, tuple) else (label,)
+        if labels:
+            directory = os.path.join(path, *(f"{name}={value}" for name, value in zip(labels, label)))
+            os.makedirs(directory, exist_ok=True)
+            file = os.path.join(directory, "part-0.parquet")
+        else:
+            file = path
+        _write_file(table.take(positions), group_ids[positions], file, x[positions], y[positions], crs, stored,
+                    row_group_size, compression)
+
+
+def _write_file(table, group_ids, file, x, y, crs, stored, row_group_size, compression):
+    """
+    Writes one GeoParquet file with every flight within one row group.
+
+    Parameters:
+    -----------
+    table : pyarrow.Table
+        The rows to write, in (keys, time) order.
+    group_ids : ndarray
+        The flight number of every row.
+    file : str
+        The file to write.
+    x, y : ndarray
+        The coordinates of every row, used for the bounding box of the file.
+    crs : pyproj.CRS or None
+        The CRS of the coordinates.
+    stored : dict
+        The flight metadata.
+    row_group_size : int
+        The target number of rows per row group.
+    compression : str
+        The Parquet compression codec.
+    """
+    column = {
+        "encoding": "WKB",
+        "geometry_types": ["Point"],
+        "bbox": [float(np.nanmin(x)), float(np.nanmin(y)), float(np.nanmax(x)), float(np.nanmax(y))] if len(x) else [],
+        "covering": {"bbox": {name: ["bbox", name] for name in ("xmin", "ymin", "xmax", "ymax")}},
+    }
+    if crs is not None:
+        column["crs"] = crs.to_json_dict()
+    geo = {"version": "1.1.0", "primary_column": "geometry", "columns": {"geometry": column}}
+    table = table.replace_schema_metadata({b"geo": json.dumps(geo), _METADATA_KEY: json.dumps(stored)})
+
+    # A flight goes into the row group in which it starts
+    starts = np.flatnonzero(np.r_[True, group_ids[1:] != group_ids[:-1]]) if len(group_ids) else np.zeros(0, dtype=np.intp)
+    buckets = starts // row_group_size
+    bounds = np.r_[starts[np.r_[True, buckets[1:] != buckets[:-1]]], len(group_ids)] if len(starts) else np.zeros(1, dtype=np.intp)
+    with pq.ParquetWriter(file, table.schema, compression=compression) as writer:
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            writer.write_table(table.slice(a, b - a), row_group_size=b - a)
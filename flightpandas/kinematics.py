@@ -0,0 +1,257 @@
+"""
+kinematics.py
+
+This module derives the kinematics of flight trajectories from their positions and timestamps.
+All flights of a collection are processed in one segmented NumPy pass, so no per-flight pandas
+code runs, and the steps never cross flight boundaries.
+
+Columns:
+--------
+distance:
+    The great-circle distance from the previous message of the flight, in metres. 0 for the
+    first message.
+cumulative_distance:
+    The great-circle distance flown since the first message of the flight, in metres.
+groundspeed:
+    The ground speed over the step to the message, in metres per second.
+track:
+    The initial great-circle bearing of the step to the message, in degrees clockwise from north.
+vertrate:
+    The change in altitude over the step to the message, in altitude units per second. Only added
+    if the flight has an altitude column.
+turn_rate:
+    The change in track from the previous step, in degrees per second. Positive values turn right.
+
+The first message of a flight takes the ground speed, track and vertical rate of the step that
+follows it. The turn rate is missing for the first two messages of a flight, and every value is
+missing for rows that belong to no flight or have no timestamp. Columns that already exist, such
+as a measured `groundspeed`, are kept unless `overwrite` is True.
+
+Classes:
+--------
+- Kinematics: Derives the kinematics of flight trajectories as a step of a `HelperBase` pipeline.
+
+Functions:
+----------
+- _kinematics(data, group_ids, is_sorted=False, overwrite=False):
+    Adds the kinematic columns to the flight data in one segmented pass.
+
+Examples:
+---------
+# Add ground speed, track and vertical rate to a collection without them
+collection = flight_collection.kinematics()
+speeds = collection.data.get_velocity()
+
+# Resample and derive the kinematics in one pass
+from flightpandas.resampler import Resampler
+collection = Kinematics(Resampler(flight_collection, freq='1s')).eval()
+"""
+import numpy as np
+from pandas.api.types import is_datetime64_any_dtype
+
+from flightpandas.flight import Flight
+from flightpandas.flight_collection import FlightCollection
+from flightpandas.helper_base import HelperBase, _Layout
+from flightpandas.projection import EARTH_RADIUS
+
+
+def _next_in_group(values, first):
+    """
+    Replaces the values of the first row of every group with the values of the following row of
+    the same group.
+    """
+    rows = np.flatnonzero(first[:-1] & ~first[1:])
+    values[rows] = values[rows + 1]
+    return values
+
+
+def _kinematics(data: Flight, group_ids, is_sorted=False, overwrite=False) -> Flight:
+    """
+    Adds the kinematic columns to the flight data in one segmented pass.
+
+    Parameters:
+    -----------
+    data : Flight
+        The flight data, indexed by timestamp.
+    group_ids : ndarray
+        The group number of every row. Rows with a negative number belong to no flight.
+    is_sorted : bool, optional
+        If True, the rows of every group are taken to be contiguous and in time order, and the
+        sort is skipped. Default is False.
+    overwrite : bool, optional
+        If True, existing columns with the names of the derived columns are replaced, and the
+        velocity, heading and altitude rate of the flight are set to the derived columns even if
+        the flight already has them. If False, existing columns are kept as they are. Default is
+        False.
+
+    Returns:
+    --------
+    Flight:
+        The flight data with the kinematic columns, in the original row order.
+
+    Raises:
+    -------
+    ValueError:
+        If the index of the data is not a datetime index, or the coordinates are not geographic.
+    """
+    if not is_datetime64_any_dtype(data.index):
+        raise ValueError("The index of the flight data must be of type datetime64.")
+    if not data.is_columnar and (data.crs is None or not data.crs.is_geographic):
+        raise ValueError("Kinematics require geographic coordinates. Convert the flight with "
+                         "`from_local` or `to_latlon` first.")
+
+    columnar = data.to_columnar()
+    lat = columnar[columnar._latitude_column_name].to_numpy(dtype='float64')
+    lon = columnar[columnar._longitude_column_name].to_numpy(dtype='float64')
+    times = data.index.as_unit('ns').asi8
+    group_ids = np.asarray(group_ids)
+
+    valid = (group_ids >= 0) & ~data.index.isna()
+    order = np.arange(len(data)) if valid.all() else np.flatnonzero(valid)
+    if not is_sorted:
+        order = order[np.lexsort((times[order], group_ids[order]))]
+    g = group_ids[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = g[1:] != g[:-1]
+
+    phi, lam = np.radians(lat[order]), np.radians(lon[order])
+    dlam = np.diff(lam)
+    cos_phi = np.cos(phi)
+    # Haversine distance and initial bearing of every step
+    a = np.sin(np.diff(phi) / 2) ** 2 + cos_phi[:-1] * cos_phi[1:] * np.sin(dlam / 2) ** 2
+    step = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    bearing = np.degrees(np.arctan2(np.sin(dlam) * cos_phi[1:],
+                                    cos_phi[:-1] * np.sin(phi[1:]) - np.sin(phi[:-1]) * cos_phi[1:] * np.cos(dlam))) % 360
+    dt = np.diff(times[order]) / 1e9
+    dt = np.where(dt > 0, dt, np.nan)
+
+    # Every row gets the step that ends at it, and the first row of a group gets no step
+    n = len(order)
+    distance, track, step_dt, turn = np.zeros(n), np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan)
+    distance[1:] = step
+    distance[first] = 0.0
+    track[1:] = np.where(step > 0, bearing, np.nan)
+    track[first] = np.nan
+    step_dt[1:] = dt
+    step_dt[first] = np.nan
+
+    cumulative = np.cumsum(np.nan_to_num(distance))
+    cumulative -= cumulative[np.maximum.accumulate(np.where(first, np.arange(n), 0))]
+    turn[1:] = (np.diff(track) + 180) % 360 - 180
+    columns = {
+        'distance': distance,
+        'cumulative_distance': cumulative,
+        'groundspeed': _next_in_group(distance / step_dt, first),
+        'track': _next_in_group(track, first),
+    }
+    if data._altitude_column_name is not None:
+        altitude = data.get_altitude().to_numpy(dtype='float64', na_value=np.nan)[order]
+        climb = np.full(n, np.nan)
+        climb[1:] = np.diff(altitude)
+        columns['vertrate'] = _next_in_group(climb / step_dt, first)
+    columns['turn_rate'] = turn / step_dt
+
+    result = data.copy(deep=False)
+    written = set()
+    for name, values in columns.items():
+        if name in data.columns and not overwrite:
+            # Keep existing data, such as a measured ground speed in other units
+            continue
+        column = np.full(len(data), np.nan)
+        column[order] = values
+        result[name] = column
+        written.add(name)
+    result._copy_attrs(data)
+    for attr, name in (('velocity', 'groundspeed'), ('heading', 'track'), ('altitude_rate', 'vertrate')):
+        if name in written and (overwrite or getattr(data, f"_{attr}_column_name") is None):
+            result._set_attrs(attr, name)
+    return result
+
+
+class Kinematics(HelperBase):
+    """
+    Derives the kinematics of flight trajectories.
+
+    Attributes:
+    -----------
+    overwrite : bool
+        If True, existing columns with the names of the derived columns are replaced, and the
+        velocity, heading and altitude rate are set to the derived columns even if the data
+        already has them.
+
+    Methods:
+    --------
+    _eval_flight(flight):
+        Derives the kinematics of a single `Flight` object.
+    _eval_flight_collection(fc):
+        Derives the kinematics of a `FlightCollection` object.
+    _eval_layout(layout):
+        Derives the kinematics of the data of a fused pipeline stage without grouping it.
+    """
+
+    _fusible = True
+
+    def __init__(self, obj, overwrite=False):
+        """
+        Initializes the Kinematics step.
+
+        Parameters:
+        -----------
+        obj : Flight | FlightCollection | HelperBase
+            The flight data.
+        overwrite : bool, optional
+            If True, existing columns with the names of the derived columns are replaced, and the
+            velocity, heading and altitude rate are set to the derived columns even if the data
+            already has them. If False, existing columns are kept. Default is False.
+        """
+        super().__init__(obj)
+        self.overwrite = overwrite
+
+    def _eval_flight(self, flight: Flight) -> Flight:
+        """
+        Derives the kinematics of a single `Flight` object.
+
+        Parameters:
+        -----------
+        flight : Flight
+            The flight data.
+
+        Returns:
+        --------
+        Flight:
+            The flight with the kinematic columns.
+        """
+        return flight.kinematics(self.overwrite)
+
+    def _eval_flight_collection(self, fc: FlightCollection) -> FlightCollection:
+        """
+        Derives the kinematics of a `FlightCollection` object.
+
+        Parameters:
+        -----------
+        fc : FlightCollection
+            The flight collection.
+
+        Returns:
+        --------
+        FlightCollection:
+            The flight collection with the kinematic columns.
+        """
+        return fc.kinematics(self.overwrite)
+
+    def _eval_layout(self, layout: _Layout) -> _Layout:
+        """
+        Derives the kinematics of the data of a fused pipeline stage without grouping it.
+
+        Parameters:
+        -----------
+        layout : _Layout
+            The flight data.
+
+        Returns:
+        --------
+        _Layout:
+            The data with the kinematic columns, with the rows in the same order.
+        """
+        data = _kinematics(layout.data, layout.group_ids, layout.is_sorted, self.overwrite)
+        return _Layout(data, layout.group_ids, layout.key_names, layout.is_sorted)
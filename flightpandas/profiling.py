@@ -0,0 +1,285 @@
+"""
+profiling.py
+
+This module provides the `Profiler` class, which records how long each step of a `HelperBase`
+pipeline and each `FlightCollection` method takes, how many rows and groups it receives and
+returns, and how much memory it allocates.
+
+Classes:
+--------
+Profiler:
+    Collects one record per measured step and passes each record to an optional callback.
+
+Functions:
+----------
+active_profiler():
+    Returns the profiler of the innermost active `with Profiler()` block, or None.
+
+profiled(func):
+    Decorates a `FlightCollection` method so that calls are measured by the active profiler.
+
+_measure(profiler, name, obj, func, *args, **kwargs):
+    Calls a function, measured by a profiler if one is given.
+
+Examples:
+---------
+# Profile a pipeline and the collection methods it calls
+from flightpandas.profiling import Profiler
+with Profiler() as profiler:
+    result = RDP(TimeGapSplitter(flight_collection), tolerance=0.01).eval()
+print(profiler.to_frame())
+
+# Send every record to a metrics system as soon as it is measured
+profiler = Profiler(callback=lambda record: metrics.send("flightpandas", record))
+result = pipeline.eval(profiler=profiler)
+"""
+import functools
+import time
+import tracemalloc
+from contextvars import ContextVar
+
+import numpy as np
+from pandas import DataFrame
+
+_ACTIVE_PROFILER = ContextVar("flightpandas_profiler", default=None)
+
+
+def active_profiler():
+    """
+    Returns the profiler of the innermost active `with Profiler()` block.
+
+    Returns:
+    --------
+    Profiler | None:
+        The active profiler, or None if no profiler is active.
+    """
+    return _ACTIVE_PROFILER.get()
+
+
+def _size(obj):
+    """
+    Returns the number of rows and groups of a step input or output.
+
+    Parameters:
+    -----------
+    obj : object
+        A `Flight`, `FlightCollection`, fused-stage layout, DataFrame or array.
+
+    Returns:
+    --------
+    tuple:
+        The number of rows, the number of groups and the size in bytes. Unknown values are None.
+    """
+    from flightpandas.flight import Flight
+    from flightpandas.flight_collection import FlightCollection
+    from flightpandas.helper_base import _Layout
+
+    if isinstance(obj, FlightCollection):
+        return len(obj.obj), obj.ngroups, int(obj.obj.memory_usage(index=True).sum())
+    if isinstance(obj, _Layout):
+        group_ids = obj.group_ids[obj.group_ids >= 0]
+        return len(obj.data), len(np.unique(group_ids)), int(obj.data.memory_usage(index=True).sum())
+    if isinstance(obj, Flight):
+        return len(obj), 1, int(obj.memory_usage(index=True).sum())
+    if isinstance(obj, DataFrame):
+        return len(obj), None, int(obj.memory_usage(index=True).sum())
+    if isinstance(obj, np.ndarray):
+        return len(obj), None, obj.nbytes
+    return None, None, None
+
+
+def _measure(profiler, name, obj, func, *args, **kwargs):
+    """
+    Calls a function, measured by a profiler if one is given.
+
+    Parameters:
+    -----------
+    profiler : Profiler | None
+        The profiler, or None to call the function without measuring it.
+    name : str
+        The name of the step.
+    obj : object
+        The input of the step, used to count rows and groups.
+    func : callable
+        The function to call.
+    *args, **kwargs
+        The arguments of the function.
+
+    Returns:
+    --------
+    object:
+        The result of the function.
+    """
+    if profiler is None:
+        return func(*args, **kwargs)
+    return profiler.measure(name, obj, func, *args, **kwargs)
+
+
+def profiled(func):
+    """
+    Decorates a `FlightCollection` method so that calls are measured by the active profiler.
+
+    Parameters:
+    -----------
+    func : callable
+        The method to decorate.
+
+    Returns:
+    --------
+    callable:
+        The decorated method.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return _measure(active_profiler(), f"{type(self).__name__}.{func.__name__}", self, func, self, *args, **kwargs)
+    return wrapper
+
+
+class Profiler:
+    """
+    Records the cost of each step of a pipeline and of each `FlightCollection` method.
+
+    Each record holds:
+    - step: the name of the step.
+    - depth: the nesting level, 0 for the outermost measured call.
+    - wall_time: the elapsed time in seconds.
+    - rows_in, rows_out, groups_in, groups_out: the size of the input and output.
+    - peak_memory: the peak memory allocated during the step in bytes, if memory is traced.
+    - copies: `peak_memory` divided by the size of the input, an estimate of how many copies of
+      the input were alive at the same time.
+
+    Memory is traced with `tracemalloc`, which slows the measured code down. Pass
+    `trace_memory=False` to measure wall time only.
+
+    Attributes:
+    -----------
+    callback : callable or None
+        Called with every record, as a dict, as soon as the step finishes.
+    trace_memory : bool
+        If True, measures the peak memory of every step.
+    records : list
+        The records collected so far.
+
+    Methods:
+    --------
+    measure(name, obj, func, *args, **kwargs):
+        Calls a function and records its cost.
+    to_frame():
+        Returns the records as a DataFrame.
+    clear():
+        Removes the records collected so far.
+    """
+
+    def __init__(self, callback=None, trace_memory=True):
+        """
+        Initializes the Profiler.
+
+        Parameters:
+        -----------
+        callback : callable, optional
+            Called with every record, as a dict, as soon as the step finishes. Default is None.
+        trace_memory : bool, optional
+            If True, measures the peak memory of every step with `tracemalloc`. Default is True.
+        """
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.records = []
+        self._peaks = []
+        self._tokens = []
+        self._started_tracing = False
+
+    def __enter__(self):
+        self._tokens.append(_ACTIVE_PROFILER.set(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        _ACTIVE_PROFILER.reset(self._tokens.pop())
+        if self._started_tracing and not self._peaks:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def measure(self, name, obj, func, *args, **kwargs):
+        """
+        Calls a function and records its cost.
+
+        Parameters:
+        -----------
+        name : str
+            The name of the step.
+        obj : object
+            The input of the step, used to count rows and groups.
+        func : callable
+            The function to call.
+        *args, **kwargs
+            The arguments of the function.
+
+        Returns:
+        --------
+        object:
+            The result of the function.
+        """
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+
+        rows_in, groups_in, bytes_in = _size(obj)
+        if tracing:
+            # Keep the peak of the enclosing step before resetting it for this one
+            start, peak = tracemalloc.get_traced_memory()
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            tracemalloc.reset_peak()
+        self._peaks.append(0)
+
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            wall_time = time.perf_counter() - started
+            child_peak = self._peaks.pop()
+            peak_memory = None
+            if tracing:
+                peak_memory = max(tracemalloc.get_traced_memory()[1], child_peak)
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak_memory)
+                peak_memory -= start
+            if self._started_tracing and not self._peaks and not self._tokens:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+        rows_out, groups_out, _ = _size(result)
+        record = {
+            "step": name,
+            "depth": len(self._peaks),
+            "wall_time": wall_time,
+            "rows_in": rows_in,
+            "rows_out": rows_out,
+            "groups_in": groups_in,
+            "groups_out": groups_out,
+            "peak_memory": peak_memory,
+            "copies": peak_memory / bytes_in if peak_memory is not None and bytes_in else None,
+        }
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+        return result
+
+    def to_frame(self) -> DataFrame:
+        """
+        Returns the records as a DataFrame, one row per measured step in the order they finished.
+
+        Returns:
+        --------
+        DataFrame:
+            The records.
+        """
+        columns = ["step", "depth", "wall_time", "rows_in", "rows_out", "groups_in", "groups_out", "peak_memory", "copies"]
+        return DataFrame(self.records, columns=columns)
+
+    def clear(self) -> None:
+        """
+        Removes the records collected so far.
+        """
+        self.records = []
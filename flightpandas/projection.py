@@ -0,0 +1,377 @@
+"""
+projection.py
+
+This module provides local metric projections centred on each flight, computed with NumPy over
+a whole collection at once. Distances in the projected frame are in metres with little
+distortion near the flight, unlike Web Mercator at high latitudes, and every projection has an
+exact inverse.
+
+Projections:
+------------
+'aeqd':
+    The azimuthal equidistant projection on a sphere of radius `EARTH_RADIUS`. Distances and
+    directions from the origin are exact on the sphere.
+'enu':
+    The east-north-up tangent plane of the WGS 84 ellipsoid at the origin. The altitude column
+    is taken as the height above the ellipsoid in metres, and the height above the plane is
+    stored in an `up` column.
+
+Functions:
+----------
+aeqd_forward(lat, lon, lat0, lon0):
+    Projects latitudes and longitudes to azimuthal equidistant coordinates.
+
+aeqd_inverse(x, y, lat0, lon0):
+    Converts azimuthal equidistant coordinates back to latitudes and longitudes.
+
+enu_forward(lat, lon, h, lat0, lon0, h0):
+    Converts geodetic coordinates to east-north-up coordinates.
+
+enu_inverse(east, north, up, lat0, lon0, h0):
+    Converts east-north-up coordinates back to geodetic coordinates.
+
+_origins(lat, lon, times, group_ids, origin):
+    Returns the origin of every group.
+
+_to_local(flight, group_ids, method='aeqd', origin='centroid'):
+    Projects a flight to the local frames of its groups.
+
+_from_local(flight):
+    Converts a flight projected by `_to_local` back to latitude and longitude.
+
+Examples:
+---------
+# Simplify every flight with a tolerance of 50 metres
+local = flight_collection.to_local()
+simplified = RDP(local, tolerance=50.0).eval().from_local()
+
+# Compare flights in metres in one shared frame
+local = flight_collection.to_local(origin=(37.46, 126.44))
+distances = local.dtw_distance_matrix()
+
+# Project raw arrays
+x, y = aeqd_forward(lat, lon, 37.46, 126.44)
+"""
+import numpy as np
+from pandas import DataFrame
+from pyproj import CRS
+
+from flightpandas.flight import Flight
+
+EARTH_RADIUS = 6_371_008.8
+
+_WGS84_A = 6_378_137.0
+_WGS84_F = 1 / 298.257223563
+_WGS84_B = _WGS84_A * (1 - _WGS84_F)
+_WGS84_E2 = _WGS84_F * (2 - _WGS84_F)
+
+_ORIGIN_LAT = "origin_lat"
+_ORIGIN_LON = "origin_lon"
+_ORIGIN_ALT = "origin_alt"
+_UP = "up"
+# The key of `DataFrame.attrs` that records the coordinate storage of the projected flight
+_LOCAL_ATTR = "flightpandas_local"
+
+
+def aeqd_forward(lat, lon, lat0, lon0):
+    """
+    Projects latitudes and longitudes to azimuthal equidistant coordinates.
+
+    Parameters:
+    -----------
+    lat, lon : ndarray
+        The coordinates in degrees.
+    lat0, lon0 : ndarray or float
+        The origin of the projection of every point, in degrees.
+
+    Returns:
+    --------
+    tuple[ndarray, ndarray]:
+        The east and north coordinates in metres.
+    """
+    phi, lam = np.radians(lat), np.radians(lon)
+    phi0, lam0 = np.radians(lat0), np.radians(lon0)
+    dlam = lam - lam0
+    east = np.cos(phi) * np.sin(dlam)
+    north = np.cos(phi0) * np.sin(phi) - np.sin(phi0) * np.cos(phi) * np.cos(dlam)
+    cos_c = np.sin(phi0) * np.sin(phi) + np.cos(phi0) * np.cos(phi) * np.cos(dlam)
+    sin_c = np.hypot(east, north)
+    # The angular distance divided by its sine, which tends to 1 at the origin
+    with np.errstate(invalid="ignore", divide="ignore"):
+        k = np.where(sin_c > 0, np.arctan2(sin_c, cos_c) / sin_c, 1.0)
+    return EARTH_RADIUS * k * east, EARTH_RADIUS * k * north
+
+
+def aeqd_inverse(x, y, lat0, lon0):
+    """
+    Converts azimuthal equidistant coordinates back to latitudes and longitudes.
+
+    Parameters:
+    -----------
+    x, y : ndarray
+        The east and north coordinates in metres.
+    lat0, lon0 : ndarray or float
+        The origin of the projection of every point, in degrees.
+
+    Returns:
+    --------
+    tuple[ndarray, ndarray]:
+        The latitudes and longitudes in degrees.
+    """
+    phi0, lam0 = np.radians(lat0), np.radians(lon0)
+    rho = np.hypot(x, y)
+    c = rho / EARTH_RADIUS
+    sin_c, cos_c = np.sin(c), np.cos(c)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = np.where(rho > 0, y * sin_c / rho, 0.0)
+    phi = np.arcsin(np.clip(cos_c * np.sin(phi0) + ratio * np.cos(phi0), -1.0, 1.0))
+    lam = lam0 + np.arctan2(x * sin_c, rho * np.cos(phi0) * cos_c - y * np.sin(phi0) * sin_c)
+    lon = (np.degrees(lam) + 180.0) % 360.0 - 180.0
+    return np.degrees(phi), lon
+
+
+def _ecef(lat, lon, h):
+    """
+    Converts geodetic coordinates to earth-centred, earth-fixed coordinates on WGS 84.
+    """
+    phi, lam = np.radians(lat), np.radians(lon)
+    n = _WGS84_A / np.sqrt(1 - _WGS84_E2 * np.sin(phi) ** 2)
+    return ((n + h) * np.cos(phi) * np.cos(lam),
+            (n + h) * np.cos(phi) * np.sin(lam),
+            (n * (1 - _WGS84_E2) + h) * np.sin(phi))
+
+
+def enu_forward(lat, lon, h, lat0, lon0, h0):
+    """
+    Converts geodetic coordinates to east-north-up coordinates.
+
+    Parameters:
+    -----------
+    lat, lon : ndarray
+        The coordinates in degrees.
+    h : ndarray
+        The heights above the ellipsoid in metres.
+    lat0, lon0, h0 : ndarray or float
+        The origin of the tangent plane of every point.
+
+    Returns:
+    --------
+    tuple[ndarray, ndarray, ndarray]:
+        The east, north and up coordinates in metres.
+    """
+    x, y, z = _ecef(lat, lon, h)
+    x0, y0, z0 = _ecef(lat0, lon0, h0)
+    dx, dy, dz = x - x0, y - y0, z - z0
+    phi0, lam0 = np.radians(lat0), np.radians(lon0)
+    east = -np.sin(lam0) * dx + np.cos(lam0) * dy
+    north = -np.sin(phi0) * np.cos(lam0) * dx - np.sin(phi0) * np.sin(lam0) * dy + np.cos(phi0) * dz
+    up = np.cos(phi0) * np.cos(lam0) * dx + np.cos(phi0) * np.sin(lam0) * dy + np.sin(phi0) * dz
+    return east, north, up
+
+
+def enu_inverse(east, north, up, lat0, lon0, h0):
+    """
+    Converts east-north-up coordinates back to geodetic coordinates, with the closed-form
+    solution of Heikkinen (1982) for the conversion from earth-centred coordinates.
+
+    Parameters:
+    -----------
+    east, north, up : ndarray
+        The coordinates in metres.
+    lat0, lon0, h0 : ndarray or float
+        The origin of the tangent plane of every point.
+
+    Returns:
+    --------
+    tuple[ndarray, ndarray, ndarray]:
+        The latitudes and longitudes in degrees and the heights above the ellipsoid in metres.
+    """
+    phi0, lam0 = np.radians(lat0), np.radians(lon0)
+    x0, y0, z0 = _ecef(lat0, lon0, h0)
+    x = x0 - np.sin(lam0) * east - np.sin(phi0) * np.cos(lam0) * north + np.cos(phi0) * np.cos(lam0) * up
+    y = y0 + np.cos(lam0) * east - np.sin(phi0) * np.sin(lam0) * north + np.cos(phi0) * np.sin(lam0) * up
+    z = z0 + np.cos(phi0) * north + np.sin(phi0) * up
+
+    a, b, e2 = _WGS84_A, _WGS84_B, _WGS84_E2
+    p = np.hypot(x, y)
+    f = 54 * b ** 2 * z ** 2
+    g = p ** 2 + (1 - e2) * z ** 2 - e2 * (a ** 2 - b ** 2)
+    c = e2 ** 2 * f * p ** 2 / g ** 3
+    s = np.cbrt(1 + c + np.sqrt(c ** 2 + 2 * c))
+    k = s + 1 + 1 / s
+    big_p = f / (3 * k ** 2 * g ** 2)
+    q = np.sqrt(1 + 2 * e2 ** 2 * big_p)
+    r0 = (-(big_p * e2 * p) / (1 + q)
+          + np.sqrt(np.maximum(a ** 2 / 2 * (1 + 1 / q) - big_p * (1 - e2) * z ** 2 / (q * (1 + q)) - big_p * p ** 2 / 2, 0)))
+    u = np.hypot(p - e2 * r0, z)
+    v = np.sqrt((p - e2 * r0) ** 2 + (1 - e2) * z ** 2)
+    z_0 = b ** 2 * z / (a * v)
+    h = u * (1 - b ** 2 / (a * v))
+    lat = np.degrees(np.arctan2(z + (a ** 2 - b ** 2) / b ** 2 * z_0, p))
+    lon = np.degrees(np.arctan2(y, x))
+    return lat, lon, h
+
+
+def _origins(lat, lon, times, group_ids, origin):
+    """
+    Returns the origin of every group.
+
+    Parameters:
+    -----------
+    lat, lon : ndarray
+        The coordinates of every row in degrees.
+    times : ndarray
+        The time of every row in nanoseconds.
+    group_ids : ndarray
+        The group number of every row, with -1 for rows without a group.
+    origin : str or tuple
+        'centroid', 'first', or a (lat, lon) or (lat, lon, height) tuple shared by all groups.
+
+    Returns:
+    --------
+    tuple[ndarray, ndarray, ndarray]:
+        The latitude, longitude and height of the origin of every group.
+
+    Raises:
+    -------
+    ValueError:
+        If `origin` is unknown.
+    """
+    rows = np.flatnonzero(group_ids >= 0)
+    ngroups = int(group_ids[rows].max()) + 1 if len(rows) else 0
+    if isinstance(origin, tuple):
+        lat0, lon0, h0 = (origin + (0.0,))[:3]
+        return np.full(ngroups, float(lat0)), np.full(ngroups, float(lon0)), np.full(ngroups, float(h0))
+    if origin == "centroid":
+        # Average unit vectors, which also works across the antimeridian
+        phi, lam = np.radians(lat[rows]), np.radians(lon[rows])
+        ids = group_ids[rows]
+        x = np.bincount(ids, np.cos(phi) * np.cos(lam), ngroups)
+        y = np.bincount(ids, np.cos(phi) * np.sin(lam), ngroups)
+        z = np.bincount(ids, np.sin(phi), ngroups)
+        return np.degrees(np.arctan2(z, np.hypot(x, y))), np.degrees(np.arctan2(y, x)), np.zeros(ngroups)
+    if origin == "first":
+        order = rows[np.lexsort((times[rows], group_ids[rows]))]
+        first = order[np.r_[True, group_ids[order][1:] != group_ids[order][:-1]]]
+        return lat[first], lon[first], np.zeros(ngroups)
+    raise ValueError(f"Unknown origin: {origin!r}. Use 'centroid', 'first' or a (lat, lon) tuple.")
+
+
+def _to_local(flight: Flight, group_ids, method="aeqd", origin="centroid") -> Flight:
+    """
+    Projects a flight to the local frames of its groups.
+
+    Parameters:
+    -----------
+    flight : Flight
+        The flight data.
+    group_ids : ndarray
+        The group number of every row. Rows with a negative number get missing coordinates.
+    method : str, optional
+        'aeqd' or 'enu'. Default is 'aeqd'.
+    origin : str or tuple, optional
+        The origin of every frame, as for `_origins`. Default is 'centroid'.
+
+    Returns:
+    --------
+    Flight:
+        The flight with Point geometries in metres and no CRS, and the origin of every row in the
+        `origin_lat` and `origin_lon` columns. 'enu' also adds `origin_alt` and `up` columns. The
+        coordinate names, storage and CRS of the input are recorded in `attrs` for `_from_local`.
+
+    Raises:
+    -------
+    ValueError:
+        If `method` or `origin` is unknown, or the flight already has one of the added columns.
+    """
+    if method not in ("aeqd", "enu"):
+        raise ValueError(f"Unknown method: {method}. Use 'aeqd' or 'enu'.")
+    added = [_ORIGIN_LAT, _ORIGIN_LON] + ([_ORIGIN_ALT, _UP] if method == "enu" else [])
+    existing = [name for name in added if name in flight.columns]
+    if existing:
+        raise ValueError(f"The flight already has the columns {existing}. Rename them before projecting.")
+    columnar = flight.to_columnar()
+    lat_name, lon_name = columnar._latitude_column_name, columnar._longitude_column_name
+    frame = DataFrame(columnar)
+    lat = frame.pop(lat_name).to_numpy(dtype="float64")
+    lon = frame.pop(lon_name).to_numpy(dtype="float64")
+
+    group_ids = np.asarray(group_ids)
+    lat0, lon0, h0 = _origins(lat, lon, frame.index.as_unit("ns").asi8, group_ids, origin)
+    grouped = group_ids >= 0
+    ids = np.maximum(group_ids, 0)
+    row_lat0 = np.where(grouped, lat0[ids] if len(lat0) else np.nan, np.nan)
+    row_lon0 = np.where(grouped, lon0[ids] if len(lon0) else np.nan, np.nan)
+    frame[_ORIGIN_LAT] = row_lat0
+    frame[_ORIGIN_LON] = row_lon0
+
+    if method == "aeqd":
+        x, y = aeqd_forward(lat, lon, row_lat0, row_lon0)
+    else:
+        row_h0 = np.where(grouped, h0[ids] if len(h0) else np.nan, np.nan)
+        h = np.zeros(len(frame))
+        if columnar._altitude_column_name is not None:
+            h = np.nan_to_num(columnar.get_altitude().to_numpy(dtype="float64", na_value=np.nan))
+        x, y, up = enu_forward(lat, lon, h, row_lat0, row_lon0, row_h0)
+        frame[_ORIGIN_ALT] = row_h0
+        frame[_UP] = up
+
+    # The coordinate columns were removed above, so their names cannot collide with data columns
+    frame[lat_name], frame[lon_name] = y, x
+    local = Flight(frame, lat=lat_name, lon=lon_name).set_crs(None, allow_override=True)
+    local._copy_attrs(flight)
+    local.attrs[_LOCAL_ATTR] = {
+        "lat": lat_name,
+        "lon": lon_name,
+        "columnar": flight.is_columnar,
+        "crs": None if flight.is_columnar or flight.crs is None else flight.crs.to_json(),
+    }
+    return local
+
+
+def _from_local(flight: Flight) -> Flight:
+    """
+    Converts a flight projected by `_to_local` back to latitude and longitude.
+
+    Parameters:
+    -----------
+    flight : Flight
+        The projected flight, with the origin columns added by `_to_local`.
+
+    Returns:
+    --------
+    Flight:
+        The flight with the coordinate names, storage and CRS it had before `_to_local`, and
+        without the origin columns. If `attrs` no longer records them, for example after
+        resampling, the flight has Point geometries in EPSG:4326.
+
+    Raises:
+    -------
+    ValueError:
+        If the flight has no origin columns.
+    """
+    if _ORIGIN_LAT not in flight.columns or _ORIGIN_LON not in flight.columns:
+        raise ValueError("The flight is not in a local frame. Use `to_local` first.")
+    frame, y_name, x_name = flight._coordinate_frame()
+    x = frame.pop(x_name).to_numpy(dtype="float64")
+    y = frame.pop(y_name).to_numpy(dtype="float64")
+    lat0 = frame.pop(_ORIGIN_LAT).to_numpy(dtype="float64")
+    lon0 = frame.pop(_ORIGIN_LON).to_numpy(dtype="float64")
+    if _UP in frame.columns:
+        up = frame.pop(_UP).to_numpy(dtype="float64")
+        lat, lon, _ = enu_inverse(x, y, up, lat0, lon0, frame.pop(_ORIGIN_ALT).to_numpy(dtype="float64"))
+    else:
+        lat, lon = aeqd_inverse(x, y, lat0, lon0)
+
+    attrs = flight.attrs.get(_LOCAL_ATTR, {})
+    frame.attrs.pop(_LOCAL_ATTR, None)
+    lat_name, lon_name = attrs.get("lat", "lat"), attrs.get("lon", "lon")
+    frame[lat_name], frame[lon_name] = lat, lon
+    if attrs.get("columnar"):
+        geographic = Flight(frame, lat=lat_name, lon=lon_name, columnar=True)
+    else:
+        geographic = Flight(frame, lat=lat_name, lon=lon_name)
+        if attrs.get("crs") is not None and not geographic.crs.equals(CRS.from_json(attrs["crs"])):
+            geographic = geographic.to_crs(CRS.from_json(attrs["crs"]))
+    geographic._copy_attrs(flight)
+    return geographic
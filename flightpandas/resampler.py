@@ -0,0 +1,152 @@
+"""
+resampler.py
+
+This module provides the `Resampler` class, which resamples flight trajectories as a step of a
+`HelperBase` pipeline. It is compatible with `Flight` and `FlightCollection` objects and can be
+fused with the neighbouring steps of a pipeline.
+
+Classes:
+--------
+- Resampler: Resamples flight trajectories to a regular temporal resolution.
+
+Examples:
+---------
+# Resample a flight collection to one message per second
+from flightpandas.resampler import Resampler
+resampler = Resampler(flight_collection, freq='1s')
+resampled = resampler.eval()
+
+# Split, resample and simplify in one pass
+from flightpandas.splitter import TimeGapSplitter
+from flightpandas.simplifier import RDP
+pipeline = RDP(Resampler(TimeGapSplitter(flight_collection), freq='5s'), tolerance=0.01)
+print(pipeline.explain())
+simplified = pipeline.eval()
+"""
+import numpy as np
+
+from flightpandas.flight import Flight, _resample_sorted
+from flightpandas.flight_collection import FlightCollection
+from flightpandas.helper_base import HelperBase, _Layout
+
+
+class Resampler(HelperBase):
+    """
+    Resamples flight trajectories to a regular temporal resolution.
+
+    Attributes:
+    -----------
+    freq : str or Timedelta
+        The resampling frequency.
+    method : str
+        The interpolation method.
+    max_gap : Timedelta or str or None
+        If set, the gap above which trajectories are resampled as separate sections.
+    kwargs : dict
+        Additional arguments for interpolation.
+
+    Methods:
+    --------
+    _eval_flight(flight):
+        Resamples a single `Flight` object.
+    _eval_flight_collection(fc):
+        Resamples a `FlightCollection` object.
+    _eval_layout(layout):
+        Resamples the data of a fused pipeline stage without grouping it.
+    """
+
+    _fusible = True
+
+    def __init__(self, obj, freq='1s', method='linear', max_gap=None, **kwargs):
+        """
+        Initializes the Resampler.
+
+        Parameters:
+        -----------
+        obj : Flight | FlightCollection | HelperBase
+            The flight data to resample.
+        freq : str or Timedelta, optional
+            The resampling frequency. Calendar frequencies such as 'MS' are
+            laid out one group at a time. Default is '1s'.
+        method : str, optional
+            The interpolation method. Default is 'linear'.
+        max_gap : Timedelta or str, optional
+            If set, resamples the sections between gaps longer than `max_gap` separately. Default is None.
+        **kwargs : dict
+            Additional arguments for interpolation.
+        """
+        super().__init__(obj)
+        self.freq = freq
+        self.method = method
+        self.max_gap = max_gap
+        self.kwargs = kwargs
+
+    def _eval_flight(self, flight: Flight) -> Flight:
+        """
+        Resamples a single `Flight` object.
+
+        Parameters:
+        -----------
+        flight : Flight
+            The flight to resample.
+
+        Returns:
+        --------
+        Flight:
+            The resampled flight.
+        """
+        return flight.resample(self.freq, self.method, max_gap=self.max_gap, **self.kwargs)
+
+    def _eval_flight_collection(self, fc: FlightCollection) -> FlightCollection:
+        """
+        Resamples a `FlightCollection` object.
+
+        Parameters:
+        -----------
+        fc : FlightCollection
+            The flight collection to resample.
+
+        Returns:
+        --------
+        FlightCollection:
+            The resampled flight collection.
+        """
+        return fc.resample(self.freq, self.method, max_gap=self.max_gap, **self.kwargs)
+
+    def _eval_layout(self, layout: _Layout) -> _Layout:
+        """
+        Resamples the data of a fused pipeline stage without grouping it.
+
+        Parameters:
+        -----------
+        layout : _Layout
+            The data to resample.
+
+        Returns:
+        --------
+        _Layout:
+            The resampled data, with the rows of each group stored contiguously in time order.
+        """
+        data = layout.data
+        frame, lat, lon = data._coordinate_frame()
+        group_ids = layout.group_ids
+        if self.max_gap is not None:
+            from flightpandas.splitter import _segment_ids
+            segment_ids = _segment_ids(frame.index, group_ids, self.max_gap)
+        else:
+            segment_ids = group_ids
+
+        resampled, resampled_groups = _resample_sorted(frame, segment_ids, self.freq, keys=layout.key_names,
+                                                       method=self.method, return_groups=True, **self.kwargs)
+        if self.max_gap is not None:
+            # The sections of a group are numbered consecutively, so the groups stay contiguous
+            valid = segment_ids >= 0
+            segment_groups = np.full(segment_ids.max(initial=-1) + 1, -1, dtype=np.intp)
+            segment_groups[segment_ids[valid]] = group_ids[valid]
+            resampled_groups = segment_groups[resampled_groups]
+        if data.is_columnar:
+            resampled = Flight(resampled, lat=lat, lon=lon, columnar=True)
+        else:
+            resampled = Flight(resampled, lat=lat, lon=lon, crs=data.crs)
+        resampled._copy_attrs(data)
+        return _Layout(resampled, resampled_groups, layout.key_names, is_sorted=True)
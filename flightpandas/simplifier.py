@@ -1,28 +1,37 @@
 """
 simplifier.py
 
-This module provides tools to simplify flight trajectory data using the Ramer-Douglas-Peucker (RDP) 
-algorithm. It includes support for both `Flight` and `FlightCollection` objects and offers the 
+This module provides tools to simplify flight trajectory data using the Ramer-Douglas-Peucker (RDP)
+algorithm and its time-aware variant based on the synchronized Euclidean distance (SED). It includes support for both `Flight` and `FlightCollection` objects and offers the
 ability to output either simplified dataframes or linestring geometries.
 
 Classes:
 --------
 RDP:
-    A helper class for simplifying flight trajectories using the RDP algorithm, with options 
-    to preserve topology and output simplified linestrings.
+    A helper class for simplifying flight trajectories using the RDP algorithm, with options
+    to preserve topology, include altitude and output simplified linestrings.
+
+SED:
+    A helper class for simplifying flight trajectories with RDP using the synchronized Euclidean
+    distance, which preserves timing and, optionally, altitude.
+
+StreamingSimplifier:
+    A class for simplifying live trajectories point by point with dead reckoning, keeping only a
+    small state per flight.
 
 Functions:
 ----------
-_simplify_dataframe(df, simplified):
-    Simplifies a DataFrame's flight trajectory using a KDTree for coordinate matching.
+_segment_distance(p, a, b):
+    Computes the Euclidean distance from points to line segments in any number of dimensions.
 
-_simplify_linestring(df, tolerance, preserve_topology):
-    Simplifies a LineString geometry with the specified tolerance and topology preservation.
+_synchronized_distance(p, a, b, tp, ta, tb):
+    Computes the synchronized Euclidean distance (SED) from points to line segments.
 
-Attributes:
------------
-SCIPY_INSTALLED : bool
-    Indicates whether the SciPy library is installed.
+_rdp_mask(coordinates, offsets, tolerance, times=None):
+    Runs the RDP algorithm on many trajectories stored in one contiguous array.
+
+_topology_preserving_mask(coordinates, offsets, tolerance):
+    Simplifies many trajectories with shapely's topology-preserving simplifier and marks the kept rows.
 
 Examples:
 ---------
@@ -34,72 +43,201 @@ simplified_flight = simplifier.eval()
 # Simplify a flight collection
 simplifier = RDP(flight_collection, tolerance=0.05, output_linestring=True)
 simplified_collection = simplifier.eval()
+
+# Keep timing and climb/descent profiles, weighting feet of altitude against degrees
+from flightpandas.simplifier import SED
+simplifier = SED(flight_collection, tolerance=0.01, altitude_weight=1e-5)
+simplified_collection = simplifier.eval()
+print(simplifier.compression_ratio)
+
+# Simplify a live feed as the points arrive
+from flightpandas.simplifier import StreamingSimplifier
+simplifier = StreamingSimplifier("icao24", tolerance=0.001)
+for batch in live_feed:
+    kept_points = simplifier.push(batch)
 """
 
-from flightpandas.helper_base import HelperBase
+import numpy as np
+import shapely
+from pandas import DataFrame, MultiIndex, Timedelta, concat
+
+from flightpandas.helper_base import HelperBase, _Layout
 from flightpandas.flight import Flight
 from flightpandas.flight_collection import FlightCollection
 
-try:
-    from scipy.spatial import KDTree
-    SCIPY_INSTALLED = True
-except ImportError:
-    SCIPY_INSTALLED = False
+def _segment_distance(p, a, b):
+    """
+    Computes the Euclidean distance from points to line segments in any number of dimensions.
+
+    Parameters:
+    -----------
+    p : ndarray
+        The points, as an array of shape (n, d).
+    a, b : ndarray
+        The start and end of the segment for each point, as arrays of shape (n, d).
 
-def _simplify_dataframe(df, simplified):
+    Returns:
+    --------
+    ndarray:
+        The distance from each point to its segment. Degenerate segments are treated as points.
     """
-    Simplifies a DataFrame's flight trajectory using a KDTree for coordinate matching.
+    ab = b - a
+    length = np.einsum('ij,ij->i', ab, ab)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.einsum('ij,ij->i', p - a, ab) / length
+    ratio = np.where(length > 0, np.clip(ratio, 0, 1), 0)
+    return np.linalg.norm(p - a - ratio[:, None] * ab, axis=1)
+
+def _synchronized_distance(p, a, b, tp, ta, tb):
+    """
+    Computes the synchronized Euclidean distance (SED) from points to line segments.
+
+    The distance is measured to the position on the segment at the timestamp of the point,
+    assuming constant speed between the start and the end of the segment.
 
     Parameters:
     -----------
-    df : DataFrame
-        The original flight trajectory data as a DataFrame.
-    simplified : shapely.geometry.LineString or None
-        The simplified LineString geometry to match coordinates.
+    p : ndarray
+        The points, as an array of shape (n, d).
+    a, b : ndarray
+        The start and end of the segment for each point, as arrays of shape (n, d).
+    tp, ta, tb : ndarray
+        The timestamps of the points and of the start and end of their segments, as integers.
 
     Returns:
     --------
-    DataFrame:
-        A DataFrame containing the simplified trajectory.
+    ndarray:
+        The distance from each point to its synchronized position on the segment.
+    """
+    duration = tb - ta
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = (tp - ta) / duration
+    ratio = np.where(duration > 0, ratio, 0)
+    return np.linalg.norm(p - a - ratio[:, None] * (b - a), axis=1)
 
-    Raises:
-    -------
-    ImportError:
-        If SciPy is not installed and `output_linestring` is set to False.
+def _rdp_mask(coordinates, offsets, tolerance, times=None):
+    """
+    Runs the RDP algorithm on many trajectories stored in one contiguous array.
+
+    All pending intervals of all trajectories are processed together, so each level of the RDP
+    recursion is a single vectorized pass over the points that are still undecided.
+
+    Parameters:
+    -----------
+    coordinates : ndarray
+        The coordinates of all points, as an array of shape (n, d), with the points of each
+        trajectory stored contiguously.
+    offsets : ndarray
+        The start of each trajectory in `coordinates`, followed by the total number of points.
+    tolerance : float
+        Points closer than `tolerance` to the simplified line are dropped.
+    times : ndarray, optional
+        The timestamp of each point as integers. If given, distances are synchronized Euclidean
+        distances instead of distances to the segment. Default is None.
+
+    Returns:
+    --------
+    ndarray:
+        A boolean mask of the points that are kept. The first and last point of every trajectory
+        are always kept.
     """
-    if simplified is None:
-        return df
-    kdtree = KDTree(df.get_coordinates())
-    indices = kdtree.query(simplified.coords)[1]
-    return df.iloc[indices]
-    
-def _simplify_linestring(df, tolerance, preserve_topology):
+    offsets = np.asarray(offsets)
+    keep = np.zeros(len(coordinates), dtype=bool)
+    starts, ends = offsets[:-1], offsets[1:] - 1
+    non_empty = ends >= starts
+    keep[starts[non_empty]] = True
+    keep[ends[non_empty]] = True
+
+    wide = ends - starts >= 2
+    lo, hi = starts[wide], ends[wide]
+    while len(lo):
+        # Interior points of every pending interval, in one flat array
+        counts = hi - lo - 1
+        first = np.cumsum(counts) - counts
+        interval = np.repeat(np.arange(len(lo)), counts)
+        idx = np.arange(counts.sum()) - first[interval] + lo[interval] + 1
+        a, b = lo[interval], hi[interval]
+        if times is None:
+            distance = _segment_distance(coordinates[idx], coordinates[a], coordinates[b])
+        else:
+            distance = _synchronized_distance(coordinates[idx], coordinates[a], coordinates[b], times[idx], times[a], times[b])
+        distance[np.isnan(distance)] = -1
+
+        # The first point at the maximum distance of every interval
+        farthest = np.maximum.reduceat(distance, first)
+        hit = np.flatnonzero(distance == farthest[interval])
+        hit = hit[np.r_[True, interval[hit][1:] != interval[hit][:-1]]]
+
+        split = farthest > tolerance
+        pivot = idx[hit][split]
+        keep[pivot] = True
+        lo, hi = np.r_[lo[split], pivot], np.r_[pivot, hi[split]]
+        wide = hi - lo >= 2
+        lo, hi = lo[wide], hi[wide]
+    return keep
+
+def _topology_preserving_mask(coordinates, offsets, tolerance):
     """
-    Simplifies a LineString geometry with the specified tolerance and topology preservation.
+    Simplifies many trajectories with shapely's topology-preserving simplifier and marks the kept rows.
+
+    The simplified vertices are matched back to the original rows in trajectory order, so a
+    trajectory that crosses itself keeps the rows that were actually selected.
 
     Parameters:
     -----------
-    df : GeoDataFrame or GeoSeries
-        The flight trajectory data containing geospatial information.
+    coordinates : ndarray
+        The planar coordinates of all points, as an array of shape (n, 2), with the points of each
+        trajectory stored contiguously.
+    offsets : ndarray
+        The start of each trajectory in `coordinates`, followed by the total number of points.
     tolerance : float
-        The tolerance for simplifying the geometry.
-    preserve_topology : bool
-        If True, preserves the topology of the geometry during simplification.
+        The tolerance for simplifying the trajectories.
 
     Returns:
     --------
-    shapely.geometry.LineString or None:
-        The simplified LineString geometry, or None if simplification fails.
+    ndarray:
+        A boolean mask of the points that are kept.
     """
-    try:
-        return df.get_linestring().simplify(tolerance, preserve_topology)
-    except AttributeError:
-        return None
+    offsets = np.asarray(offsets)
+    x, y = coordinates[:, 0], coordinates[:, 1]
+    keep = np.zeros(len(x), dtype=bool)
+    sizes = np.diff(offsets)
+    wide = np.flatnonzero(sizes >= 3)
+    keep[np.repeat(sizes < 3, sizes)] = True
+    if len(wide) == 0:
+        return keep
+
+    rows = np.flatnonzero(np.repeat(sizes >= 3, sizes))
+    groups = np.repeat(np.arange(len(wide)), sizes[wide])
+    lines = shapely.linestrings(x[rows], y[rows], indices=groups)
+    simplified, simplified_groups = shapely.get_coordinates(
+        shapely.simplify(lines, tolerance, preserve_topology=True), return_index=True
+    )
+
+    # Look up the candidate rows of every simplified vertex
+    codes, uniques = MultiIndex.from_arrays([groups, x[rows], y[rows]]).factorize()
+    targets = uniques.get_indexer(MultiIndex.from_arrays([simplified_groups, simplified[:, 0], simplified[:, 1]]))
+    order = np.argsort(codes, kind='stable')
+    lower = np.searchsorted(codes[order], targets, side='left')
+    upper = np.searchsorted(codes[order], targets, side='right')
+
+    # Unique coordinates match directly, repeated ones take the first row after the previous vertex
+    matched = np.where(upper - lower == 1, order[np.minimum(lower, len(order) - 1)], -1)
+    for k in np.flatnonzero(upper - lower != 1):
+        candidates = order[lower[k]:upper[k]]
+        previous = matched[k - 1] if k > 0 and simplified_groups[k - 1] == simplified_groups[k] else -1
+        matched[k] = candidates[np.searchsorted(candidates, previous, side='right')]
+    keep[rows[matched]] = True
+    return keep
 
 class RDP(HelperBase):
     """
     Simplifies flight trajectories using the Ramer-Douglas-Peucker (RDP) algorithm.
 
+    The simplification works directly on the coordinate arrays and selects the kept rows with a
+    boolean mask, so no coordinate matching is needed afterwards. Flight collections are simplified
+    from one contiguous array in a single batched pass.
+
     Attributes:
     -----------
     tolerance : float
@@ -108,25 +246,44 @@ class RDP(HelperBase):
         If True, preserves the topology of the geometry during simplification.
     output_linestring : bool
         If True, outputs the simplified data as a LineString geometry. If False, outputs a DataFrame.
+    altitude_weight : float or None
+        If set, the altitude multiplied by this weight is used as a third coordinate.
+    compression_ratio : float or None
+        The number of input points divided by the number of kept points, set by `eval`.
 
     Methods:
     --------
     pipe(func, *args, **kwargs):
         Adds a transformation to the pipeline. Raises an error if `output_linestring` is True.
+    mask(data, offsets):
+        Returns a boolean mask of the rows kept by the simplification.
+    _record(keep):
+        Records the number of input and kept rows and updates `compression_ratio`.
+    _merge_partitions(pipes):
+        Combines the row counts of the partitions of a parallel evaluation.
+    _order(group_ids, index):
+        Returns the row order in which the trajectories are simplified.
+    _coordinates(data):
+        Returns the coordinates used to measure distances.
     _eval_flight(flight):
         Applies RDP simplification to a single `Flight` object.
     _eval_flight_collection(fc):
         Applies RDP simplification to a `FlightCollection` object.
+    _eval_layout(layout):
+        Applies RDP simplification to the data of a fused pipeline stage.
+    _to_data(layout):
+        Groups the simplified data, or aggregates it into LineStrings if `output_linestring` is True.
 
     Raises:
     -------
-    ImportError:
-        If SciPy is not installed and `output_linestring` is set to False.
     ValueError:
         If additional transformations are attempted after simplifying to a LineString.
     """
 
-    def __init__(self, obj, tolerance, preserve_topology=True, output_linestring=False):
+    _fusible = True
+    _runtime_attributes = HelperBase._runtime_attributes + ("compression_ratio", "_counts")
+
+    def __init__(self, obj, tolerance, preserve_topology=True, output_linestring=False, altitude_weight=None):
         """
         Initializes the RDP simplifier.
 
@@ -137,26 +294,34 @@ class RDP(HelperBase):
         tolerance : float
             The tolerance for simplifying the trajectory.
         preserve_topology : bool, optional
-            If True, preserves the topology of the geometry during simplification. Default is True.
+            If True, preserves the topology of the geometry during simplification using shapely's
+            topology-preserving simplifier. If False, uses the native vectorized RDP. Default is True.
         output_linestring : bool, optional
             If True, outputs the simplified data as a LineString. Default is False.
+        altitude_weight : float, optional
+            If set, simplifies in three dimensions using the altitude multiplied by this weight, 
+            which converts altitude to the units of the coordinates. Requires `preserve_topology=False`.
+            Default is None.
 
         Raises:
         -------
-        ImportError:
-            If SciPy is not installed and `output_linestring` is set to False.
+        ValueError:
+            If `altitude_weight` is set together with `preserve_topology=True`.
         """
-        if not SCIPY_INSTALLED and output_linestring is False:
-            raise ImportError("You need to install scipy to output dataframe.\nInstall it using `pip install scipy` or use `output_linestring=True` to output linestring.")
+        if altitude_weight is not None and preserve_topology:
+            raise ValueError("Topology can only be preserved in two dimensions.\nUse `preserve_topology=False` to simplify with altitude.")
         
         super().__init__(obj)
         self.tolerance = tolerance
         self.preserve_topology = preserve_topology
         self.output_linestring = output_linestring
+        self.altitude_weight = altitude_weight
+        self.compression_ratio = None
+        self._counts = (0, 0)
 
     def pipe(self, func, *args, **kwargs):
         """
-        Adds a transformation to the pipeline. 
+        Adds a transformation to the pipeline.
 
         Parameters:
         -----------
@@ -181,6 +346,90 @@ class RDP(HelperBase):
             raise ValueError("Cannot apply further transformations after simplifying to a linestring.")
         return super().pipe(func, *args, **kwargs)
 
+    def _record(self, keep):
+        """
+        Records the number of input and kept rows and updates `compression_ratio`.
+
+        Parameters:
+        -----------
+        keep : ndarray
+            The boolean mask of the kept rows.
+        """
+        self._counts = (len(keep), int(keep.sum()))
+        self.compression_ratio = self._counts[0] / max(self._counts[1], 1)
+
+    def _merge_partitions(self, pipes):
+        """
+        Combines the row counts of the partitions of a parallel evaluation into `compression_ratio`.
+
+        Parameters:
+        -----------
+        pipes : list
+            The copies of the simplifier after evaluating each partition.
+        """
+        self._counts = tuple(int(sum(counts)) for counts in zip(*(pipe._counts for pipe in pipes)))
+        self.compression_ratio = self._counts[0] / max(self._counts[1], 1)
+
+    def _coordinates(self, data: Flight):
+        """
+        Returns the coordinates used to measure distances, as an array of shape (n, d).
+
+        Parameters:
+        -----------
+        data : Flight
+            The flight data to simplify.
+
+        Returns:
+        --------
+        ndarray:
+            The planar coordinates, followed by the weighted altitude if `altitude_weight` is set.
+        """
+        coordinates = data.get_coordinates().to_numpy(dtype='float64')
+        if self.altitude_weight is not None:
+            altitude = data.get_altitude().to_numpy(dtype='float64', na_value=np.nan) * self.altitude_weight
+            coordinates = np.column_stack([coordinates, altitude])
+        return coordinates
+
+    def _order(self, group_ids, index):
+        """
+        Returns the row order in which the trajectories are simplified.
+
+        Parameters:
+        -----------
+        group_ids : ndarray
+            The group number of each row. Rows with a negative number are dropped.
+        index : Index
+            The index of the flight data.
+
+        Returns:
+        --------
+        ndarray:
+            The row positions grouped by trajectory, keeping the row order within each trajectory.
+        """
+        order = np.argsort(group_ids, kind='stable')
+        return order[group_ids[order] >= 0]
+
+    def mask(self, data: Flight, offsets) -> np.ndarray:
+        """
+        Returns a boolean mask of the rows kept by the simplification.
+
+        Parameters:
+        -----------
+        data : Flight
+            The flight data, with the rows of each trajectory stored contiguously.
+        offsets : ndarray
+            The start of each trajectory in `data`, followed by the total number of rows.
+
+        Returns:
+        --------
+        ndarray:
+            A boolean mask of the rows that are kept.
+        """
+        coordinates = self._coordinates(data)
+        if self.preserve_topology:
+            return _topology_preserving_mask(coordinates, offsets, self.tolerance)
+        return _rdp_mask(coordinates, offsets, self.tolerance)
+
     def _eval_flight(self, flight: Flight) -> Flight:
         """
         Applies RDP simplification to a single `Flight` object.
@@ -195,10 +444,15 @@ class RDP(HelperBase):
         Flight | shapely.geometry.LineString:
             The simplified flight as a DataFrame or LineString, depending on `output_linestring`.
         """
-        simplified = _simplify_linestring(flight, self.tolerance, self.preserve_topology)
+        order = self._order(np.zeros(len(flight), dtype=np.intp), flight.index)
+        if (np.diff(order) != 1).any():
+            flight = flight.take(order)
+        keep = self.mask(flight, [0, len(flight)])
+        self._record(keep)
+        simplified = flight[keep]
         if self.output_linestring:
-            return simplified
-        return _simplify_dataframe(flight, simplified)
+            return simplified.get_linestring()
+        return simplified
 
     def _eval_flight_collection(self, fc: FlightCollection) -> FlightCollection:
         """
@@ -211,12 +465,407 @@ class RDP(HelperBase):
 
         Returns:
         --------
-        FlightCollection | shapely.geometry.LineString:
-            The simplified flight collection as a grouped DataFrame or LineString, 
+        FlightCollection | GeoSeries:
+            The simplified flight collection as a grouped DataFrame or LineString geometries,
             depending on `output_linestring`.
         """
-        simplified = fc.apply(lambda flight: self._eval_flight(flight))
+        # Store the flights contiguously and simplify them all at once
+        group_ids = fc.ngroup().to_numpy()
+        order = self._order(group_ids, fc.data.index)
+        offsets = np.r_[0, np.cumsum(np.bincount(group_ids[order]))]
+        data = fc.data.take(order)
+        keep = self.mask(data, offsets)
+        self._record(keep)
+        simplified = data[keep].groupby(fc.key_names)
+        if self.output_linestring:
+            return simplified.get_linestring()
+        return simplified
+
+    def _eval_layout(self, layout: _Layout) -> _Layout:
+        """
+        Applies RDP simplification to the data of a fused pipeline stage.
+
+        Parameters:
+        -----------
+        layout : _Layout
+            The data to simplify.
+
+        Returns:
+        --------
+        _Layout:
+            The kept rows, with the rows of each trajectory stored contiguously.
+        """
+        data, group_ids = layout.data, layout.group_ids
+        if not layout.is_sorted:
+            order = self._order(group_ids, data.index)
+            data, group_ids = data.take(order), group_ids[order]
+        offsets = np.r_[0, np.flatnonzero(group_ids[1:] != group_ids[:-1]) + 1, len(group_ids)] if len(group_ids) else np.zeros(1, dtype=np.intp)
+        keep = self.mask(data, offsets)
+        self._record(keep)
+        return _Layout(data[keep], group_ids[keep], layout.key_names, layout.is_sorted)
+
+    def _to_data(self, layout: _Layout) -> Flight | FlightCollection:
+        """
+        Groups the simplified data, or aggregates it into LineStrings if `output_linestring` is True.
+
+        Parameters:
+        -----------
+        layout : _Layout
+            The simplified data.
+
+        Returns:
+        --------
+        Flight | FlightCollection | GeoSeries:
+            The simplified data, grouped by its keys, or its LineString geometries.
+        """
+        simplified = layout.to_data()
         if self.output_linestring:
-            return simplified
-        return simplified.groupby(fc.key_names)
-    
\ No newline at end of file
+            return simplified.get_linestring()
+        return simplified
+
+
+class SED(RDP):
+    """
+    Simplifies flight trajectories with the top-down time-ratio algorithm, which is RDP using the
+    synchronized Euclidean distance (SED).
+
+    A point is dropped only if it lies within `tolerance` of the position interpolated along the
+    simplified segment at the same timestamp, so the simplified trajectory keeps its timing as well
+    as its shape. With `altitude_weight`, the altitude is included in the distance, so climb and
+    descent profiles are preserved too.
+
+    Attributes:
+    -----------
+    tolerance : float
+        The maximum synchronized distance between a dropped point and the simplified trajectory.
+    output_linestring : bool
+        If True, outputs the simplified data as a LineString geometry. If False, outputs a DataFrame.
+    altitude_weight : float or None
+        If set, the altitude multiplied by this weight is used as a third coordinate.
+    compression_ratio : float or None
+        The number of input points divided by the number of kept points, set by `eval`.
+
+    Raises:
+    -------
+    ValueError:
+        If the index of the provided object is not of type datetime64.
+    """
+
+    def __init__(self, obj, tolerance, output_linestring=False, altitude_weight=None):
+        """
+        Initializes the SED simplifier.
+
+        Parameters:
+        -----------
+        obj : Flight | FlightCollection
+            The flight data to simplify. Must be indexed by time.
+        tolerance : float
+            The maximum synchronized distance between a dropped point and the simplified trajectory.
+        output_linestring : bool, optional
+            If True, outputs the simplified data as a LineString. Default is False.
+        altitude_weight : float, optional
+            If set, includes the altitude multiplied by this weight in the distance, which converts
+            altitude to the units of the coordinates. Default is None.
+
+        Raises:
+        -------
+        ValueError:
+            If the index of the provided object is not of type datetime64.
+        """
+        from flightpandas.splitter import _validate_datetime_index
+        _validate_datetime_index(obj)
+        super().__init__(obj, tolerance, preserve_topology=False, output_linestring=output_linestring, altitude_weight=altitude_weight)
+
+    def _order(self, group_ids, index):
+        """
+        Returns the row order in which the trajectories are simplified.
+
+        Parameters:
+        -----------
+        group_ids : ndarray
+            The group number of each row. Rows with a negative number are dropped.
+        index : DatetimeIndex
+            The timestamps of the flight data.
+
+        Returns:
+        --------
+        ndarray:
+            The row positions sorted by (trajectory, time).
+        """
+        rows = np.flatnonzero(group_ids >= 0)
+        return rows[np.lexsort((index.as_unit('ns').asi8[rows], group_ids[rows]))]
+
+    def mask(self, data: Flight, offsets) -> np.ndarray:
+        """
+        Returns a boolean mask of the rows kept by the simplification.
+
+        Parameters:
+        -----------
+        data : Flight
+            The flight data, with the rows of each trajectory stored contiguously and in time order.
+        offsets : ndarray
+            The start of each trajectory in `data`, followed by the total number of rows.
+
+        Returns:
+        --------
+        ndarray:
+            A boolean mask of the rows that are kept.
+        """
+        return _rdp_mask(self._coordinates(data), offsets, self.tolerance, times=data.index.as_unit('ns').asi8)
+
+
+class StreamingSimplifier:
+    """
+    Simplifies live flight trajectories point by point using dead reckoning.
+
+    For every flight, the simplifier keeps only the last kept point, the velocity estimated when
+    it was kept, and the last point seen. A new point is kept when its position deviates more
+    than `tolerance` from the position predicted by moving the last kept point at that velocity.
+    Kept points are emitted in the same `push` that received them. The last point of a flight is
+    emitted once the flight has been silent for `timeout`, so the lag and the memory per active
+    aircraft are both bounded.
+
+    Attributes:
+    -----------
+    key_names : list
+        The names of the columns that identify a flight.
+    tolerance : float
+        The maximum deviation between a dropped point and its predicted position.
+    altitude_weight : float or None
+        If set, the altitude multiplied by this weight is used as a third coordinate.
+    max_interval : Timedelta or None
+        If set, a point is always kept when the last kept point is older than this.
+    timeout : Timedelta
+        The silence after which a flight is considered finished.
+    flight_kwargs : dict
+        Keyword arguments for `Flight` used to convert `DataFrame` batches.
+
+    Methods:
+    --------
+    push(batch):
+        Adds a batch of messages and returns the points kept from it.
+    flush():
+        Returns the last point of every active flight and resets the state.
+    active_flights:
+        The number of flights currently tracked.
+
+    Examples:
+    ---------
+    simplifier = StreamingSimplifier("icao24", tolerance=0.001)
+    for batch in live_feed:
+        kept = simplifier.push(batch)
+        if kept is not None:
+            archive(kept)
+    archive(simplifier.flush())
+    """
+
+    def __init__(self, keys, tolerance, altitude_weight=None, max_interval=None, timeout=Timedelta(minutes=30), **kwargs):
+        """
+        Initializes the StreamingSimplifier.
+
+        Parameters:
+        -----------
+        keys : str or list
+            The column or columns that identify a flight.
+        tolerance : float
+            The maximum deviation between a dropped point and its predicted position, in the
+            units of the coordinates.
+        altitude_weight : float, optional
+            If set, includes the altitude multiplied by this weight in the deviation, which converts
+            altitude to the units of the coordinates. Default is None.
+        max_interval : Timedelta, optional
+            If set, a point is always kept when the last kept point is older than this. Default is None.
+        timeout : Timedelta, optional
+            The silence after which a flight is considered finished and its last point is emitted.
+            Default is 30 minutes.
+        **kwargs : dict
+            Column names and storage options passed to `Flight` when a batch is a `DataFrame`.
+        """
+        self.key_names = [keys] if isinstance(keys, str) else list(keys)
+        self.tolerance = tolerance
+        self.altitude_weight = altitude_weight
+        self.max_interval = None if max_interval is None else Timedelta(max_interval)
+        self.timeout = Timedelta(timeout)
+        self.flight_kwargs = kwargs
+
+        self._state = None
+        self._pending = None
+        self._watermark = None
+
+    @property
+    def active_flights(self) -> int:
+        """
+        The number of flights currently tracked.
+        """
+        return 0 if self._state is None else len(self._state)
+
+    def _coordinates(self, data: Flight):
+        """
+        Returns the coordinates used to measure deviations, as an array of shape (n, d).
+
+        Parameters:
+        -----------
+        data : Flight
+            The flight data.
+
+        Returns:
+        --------
+        ndarray:
+            The planar coordinates, followed by the weighted altitude if `altitude_weight` is set.
+        """
+        coordinates = data.get_coordinates().to_numpy(dtype='float64')
+        if self.altitude_weight is not None:
+            altitude = data.get_altitude().to_numpy(dtype='float64', na_value=np.nan) * self.altitude_weight
+            coordinates = np.column_stack([coordinates, altitude])
+        return coordinates
+
+    def push(self, batch) -> FlightCollection | None:
+        """
+        Adds a batch of messages and returns the points kept from it.
+
+        Parameters:
+        -----------
+        batch : Flight | FlightCollection | DataFrame
+            The next batch of messages, indexed by time.
+
+        Returns:
+        --------
+        FlightCollection | None:
+            The kept points, together with the last points of flights that timed out, grouped by
+            flight key. None if no point was emitted.
+
+        Raises:
+        -------
+        ValueError:
+            If the index of the batch is not of type datetime64.
+        """
+        from flightpandas.splitter import _validate_datetime_index
+
+        if isinstance(batch, FlightCollection):
+            batch = batch.data
+        if not isinstance(batch, Flight):
+            batch = Flight(batch, **self.flight_kwargs)
+        _validate_datetime_index(batch)
+        if len(batch) == 0:
+            return None
+
+        keys = DataFrame(batch[self.key_names]).groupby(self.key_names, sort=False)
+        group_ids = keys.ngroup().to_numpy()
+        key_index = keys.size().index
+        rows = np.flatnonzero(group_ids >= 0)
+        times = batch.index.as_unit('ns').asi8
+        order = rows[np.lexsort((times[rows], group_ids[rows]))]
+        batch = batch.take(order)
+        group_ids = group_ids[order]
+        times = times[order]
+        coordinates = self._coordinates(batch)
+        n_groups, n_dims = len(key_index), coordinates.shape[1]
+
+        # Restore the state of the flights seen in earlier batches
+        kept_position = np.full((n_groups, n_dims), np.nan)
+        velocity = np.zeros((n_groups, n_dims))
+        last_position = np.full((n_groups, n_dims), np.nan)
+        kept_time = np.full(n_groups, np.iinfo(np.int64).min)
+        last_time = np.full(n_groups, np.iinfo(np.int64).min)
+        known = np.zeros(n_groups, dtype=bool)
+        if self._state is not None:
+            positions = self._state.index.get_indexer(key_index)
+            known = positions >= 0
+            state = self._state.iloc[positions[known]]
+            kept_position[known] = np.stack(state['kept_position'].to_numpy())
+            velocity[known] = np.stack(state['velocity'].to_numpy())
+            last_position[known] = np.stack(state['last_position'].to_numpy())
+            kept_time[known] = state['kept_time'].to_numpy()
+            last_time[known] = state['last_time'].to_numpy()
+
+        # Walk through the messages of all flights in lockstep, one message per flight at a time
+        starts = np.flatnonzero(np.r_[True, group_ids[1:] != group_ids[:-1]])
+        counts = np.diff(np.r_[starts, len(group_ids)])
+        groups = group_ids[starts]
+        keep = np.zeros(len(group_ids), dtype=bool)
+        for step in range(counts.max()):
+            active = counts > step
+            row = starts[active] + step
+            g = groups[active]
+            t = times[row]
+            position = coordinates[row]
+
+            predicted = kept_position[g] + velocity[g] * ((t - kept_time[g]) / 1e9)[:, None]
+            deviation = np.linalg.norm(position - predicted, axis=1)
+            kept = ~known[g] | ~(deviation <= self.tolerance)
+            if self.max_interval is not None:
+                kept |= t - kept_time[g] > self.max_interval.value
+
+            # Estimate the velocity at the kept points from the previous message
+            elapsed = (t - last_time[g]) / 1e9
+            moving = kept & known[g] & (elapsed > 0)
+            kept_groups = g[kept]
+            velocity[kept_groups] = 0
+            velocity[g[moving]] = (position[moving] - last_position[g[moving]]) / elapsed[moving][:, None]
+            kept_position[kept_groups] = position[kept]
+            kept_time[kept_groups] = t[kept]
+            last_position[g] = position
+            last_time[g] = t
+            known[g] = True
+            keep[row] = kept
+
+        state = DataFrame({
+            'kept_position': list(kept_position),
+            'velocity': list(velocity),
+            'last_position': list(last_position),
+            'kept_time': kept_time,
+            'last_time': last_time,
+        }, index=key_index)
+        if self._state is not None:
+            state = concat([self._state[~self._state.index.isin(key_index)], state])
+
+        # The last message of a flight is pending until the flight times out
+        last_rows = np.r_[starts[1:], len(group_ids)] - 1
+        pending = batch.take(last_rows[~keep[last_rows]])
+        if self._pending is not None:
+            previous = self._pending[~MultiIndex.from_frame(DataFrame(self._pending[self.key_names])).isin(MultiIndex.from_frame(DataFrame(batch[self.key_names])))]
+            pending = concat([previous, pending])
+
+        self._watermark = times.max() if self._watermark is None else max(self._watermark, times.max())
+        expired = state['last_time'].to_numpy() < self._watermark - self.timeout.value
+        self._state = state[~expired]
+        pending_keys = MultiIndex.from_frame(DataFrame(pending[self.key_names]))
+        expired_keys = MultiIndex.from_frame(state.index[expired].to_frame(index=False))
+        finished = pending_keys.isin(expired_keys)
+        self._pending = pending[~finished]
+
+        return self._emit(concat([batch[keep], pending[finished]]))
+
+    def flush(self) -> FlightCollection | None:
+        """
+        Returns the last point of every active flight and resets the state.
+
+        Returns:
+        --------
+        FlightCollection | None:
+            The pending last points grouped by flight key, or None if there are none.
+        """
+        pending = self._pending
+        self._state = None
+        self._pending = None
+        self._watermark = None
+        return None if pending is None else self._emit(pending)
+
+    def _emit(self, data: Flight) -> FlightCollection | None:
+        """
+        Groups emitted points by flight key in (key, time) order.
+
+        Parameters:
+        -----------
+        data : Flight
+            The emitted points.
+
+        Returns:
+        --------
+        FlightCollection | None:
+            The points grouped by flight key, or None if there are none.
+        """
+        if len(data) == 0:
+            return None
+        order = np.argsort(data.index.as_unit('ns').asi8, kind='stable')
+        return data.take(order).groupby(self.key_names)
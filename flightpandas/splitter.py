@@ -8,11 +8,17 @@ objects and supports custom time gap thresholds for trajectory segmentation.
 Classes:
 --------
 - TimeGapSplitter: Splits flight trajectories into segments based on specified time gaps.
+- StreamingTimeGapSplitter: Splits flight trajectories that arrive in batches, carrying the
+  per-flight state from one batch to the next.
 
 Functions:
 ----------
 - _validate_datetime_index(obj): 
     Validates that the index of a `Flight` or `FlightCollection` object is of type datetime64.
+- _sort_segments(index, group_ids, gap, assume_sorted=False):
+    Sorts rows by (group, time) with one stable sort and numbers the continuous segments of every group.
+- _segment_ids(index, group_ids, gap):
+    Numbers the continuous segments of every group, starting a new segment after each time gap.
 
 Examples:
 ---------
@@ -24,12 +30,19 @@ segments = splitter.eval()
 # Split a flight collection
 splitter = TimeGapSplitter(flight_collection, gap=pd.Timedelta(hours=1))
 collection_segments = splitter.eval()
+
+# Split hourly batches as they arrive
+splitter = StreamingTimeGapSplitter("icao24", gap=pd.Timedelta(minutes=15))
+for batch in batches:
+    finished_segments = splitter.push(batch)
+remaining_segments = splitter.flush()
 """
 from flightpandas.flight import Flight
 from flightpandas.flight_collection import FlightCollection
-from flightpandas.helper_base import HelperBase
+from flightpandas.helper_base import HelperBase, _Layout
 
-from pandas import Timedelta
+import numpy as np
+from pandas import DataFrame, Series, Timedelta, concat
 from pandas.api.types import is_datetime64_any_dtype
 
 def _validate_datetime_index(obj):
@@ -59,6 +72,65 @@ def _validate_datetime_index(obj):
             raise ValueError("Index must be a datetime64 type to use this splitter\nUse `fc.data.index = pd.to_datetime(fc.data.index, ...)` to convert the index to datetime64.")
     return False
 
+def _sort_segments(index, group_ids, gap, assume_sorted=False):
+    """
+    Sorts rows by (group, time) with one stable sort and numbers the continuous segments of every group.
+
+    Parameters:
+    -----------
+    index : DatetimeIndex
+        The timestamp of each row.
+    group_ids : ndarray
+        The group number of each row. Rows with a negative number or without a timestamp are dropped.
+    gap : Timedelta or str
+        A new segment starts when two consecutive messages of a group are more than `gap` apart.
+    assume_sorted : bool, optional
+        If True, the rows are taken to be already sorted by (group, time) and the sort is skipped.
+        Default is False.
+
+    Returns:
+    --------
+    tuple[ndarray, ndarray]:
+        The row positions in (group, time) order, and the segment number of each of these rows.
+    """
+    gap = Timedelta(gap).value
+    times = index.as_unit('ns').asi8
+    group_ids = np.asarray(group_ids)
+    keep = (group_ids >= 0) & ~index.isna()
+    order = np.arange(len(group_ids)) if keep.all() else np.flatnonzero(keep)
+    if not assume_sorted:
+        order = order[np.lexsort((times[order], group_ids[order]))]
+    t = times[order]
+    g = group_ids[order]
+
+    new_segment = np.ones(len(order), dtype=bool)
+    new_segment[1:] = (g[1:] != g[:-1]) | (np.diff(t) > gap)
+    return order, np.cumsum(new_segment) - 1
+
+def _segment_ids(index, group_ids, gap):
+    """
+    Numbers the continuous segments of every group, starting a new segment after each time gap.
+
+    Parameters:
+    -----------
+    index : DatetimeIndex
+        The timestamp of each row.
+    group_ids : ndarray
+        The group number of each row. Rows with a negative number are not assigned to a segment.
+    gap : Timedelta or str
+        A new segment starts when two consecutive messages of a group are more than `gap` apart.
+
+    Returns:
+    --------
+    ndarray:
+        The segment number of each row, in the original row order. Segments are numbered in
+        (group, time) order, and rows without a group or timestamp get -1.
+    """
+    order, segments = _sort_segments(index, group_ids, gap)
+    ids = np.full(len(index), -1, dtype=np.intp)
+    ids[order] = segments
+    return ids
+
 
 class TimeGapSplitter(HelperBase):
     """
@@ -70,6 +142,8 @@ class TimeGapSplitter(HelperBase):
         The minimum time gap to use for splitting trajectories.
     split_column_name : str
         The name of the column used to indicate the split segments.
+    assume_sorted : bool
+        If True, the data is taken to be already sorted by (keys, time) and is not sorted again.
 
     Methods:
     --------
@@ -77,9 +151,15 @@ class TimeGapSplitter(HelperBase):
         Splits a single `Flight` object based on time gaps.
     _eval_flight_collection(fc):
         Splits a `FlightCollection` object into groups based on time gaps.
+    _assign_segments(data, order, segments):
+        Gathers the rows in segment order and groups them by their segment number.
+    _eval_layout(layout):
+        Splits the data of a fused pipeline stage without grouping it.
     """
 
-    def __init__(self, obj, gap=Timedelta(minutes=30), split_column_name='split'):
+    _fusible = True
+
+    def __init__(self, obj, gap=Timedelta(minutes=30), split_column_name='split', assume_sorted=False):
         """
         Initializes the TimeGapSplitter.
 
@@ -91,6 +171,9 @@ class TimeGapSplitter(HelperBase):
             The time gap threshold for splitting trajectories. Default is 30 minutes.
         split_column_name : str, optional
             The column name for indicating split segments. Default is 'split'.
+        assume_sorted : bool, optional
+            If True, skips sorting because the data is known to be ordered by (keys, time). 
+            Default is False.
 
         Raises:
         -------
@@ -101,6 +184,7 @@ class TimeGapSplitter(HelperBase):
         super().__init__(obj)
         self.gap = gap
         self.split_column_name = split_column_name
+        self.assume_sorted = assume_sorted
 
     def _eval_flight(self, flight: Flight) -> FlightCollection:
         """
@@ -116,10 +200,8 @@ class TimeGapSplitter(HelperBase):
         FlightCollection:
             A collection of flight segments grouped by the split column.
         """
-        data = flight.sort_index()
-        t_diff = data.index.to_series().diff().fillna(Timedelta(0))
-        data[self.split_column_name] = (t_diff > self.gap).cumsum()
-        return data.groupby(self.split_column_name)
+        order, segments = _sort_segments(flight.index, np.zeros(len(flight), dtype=np.intp), self.gap, self.assume_sorted)
+        return self._assign_segments(flight, order, segments)
 
     def _eval_flight_collection(self, fc: FlightCollection) -> FlightCollection:
         """
@@ -135,31 +217,260 @@ class TimeGapSplitter(HelperBase):
         FlightCollection:
             A collection of segmented flight trajectories grouped by the split column.
         """
-        group_index = fc.keys
-        if not isinstance(group_index, list):
-            group_index = [group_index]
+        order, segments = _sort_segments(fc.data.index, fc.ngroup().to_numpy(), self.gap, self.assume_sorted)
+        return self._assign_segments(fc.data, order, segments)
 
-        data = fc.data.copy()
+    def _eval_layout(self, layout: _Layout) -> _Layout:
+        """
+        Splits the data of a fused pipeline stage without grouping it.
 
-        # Ensure the data is properly indexed
-        for index in group_index:
-            try:
-                data = data.reset_index(index)
-            except KeyError:
-                pass
+        Parameters:
+        -----------
+        layout : _Layout
+            The data to split.
 
-        time_index = data.index.name
+        Returns:
+        --------
+        _Layout:
+            The data in segment order, keyed by the split column.
+        """
+        data = layout.data
+        order, segments = _sort_segments(data.index, layout.group_ids, self.gap, self.assume_sorted or layout.is_sorted)
+        if len(order) != len(data) or (np.diff(order) != 1).any():
+            data = data.take(order)
+        data = data.assign(**{self.split_column_name: segments})
+        return _Layout(data, segments, [self.split_column_name], is_sorted=True)
 
-        # Sort the data by group and time index
-        data = data.reset_index().set_index([*group_index, time_index]).sort_index()
+    def _assign_segments(self, data: Flight, order, segments) -> FlightCollection:
+        """
+        Gathers the rows in segment order and groups them by their segment number.
 
-        # Reindex with the time index and calculate time differences
-        data = data.reset_index().set_index(time_index)
-        t_diff = data.index.to_series().diff().fillna(Timedelta(0))
+        Parameters:
+        -----------
+        data : Flight
+            The flight data to split.
+        order : ndarray
+            The row positions in (keys, time) order.
+        segments : ndarray
+            The segment number of each row in `order`.
 
-        # Perform the split and assign split group numbers
-        data[self.split_column_name] = data.groupby(
-            [*group_index, (t_diff > self.gap).cumsum()]
-        ).ngroup()
+        Returns:
+        --------
+        FlightCollection:
+            A collection of flight segments grouped by the split column.
+        """
+        # Only gather when the rows are not already in segment order
+        if len(order) != len(data) or (np.diff(order) != 1).any():
+            data = data.take(order)
+        data = data.assign(**{self.split_column_name: segments})
         return data.groupby(self.split_column_name)
-    
\ No newline at end of file
+
+
+class StreamingTimeGapSplitter:
+    """
+    Splits flight trajectories that arrive in consecutive batches based on time gaps.
+
+    The splitter remembers the last timestamp and segment number of every flight key across
+    batches. A segment is emitted as soon as it is known to be finished: either a later message of
+    the same flight arrives more than `gap` after it, or the newest timestamp seen in the feed is
+    more than `gap` past its last message. Only the rows of open segments are kept in memory.
+
+    Attributes:
+    -----------
+    key_names : list
+        The names of the columns that identify a flight.
+    gap : Timedelta
+        The minimum time gap to use for splitting trajectories.
+    split_column_name : str
+        The name of the column used to indicate the split segments.
+    max_buffer_rows : int or None
+        The maximum number of rows kept for open segments.
+    flight_kwargs : dict
+        Keyword arguments for `Flight` used to convert `DataFrame` batches.
+
+    Methods:
+    --------
+    push(batch):
+        Adds a batch of messages and returns the segments that were finished by it.
+    flush():
+        Returns all segments that are still open and resets the state.
+    buffered_rows:
+        The number of rows currently kept for open segments.
+
+    Examples:
+    ---------
+    splitter = StreamingTimeGapSplitter("icao24", gap=pd.Timedelta(minutes=15))
+    for batch in hourly_batches:
+        finished = splitter.push(batch)
+        if finished is not None:
+            write(finished)
+    write(splitter.flush())
+    """
+
+    def __init__(self, keys, gap=Timedelta(minutes=30), split_column_name='split', max_buffer_rows=None, **kwargs):
+        """
+        Initializes the StreamingTimeGapSplitter.
+
+        Parameters:
+        -----------
+        keys : str or list
+            The column or columns that identify a flight.
+        gap : Timedelta, optional
+            The time gap threshold for splitting trajectories. Default is 30 minutes.
+        split_column_name : str, optional
+            The column name for indicating split segments. Default is 'split'.
+        max_buffer_rows : int, optional
+            The maximum number of rows kept for open segments. When a batch pushes the buffer past
+            this limit, the open segments with the oldest last message are emitted early. Their
+            later rows are emitted under the same segment number. Default is None (unbounded).
+        **kwargs : dict
+            Column names and storage options passed to `Flight` when a batch is a `DataFrame`.
+        """
+        self.key_names = [keys] if isinstance(keys, str) else list(keys)
+        self.gap = Timedelta(gap)
+        self.split_column_name = split_column_name
+        self.max_buffer_rows = max_buffer_rows
+        self.flight_kwargs = kwargs
+
+        self._buffer = None
+        self._state = None
+        self._watermark = None
+        self._next_segment = 0
+
+    @property
+    def buffered_rows(self) -> int:
+        """
+        The number of rows currently kept for open segments.
+        """
+        return 0 if self._buffer is None else len(self._buffer)
+
+    def push(self, batch) -> FlightCollection | None:
+        """
+        Adds a batch of messages and returns the segments that were finished by it.
+
+        Parameters:
+        -----------
+        batch : Flight | FlightCollection | DataFrame
+            The next batch of messages, indexed by time.
+
+        Returns:
+        --------
+        FlightCollection | None:
+            The finished segments grouped by the split column, or None if no segment was finished.
+
+        Raises:
+        -------
+        ValueError:
+            If the index of the batch is not of type datetime64.
+        """
+        if isinstance(batch, FlightCollection):
+            batch = batch.data
+        if not isinstance(batch, Flight):
+            batch = Flight(batch, **self.flight_kwargs)
+        _validate_datetime_index(batch)
+        if len(batch) == 0:
+            return None
+
+        keys = DataFrame(batch[self.key_names]).groupby(self.key_names, sort=False)
+        order, segments = _sort_segments(batch.index, keys.ngroup().to_numpy(), self.gap)
+        batch = batch.take(order)
+        key_index = keys.size().index
+        group_ids = keys.ngroup().to_numpy()[order]
+        times = batch.index.as_unit('ns').asi8
+
+        # First and last row of every segment in the batch
+        first = np.flatnonzero(np.r_[True, segments[1:] != segments[:-1]])
+        last = np.r_[first[1:], len(segments)] - 1
+        groups = group_ids[first]
+        first_of_group = np.r_[True, groups[1:] != groups[:-1]]
+        last_of_group = np.r_[groups[1:] != groups[:-1], True]
+
+        # Continue the open segment of a flight if its first message follows closely enough
+        previous_time = np.full(len(key_index), np.iinfo(np.int64).min)
+        previous_segment = np.full(len(key_index), -1)
+        if self._state is not None:
+            positions = self._state.index.get_indexer(key_index)
+            known = positions >= 0
+            previous_time[known] = self._state['last_time'].to_numpy()[positions[known]]
+            previous_segment[known] = self._state['segment'].to_numpy()[positions[known]]
+        has_previous = previous_segment[groups] >= 0
+        continues = first_of_group & has_previous & (times[first] - previous_time[groups] <= self.gap.value)
+
+        ids = np.empty(len(first), dtype=np.int64)
+        ids[continues] = previous_segment[groups[continues]]
+        n_new = int((~continues).sum())
+        ids[~continues] = self._next_segment + np.arange(n_new)
+        self._next_segment += n_new
+        batch = batch.assign(**{self.split_column_name: np.repeat(ids, last - first + 1)})
+
+        # Segments closed by a gap inside this batch
+        closed = [ids[~last_of_group], previous_segment[groups[first_of_group & has_previous & ~continues]]]
+
+        last_time = times[last[last_of_group]]
+        single = first_of_group[last_of_group] & continues[last_of_group]
+        last_time[single] = np.maximum(last_time[single], previous_time[groups[last_of_group][single]])
+        state = DataFrame({'last_time': last_time, 'segment': ids[last_of_group]}, index=key_index[groups[last_of_group]])
+        if self._state is not None:
+            state = concat([self._state[~self._state.index.isin(key_index)], state])
+
+        # Segments whose last message is more than `gap` older than the newest message seen
+        self._watermark = times.max() if self._watermark is None else max(self._watermark, times.max())
+        expired = state['last_time'].to_numpy() < self._watermark - self.gap.value
+        closed.append(state['segment'].to_numpy()[expired])
+        self._state = state[~expired]
+
+        self._buffer = batch if self._buffer is None else concat([self._buffer, batch])
+        return self._emit(np.concatenate(closed))
+
+    def flush(self) -> FlightCollection | None:
+        """
+        Returns all segments that are still open and resets the state.
+
+        Segment numbers keep increasing across flushes.
+
+        Returns:
+        --------
+        FlightCollection | None:
+            The remaining segments grouped by the split column, or None if nothing was buffered.
+        """
+        remaining = None
+        if self._buffer is not None:
+            remaining = self._emit(self._buffer[self.split_column_name].unique())
+        self._buffer = None
+        self._state = None
+        self._watermark = None
+        return remaining
+
+    def _emit(self, closed) -> FlightCollection | None:
+        """
+        Removes the rows of the given segments from the buffer, together with the rows of the oldest
+        open segments if the buffer is over its limit, and groups them by segment.
+
+        Parameters:
+        -----------
+        closed : ndarray
+            The numbers of the finished segments.
+
+        Returns:
+        --------
+        FlightCollection | None:
+            The removed rows grouped by the split column, or None if no row was removed.
+        """
+        split = self._buffer[self.split_column_name].to_numpy()
+        emit = np.isin(split, closed)
+
+        if self.max_buffer_rows is not None and self._state is not None and (~emit).sum() > self.max_buffer_rows:
+            # Evict the open segments with the oldest last message until the buffer fits
+            oldest = self._state.sort_values('last_time', kind='stable')['segment'].to_numpy()
+            sizes = Series(split[~emit]).value_counts().reindex(oldest, fill_value=0).to_numpy()
+            excess = (~emit).sum() - self.max_buffer_rows
+            n_evict = int(np.searchsorted(np.cumsum(sizes), excess)) + 1
+            emit |= np.isin(split, oldest[:n_evict])
+
+        if not emit.any():
+            return None
+        emitted = self._buffer[emit]
+        self._buffer = self._buffer[~emit] if not emit.all() else None
+
+        order = np.lexsort((emitted.index.as_unit('ns').asi8, emitted[self.split_column_name].to_numpy()))
+        return emitted.take(order).groupby(self.split_column_name)
@@ -0,0 +1,388 @@
+"""
+store.py
+
+This module provides a trajectory store for random access to single flights of a large
+collection. The flights are written to an Arrow IPC file sorted by (keys, time), next to a
+sidecar index from each flight key to its row offset and length. Opening a store memory-maps the
+file, so only the pages of the flights that are accessed are read from disk.
+
+Classes:
+--------
+FlightStore:
+    A memory-mapped store that returns flights as columnar `Flight` views by key or position.
+
+_StoreIndexer:
+    A utility class for indexing a `FlightStore` by key or position.
+
+Functions:
+----------
+write_store(obj, path, max_chunksize=65536):
+    Writes a `FlightCollection` as a store directory.
+
+open_store(path):
+    Opens a store directory written by `write_store`.
+
+Examples:
+---------
+# Write a collection once
+from flightpandas.store import write_store, open_store
+write_store(flight_collection, "flights.store")
+
+# Look up single flights without loading the whole collection
+store = open_store("flights.store")
+flight = store.flights("aca063")
+first_flight = store.flights[0]
+first_ten = store.flights[:10]
+
+# Run collection methods on a subset
+resampled = store.to_collection(["aca063", "a0b1c2"]).resample("5s")
+"""
+import json
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas import Index, MultiIndex, Series
+from pyproj import CRS
+
+from flightpandas.flight import Flight
+from flightpandas.flight_collection import FlightCollection
+
+_METADATA_KEY = b"flightpandas"
+_DATA_FILE = "flights.arrow"
+_INDEX_FILE = "index.parquet"
+
+
+def write_store(obj: FlightCollection, path, max_chunksize=65536) -> None:
+    """
+    Writes a `FlightCollection` as a store directory.
+
+    The rows are sorted by (keys, time) and written to an uncompressed Arrow IPC file with the
+    coordinates as float64 columns. The sidecar index holds the keys of every flight with the
+    offset and length of its rows.
+
+    Parameters:
+    -----------
+    obj : FlightCollection
+        The flights to write.
+    path : str
+        The store directory. Created if it does not exist.
+    max_chunksize : int, optional
+        The maximum number of rows per record batch. Default is 65536.
+
+    Raises:
+    -------
+    ValueError:
+        If `obj` is not a `FlightCollection`.
+    """
+    if not isinstance(obj, FlightCollection):
+        raise ValueError("Input must be of type `FlightCollection`. "
+                         f"Got {type(obj).__name__} instead.")
+
+    data = obj.data
+    frame, lat, lon = data._coordinate_frame()
+    time = frame.index.name or "time"
+    group_ids = obj.ngroup().to_numpy()
+    times = frame.index.as_unit("ns").asi8
+    rows = np.flatnonzero(group_ids >= 0)
+    order = rows[np.lexsort((times[rows], group_ids[rows]))]
+    frame = frame.reset_index(names=time).take(order)
+    group_ids = group_ids[order]
+
+    metadata = {
+        "keys": obj.key_names, "time": time, "lat": lat, "lon": lon, "columnar": data.is_columnar,
+        "altitude": data._altitude_column_name, "altitude_rate": data._altitude_rate_column_name,
+        "velocity": data._velocity_column_name, "heading": data._heading_column_name,
+        "crs": data.crs.to_json() if data.crs is not None else None,
+    }
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({_METADATA_KEY: json.dumps(metadata)})
+
+    os.makedirs(path, exist_ok=True)
+    with pa.OSFile(os.path.join(path, _DATA_FILE), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max_chunksize)
+
+    starts = np.flatnonzero(np.r_[True, group_ids[1:] != group_ids[:-1]]) if len(group_ids) else np.zeros(0, dtype=np.intp)
+    index = frame[obj.key_names].iloc[starts].reset_index(drop=True)
+    index["offset"] = starts.astype(np.int64)
+    index["length"] = np.diff(np.r_[starts, len(group_ids)]).astype(np.int64)
+    pq.write_table(pa.Table.from_pandas(index, preserve_index=False), os.path.join(path, _INDEX_FILE))
+
+
+def open_store(path) -> "FlightStore":
+    """
+    Opens a store directory written by `write_store`.
+
+    Parameters:
+    -----------
+    path : str
+        The store directory.
+
+    Returns:
+    --------
+    FlightStore:
+        The opened store.
+    """
+    return FlightStore(path)
+
+
+class _StoreIndexer:
+    """
+    A utility class for indexing a `FlightStore` by key or position.
+
+    Methods:
+    --------
+    __call__(key):
+        Retrieves a `Flight` by key.
+    __getitem__(key):
+        Retrieves a `Flight` by integer position in key order, or a list of `Flight` objects by
+        slice or list of positions.
+    take(positions):
+        Retrieves a list of `Flight` objects by integer positions.
+    """
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __call__(self, key) -> Flight:
+        return self.store.get_group(key)
+
+    def __getitem__(self, key) -> Flight | list[Flight]:
+        if isinstance(key, (int, np.integer)):
+            return self.store._flight(range(len(self.store))[key])
+        if isinstance(key, slice):
+            return self.take(np.arange(len(self.store))[key])
+        if isinstance(key, (list, np.ndarray, Series)):
+            return self.take(key)
+        raise ValueError("Only integer, slice and list indexing is supported\nTo get a flight by key, use `store.flights(key)`")
+
+    def take(self, positions) -> list[Flight]:
+        """
+        Retrieves the flights at the given positions. Their rows are gathered from the mapped
+        table in one concatenation and built into a single `Flight` that is sliced per flight.
+
+        Parameters:
+        -----------
+        positions : list or np.ndarray
+            The integer indices of the flights, negative indices counting from the end.
+
+        Returns:
+        --------
+        list[Flight]:
+            The flights, in the order of `positions`.
+
+        Raises:
+        -------
+        IndexError:
+            If a position is out of range.
+        """
+        positions = self.store._positions(positions)
+        data = self.store._to_flight(self.store._gather(positions))
+        bounds = np.r_[0, np.cumsum(self.store._lengths[positions])]
+        return [data.iloc[bounds[i]:bounds[i + 1]] for i in range(len(positions))]
+
+
+class FlightStore:
+    """
+    A memory-mapped store of flights with lookups by key in constant time.
+
+    The returned flights are columnar views of slices of the mapped Arrow buffers, and Point
+    geometries are only built when a geometry operation needs them. Numeric columns without
+    missing values are not copied; other columns are converted when the flight is built. Stores
+    written in a projected CRS are the exception: their flights are built with Point geometries in
+    that CRS, which copies every column.
+
+    Collection methods such as `resample` or `get_linestring` run on a subset of flights loaded
+    with `to_collection(keys)` or `to_collection(positions=...)`.
+
+    Attributes:
+    -----------
+    path : str
+        The store directory.
+    key_names : list
+        The columns that identify a flight.
+    keys : Index
+        The keys of the stored flights, in stored order.
+    ngroups : int
+        The number of stored flights.
+
+    Methods:
+    --------
+    flights:
+        An indexer returning a flight by key with `flights(key)`, by position with `flights[i]`, or
+        a list of flights with `flights[i:j]`, `flights[[i, j]]` or `flights.take([i, j])`.
+    get_group(key):
+        Returns the flight with the given key.
+    to_collection(keys=None, positions=None):
+        Loads some or all flights into a `FlightCollection`.
+    close():
+        Releases the memory map.
+    """
+
+    def __init__(self, path):
+        """
+        Opens a store directory.
+
+        Parameters:
+        -----------
+        path : str
+            The store directory written by `write_store`.
+        """
+        self.path = path
+        self._source = pa.memory_map(os.path.join(path, _DATA_FILE), "r")
+        self._table = pa.ipc.open_file(self._source).read_all()
+        self._metadata = json.loads(self._table.schema.metadata[_METADATA_KEY])
+        self.key_names = self._metadata["keys"]
+
+        index = pq.read_table(os.path.join(path, _INDEX_FILE)).to_pandas()
+        if len(self.key_names) == 1:
+            self.keys = Index(index[self.key_names[0]])
+        else:
+            self.keys = MultiIndex.from_frame(index[self.key_names])
+        self._offsets = index["offset"].to_numpy()
+        self._lengths = index["length"].to_numpy()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __iter__(self):
+        """
+        Iterates over the stored flights in key order.
+
+        Yields:
+        -------
+        tuple[Hashable, Flight]:
+            The key and the flight.
+        """
+        for position, key in enumerate(self.keys):
+            yield key, self._flight(position)
+
+    @property
+    def ngroups(self) -> int:
+        return len(self.keys)
+
+    @property
+    def flights(self) -> _StoreIndexer:
+        return _StoreIndexer(self)
+
+    def get_group(self, key) -> Flight:
+        """
+        Returns the flight with the given key.
+
+        Parameters:
+        -----------
+        key : Hashable
+            The flight key, as a tuple for multiple keys.
+
+        Returns:
+        --------
+        Flight:
+            The flight.
+
+        Raises:
+        -------
+        KeyError:
+            If no flight has the key.
+        """
+        return self._flight(self.keys.get_loc(key))
+
+    def to_collection(self, keys=None, positions=None) -> FlightCollection:
+        """
+        Loads some or all flights into a `FlightCollection`, to run collection methods on them.
+
+        Parameters:
+        -----------
+        keys : list, optional
+            The keys of the flights to load. Keys that are not stored are ignored.
+        positions : list or np.ndarray, optional
+            The positions of the flights to load, in key order.
+
+        Returns:
+        --------
+        FlightCollection:
+            The loaded flights. Every flight is loaded if neither `keys` nor `positions` is given.
+
+        Raises:
+        -------
+        IndexError:
+            If a position is out of range.
+
+        Examples:
+        ---------
+        resampled = store.to_collection(["aca063", "a0b1c2"]).resample("5s")
+        lines = store.to_collection(positions=range(1000)).get_linestring()
+        """
+        if keys is None and positions is None:
+            table = self._table
+        elif keys is not None:
+            positions = self.keys.get_indexer(keys)
+            table = self._gather(positions[positions >= 0])
+        else:
+            table = self._gather(self._positions(positions))
+        return FlightCollection(self._to_flight(table), keys=self.key_names)
+
+    def close(self) -> None:
+        """
+        Releases the memory map. Flights built from the store must not be used afterwards.
+        """
+        self._table = None
+        self._source.close()
+
+    def _flight(self, position) -> Flight:
+        return self._to_flight(self._table.slice(self._offsets[position], self._lengths[position]))
+
+    def _positions(self, positions) -> np.ndarray:
+        """
+        Validates flight positions and resolves negative positions.
+        """
+        positions = np.asarray(positions, dtype=np.intp).reshape(-1)
+        if ((positions < -len(self)) | (positions >= len(self))).any():
+            raise IndexError(f"Flight index out of range for {len(self)} flights")
+        return np.where(positions < 0, positions + len(self), positions)
+
+    def _gather(self, positions) -> pa.Table:
+        """
+        Concatenates the rows of the flights at the given positions without copying them.
+        """
+        slices = [self._table.slice(self._offsets[p], self._lengths[p]) for p in positions]
+        return pa.concat_tables(slices or [self._table.slice(0, 0)])
+
+    def _to_flight(self, table) -> Flight:
+        """
+        Builds a `Flight` from a slice of the stored table.
+
+        Parameters:
+        -----------
+        table : pyarrow.Table
+            The rows of the flight.
+
+        Returns:
+        --------
+        Flight:
+            The flight as a columnar view, or with Point geometries if it was written in a
+            projected CRS.
+        """
+        metadata = self._metadata
+        frame = table.to_pandas(split_blocks=True, ignore_metadata=True).set_index(metadata["time"])
+        crs = metadata["crs"]
+        # Coordinates in EPSG:4326 are used in place, and Points are built only when needed
+        columnar = metadata["columnar"] or crs is None or CRS.from_json(crs).equals(CRS.from_epsg(4326))
+        flight = Flight(frame, lat=metadata["lat"], lon=metadata["lon"], alt=metadata["altitude"],
+                        alt_rate=metadata["altitude_rate"], velocity=metadata["velocity"],
+                        heading=metadata["heading"], columnar=columnar)
+        if not columnar:
+            flight = flight.set_crs(crs, allow_override=True)
+        for name in ("altitude", "altitude_rate", "velocity", "heading"):
+            flight._set_attrs(name, metadata[name])
+        return flight